@@ -0,0 +1,98 @@
+"""Throughput benchmark for batched route-corridor search.
+
+Compares CorridorIndex.search against brute force: every station checked
+against every segment of every route.
+
+Usage:
+    python benchmarks/bench_corridor.py [--stations 2000] [--routes 2000]
+"""
+
+import argparse
+import dataclasses
+import math
+import random
+import time
+from pathlib import Path
+
+from fuelwatcher import FuelWatch
+from fuelwatcher.corridor import METRES_PER_DEGREE, CorridorIndex
+
+FEED = Path(__file__).parent.parent / "tests" / "fixtures" / "feed.xml"
+
+# Perth metro, roughly.
+SOUTH, NORTH, WEST, EAST = -32.40, -31.60, 115.70, 116.10
+
+
+def brute_force(stations: list, routes: list, radius: float) -> list[list[int]]:
+    """Return indices of stations near each route by checking all of them."""
+    kx = METRES_PER_DEGREE * math.cos(math.radians((SOUTH + NORTH) / 2))
+    ky = METRES_PER_DEGREE
+    points = [
+        (float(s.longitude) * kx, float(s.latitude) * ky) for s in stations
+    ]  # parsed once, to be fair
+    results = []
+    for route in routes:
+        projected = [(lon * kx, lat * ky) for lat, lon in route]
+        near = []
+        for i, (px, py) in enumerate(points):
+            for (ax, ay), (bx, by) in zip(projected, projected[1:]):
+                dx, dy = bx - ax, by - ay
+                length2 = dx * dx + dy * dy or 1.0
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+                if math.hypot(px - ax - t * dx, py - ay - t * dy) <= radius:
+                    near.append(i)
+                    break
+        results.append(near)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=2000)
+    parser.add_argument("--routes", type=int, default=2000)
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument("--radius", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    api = FuelWatch()
+    api.load(FEED.read_bytes())
+    template = api.stations[0]
+    stations = [
+        dataclasses.replace(
+            template,
+            address=f"{i} Test St",
+            latitude=f"{rng.uniform(SOUTH, NORTH):.6f}",
+            longitude=f"{rng.uniform(WEST, EAST):.6f}",
+            price=f"{rng.uniform(160, 200):.1f}",
+        )
+        for i in range(args.stations)
+    ]
+    routes = []
+    for _ in range(args.routes):
+        lat, lon = rng.uniform(SOUTH, NORTH), rng.uniform(WEST, EAST)
+        route = []
+        for _ in range(args.points):
+            lat += rng.uniform(-0.01, 0.01)
+            lon += rng.uniform(-0.01, 0.01)
+            route.append((lat, lon))
+        routes.append(route)
+
+    start = time.perf_counter()
+    index = CorridorIndex(stations, cell_size=args.radius)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    index.search(routes, radius=args.radius)
+    elapsed = time.perf_counter() - start
+    print(f"index build      {built * 1000:>10.1f} ms  ({len(index):,} stations)")
+    print(f"corridor search  {len(routes) / elapsed:>10,.0f} routes/s")
+
+    sample = routes[: max(1, len(routes) // 100)]
+    start = time.perf_counter()
+    brute_force(stations, sample, args.radius)
+    elapsed = time.perf_counter() - start
+    print(f"brute force      {len(sample) / elapsed:>10,.0f} routes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Memory profile of the parse pipeline and each result mode.
+
+Uses tracemalloc to report, per station, the peak bytes allocated while a
+step runs and the bytes still retained once it returns:
+
+- stages: element tree, dict parse per backend, FuelStation objects, JSON
+  string and lazy views, each measured from the previous stage's output
+- modes: what a FuelWatch instance holds after loading a response and
+  reading one of raw, xml, json, stations or station_views, and after
+  ``compact()``
+
+Usage:
+    python benchmarks/bench_memory.py [--items 5000]
+"""
+
+import argparse
+import gc
+import json
+import re
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from xml.etree import ElementTree
+
+from fuelwatcher import FuelStation, FuelWatch
+from fuelwatcher.parsers import available, get_parser
+from fuelwatcher.views import parse_views
+
+FEED = Path(__file__).parent.parent / "tests" / "fixtures" / "feed.xml"
+
+
+def synthetic_feed(items: int) -> bytes:
+    """Return the fixture feed with its items repeated to ``items`` stations."""
+    raw = FEED.read_bytes()
+    found = re.findall(rb"<item>.*?</item>", raw, re.S)
+    body = b"".join(found[i % len(found)] for i in range(items))
+    start = raw.index(found[0])
+    end = raw.index(found[-1]) + len(found[-1])
+    return raw[:start] + body + raw[end:]
+
+
+def measure(fn: Callable[[], Any]) -> tuple[int, int, Any]:
+    """Run ``fn`` under tracemalloc.
+
+    Returns:
+        Peak bytes, bytes still allocated once ``fn`` returns (including its
+        result), and the result itself.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, current, result
+
+
+def report(name: str, peak: int, retained: int, items: int) -> None:
+    """Print one row of per-station figures."""
+    print(f"{name:<24} {peak / items:>12,.0f} {retained / items:>16,.0f}")
+
+
+def header(title: str) -> None:
+    """Print a table header."""
+    print(f"{title:<24} {'peak B/item':>12} {'retained B/item':>16}")
+
+
+def stages(raw: bytes, items: int) -> None:
+    """Profile each pipeline stage on its own."""
+    peak, retained, _ = measure(lambda: ElementTree.fromstring(raw))
+    report("etree tree", peak, retained, items)
+    dicts: list[dict[str, str | None]] = []
+    for backend in available():
+        parser = get_parser(backend)
+        peak, retained, dicts = measure(lambda p=parser: p.parse(raw))
+        report(f"parse[{backend}]", peak, retained, items)
+    peak, retained, _ = measure(lambda: [FuelStation.from_xml_dict(d) for d in dicts])
+    report("FuelStation objects", peak, retained, items)
+    peak, retained, _ = measure(lambda: json.dumps(dicts, indent=4, ensure_ascii=True))
+    report("json string", peak, retained, items)
+    peak, retained, _ = measure(lambda: parse_views(raw))
+    report("station views", peak, retained, items)
+
+
+def modes(raw: bytes, items: int) -> None:
+    """Profile what a client retains for each way of reading results."""
+    accessors: dict[str, Callable[[FuelWatch], Any]] = {
+        "raw": lambda api: api.raw,
+        "xml": lambda api: api.xml,
+        "json": lambda api: (api.stations, api.json),
+        "stations": lambda api: api.stations,
+        "station_views": lambda api: api.station_views,
+        "stations + compact()": lambda api: api.compact(),
+    }
+    for name, access in accessors.items():
+        api = FuelWatch()
+
+        def run(
+            access: Callable[[FuelWatch], Any] = access, api: FuelWatch = api
+        ) -> None:
+            # Copy the response so it is allocated, and counted, while tracing.
+            api.load(bytes(bytearray(raw)))
+            access(api)
+
+        peak, retained, _ = measure(run)
+        report(name, peak, retained, items)
+        del api
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    args = parser.parse_args()
+
+    raw = synthetic_feed(args.items)
+    print(f"{args.items:,} stations, {len(raw) / args.items:,.0f} raw bytes each\n")
+    header("stage")
+    stages(raw, args.items)
+    print()
+    header("mode")
+    modes(raw, args.items)
+
+
+if __name__ == "__main__":
+    main()
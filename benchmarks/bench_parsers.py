@@ -0,0 +1,50 @@
+"""Parse time of each XML parser backend.
+
+Times every available backend on the same synthetic feed, fastest first.
+The order printed here is the order ``parsers.BACKENDS`` should keep, since
+auto-selection picks the first available backend.
+
+Usage:
+    python benchmarks/bench_parsers.py [--items 5000] [--repeat 20]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+
+from bench_memory import synthetic_feed
+
+from fuelwatcher.parsers import BACKENDS, available, get_parser
+
+
+def best_of(parse: Callable[[bytes], object], raw: bytes, repeat: int) -> float:
+    """Return the fastest of ``repeat`` timed parses, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(raw)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = synthetic_feed(args.items)
+    timings = {
+        name: best_of(get_parser(name).parse, raw, args.repeat) for name in available()
+    }
+    print(f"{'backend':<8} {'ms':>8} {'items/s':>12}")
+    for name, seconds in sorted(timings.items(), key=lambda item: item[1]):
+        print(f"{name:<8} {seconds * 1000:>8.1f} {args.items / seconds:>12,.0f}")
+    order = sorted(timings, key=timings.__getitem__)
+    declared = [name for name in BACKENDS if name in timings]
+    if order != declared:
+        print(f"note: BACKENDS order is {declared}, measured order is {order}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Throughput benchmarks for the batched station sinks.
+
+Compares each sink against the row-at-a-time baseline it replaces
+(``to_dict()`` plus one INSERT per station).
+
+Usage:
+    python benchmarks/bench_sinks.py [--stations 200000]
+"""
+
+import argparse
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from fuelwatcher import FuelWatch
+from fuelwatcher.sinks import COLUMNS, CSVSink, ParquetSink, SQLiteSink, pa
+
+FEED = Path(__file__).parent.parent / "tests" / "fixtures" / "feed.xml"
+
+
+def baseline_sqlite(path: Path, stations: list) -> None:
+    """Row-by-row inserts from to_dict(), committing once at the end."""
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE stations ({', '.join(COLUMNS)})")
+    placeholders = ", ".join("?" * len(COLUMNS))
+    for station in stations:
+        d = station.to_dict()
+        conn.execute(
+            f"INSERT INTO stations VALUES ({placeholders})",
+            [d[key] for key in d],
+        )
+    conn.commit()
+    conn.close()
+
+
+def run(name: str, fn: Callable[[Path], None], count: int, tmp: Path) -> None:
+    """Time one sink and print rows per second."""
+    path = tmp / name
+    start = time.perf_counter()
+    fn(path)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<16} {count / elapsed:>12,.0f} rows/s  ({elapsed:.3f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    api = FuelWatch()
+    api.load(FEED.read_bytes())
+    stations = (api.stations * (args.stations // len(api.stations) + 1))[
+        : args.stations
+    ]
+
+    def with_sink(factory: Callable[[Path], object]) -> Callable[[Path], None]:
+        def fn(path: Path) -> None:
+            with factory(path) as sink:  # type: ignore[attr-defined]
+                sink.write(stations)
+
+        return fn
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        run(
+            "sqlite-rowwise",
+            lambda p: baseline_sqlite(p, stations),
+            len(stations),
+            tmp_path,
+        )
+        run("sqlite-batched", with_sink(SQLiteSink), len(stations), tmp_path)
+        run("csv", with_sink(CSVSink), len(stations), tmp_path)
+        if pa is not None:
+            run("parquet", with_sink(ParquetSink), len(stations), tmp_path)
+        else:
+            print("parquet          skipped (pyarrow not installed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,3 +5,4 @@ from fuelwatcher.constants import SUBURB as SUBURB
 from fuelwatcher.fuelwatch import FuelWatch as FuelWatch
 from fuelwatcher.models import FuelStation as FuelStation
 from fuelwatcher.models import FuelWatchError as FuelWatchError
+from fuelwatcher.models import Query as Query
@@ -0,0 +1,501 @@
+"""
+Incremental price-cycle analytics over successive FuelWatch snapshots.
+
+Perth prices follow a weekly cycle. :class:`PriceCycleAnalytics` folds each
+new ``stations`` snapshot into per-station, per-brand, per-suburb and
+per-region aggregates for each product instead of recomputing them over the
+full history:
+
+- running count/mean/variance/min/max (Welford)
+- rolling window minimum and maximum via monotonic deques
+- day-of-week price histograms, mergeable and exact to 0.1 cents
+- a cycle-phase estimate: where the latest price sits in the window range
+
+WA prices are fixed for the day, so a station is folded in once per date;
+repeated polls of the same day only cost a dictionary lookup per station.
+State round-trips through :meth:`PriceCycleAnalytics.to_dict` so it can be
+persisted across restarts.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import json
+import math
+import os
+from collections import Counter, deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Self
+
+from fuelwatcher.files import atomic_write
+from fuelwatcher.models import FuelStation, FuelWatchError, to_float
+
+# Group dimensions tracked by PriceCycleAnalytics.
+STATION = "station"
+BRAND = "brand"
+LOCATION = "location"
+REGION = "region"
+
+# (dimension, name, product)
+GroupKey = tuple[str, str, int]
+
+
+@dataclass(slots=True)
+class RunningMoments:
+    """Streaming count, mean, variance and extremes (Welford's algorithm)."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def add(self, value: float) -> None:
+        """Fold in one observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def remove(self, value: float) -> None:
+        """Retract a previously added observation.
+
+        The mean and variance are exact; min and max are left as-is.
+        """
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(0.0, self.m2 - delta * (value - self.mean))
+
+    def merge(self, other: "RunningMoments") -> None:
+        """Combine another set of moments into this one (Chan et al.)."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, or 0.0 with fewer than two observations."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation."""
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Restore from :meth:`to_dict` output."""
+        return cls(
+            count=data["count"],
+            mean=data["mean"],
+            m2=data["m2"],
+            min=math.inf if data["min"] is None else data["min"],
+            max=-math.inf if data["max"] is None else data["max"],
+        )
+
+
+class WindowedExtrema:
+    """Minimum and maximum over the last ``days`` days of observations.
+
+    Each extreme is kept in a monotonic deque of ``(day, value)`` pairs, so
+    adding and expiring observations is amortized O(1). The values in the
+    window are also counted per day, so a retracted observation that was an
+    extreme can be replaced by the next one. The window ends on the newest day
+    seen; older days arriving late are slotted in by a rebuild.
+    """
+
+    __slots__ = ("days", "_newest", "_values", "_min", "_max")
+
+    def __init__(self, days: int) -> None:
+        self.days = days
+        self._newest: int | None = None
+        self._values: dict[int, Counter[float]] = {}
+        self._min: deque[tuple[int, float]] = deque()
+        self._max: deque[tuple[int, float]] = deque()
+
+    def _push(self, day: int, low: float, high: float) -> None:
+        while self._min and self._min[-1][1] >= low:
+            self._min.pop()
+        self._min.append((day, low))
+        while self._max and self._max[-1][1] <= high:
+            self._max.pop()
+        self._max.append((day, high))
+
+    def add(self, day: int, value: float) -> None:
+        """Fold in an observation for ``day`` (a date ordinal).
+
+        Days may arrive out of order, e.g. from a backfill. A day older than
+        the newest one rebuilds the deques, and a day that is already outside
+        the window is ignored.
+        """
+        newest = self._newest
+        if newest is not None and day < newest:
+            if day <= newest - self.days:
+                return
+            self._values.setdefault(day, Counter())[value] += 1
+            self._rebuild()
+            return
+        self._newest = day
+        self._values.setdefault(day, Counter())[value] += 1
+        self._push(day, value, value)
+        self.expire(day)
+
+    def remove(self, day: int, value: float) -> None:
+        """Retract an observation added for ``day``.
+
+        Removing a value that is not a current extreme is O(1); otherwise the
+        deques are rebuilt from the per-day counts.
+        """
+        counts = self._values.get(day)
+        if not counts or not counts[value]:
+            return
+        counts[value] -= 1
+        if not counts[value]:
+            del counts[value]
+            if not counts:
+                del self._values[day]
+            if (day, value) in self._min or (day, value) in self._max:
+                self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._min.clear()
+        self._max.clear()
+        for day in sorted(self._values):
+            counts = self._values[day]
+            self._push(day, min(counts), max(counts))
+
+    def expire(self, today: int) -> None:
+        """Drop observations that fell out of the window ending ``today``."""
+        oldest = today - self.days + 1
+        for dq in (self._min, self._max):
+            while dq and dq[0][0] < oldest:
+                dq.popleft()
+        for day in [day for day in self._values if day < oldest]:
+            del self._values[day]
+
+    @property
+    def min(self) -> float | None:
+        """Window minimum, or None when empty."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> float | None:
+        """Window maximum, or None when empty."""
+        return self._max[0][1] if self._max else None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "days": self.days,
+            "values": [
+                [day, list(counts.items())] for day, counts in self._values.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Restore from :meth:`to_dict` output."""
+        window = cls(data["days"])
+        for day, counts in data["values"]:
+            window._values[day] = Counter({value: n for value, n in counts})
+        window._newest = max(window._values, default=None)
+        window._rebuild()
+        return window
+
+
+class PriceSketch:
+    """Mergeable quantile sketch of prices.
+
+    FuelWatch prices have 0.1 cent resolution, so a histogram of tenths is
+    both compact (a few hundred buckets) and exact.
+    """
+
+    __slots__ = ("_counts", "count")
+
+    def __init__(self) -> None:
+        self._counts: Counter[int] = Counter()
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Fold in one price."""
+        self._counts[round(value * 10)] += 1
+        self.count += 1
+
+    def remove(self, value: float) -> None:
+        """Retract a previously added price."""
+        bucket = round(value * 10)
+        if self._counts[bucket] > 1:
+            self._counts[bucket] -= 1
+        else:
+            del self._counts[bucket]
+        self.count -= 1
+
+    def merge(self, other: "PriceSketch") -> None:
+        """Combine another sketch into this one."""
+        self._counts.update(other._counts)
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        """Return the lower ``q``-quantile (0 <= q <= 1), or None when empty."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for bucket in sorted(self._counts):
+            seen += self._counts[bucket]
+            if seen >= rank:
+                return bucket / 10
+        return None  # pragma: no cover - unreachable with consistent counts
+
+    @property
+    def median(self) -> float | None:
+        """Median price, or None when empty."""
+        return self.quantile(0.5)
+
+    def to_dict(self) -> dict[str, int]:
+        """Convert to a JSON-serializable dictionary."""
+        return {str(bucket): n for bucket, n in self._counts.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, int]) -> Self:
+        """Restore from :meth:`to_dict` output."""
+        sketch = cls()
+        sketch._counts.update({int(bucket): n for bucket, n in data.items()})
+        sketch.count = sum(data.values())
+        return sketch
+
+
+@dataclass(slots=True)
+class GroupStats:
+    """Aggregates for one station, brand, suburb or region and one product."""
+
+    window: WindowedExtrema
+    moments: RunningMoments = field(default_factory=RunningMoments)
+    weekdays: list[PriceSketch] = field(
+        default_factory=lambda: [PriceSketch() for _ in range(7)]
+    )
+    day: int = 0
+    latest: RunningMoments = field(default_factory=RunningMoments)
+
+    def add(self, day: int, value: float) -> None:
+        """Fold in one station's price for ``day`` (a date ordinal)."""
+        if day > self.day:
+            self.day = day
+            self.latest = RunningMoments()
+        if day == self.day:
+            self.latest.add(value)
+        self.moments.add(value)
+        self.window.add(day, value)
+        self.weekdays[date.fromordinal(day).weekday()].add(value)
+
+    def remove(self, day: int, value: float) -> None:
+        """Retract a price added for ``day``.
+
+        All-time extremes in :attr:`moments` are kept; window extremes are
+        recomputed.
+        """
+        if day == self.day:
+            self.latest.remove(value)
+        self.moments.remove(value)
+        self.window.remove(day, value)
+        self.weekdays[date.fromordinal(day).weekday()].remove(value)
+
+    def weekday_medians(self) -> list[float | None]:
+        """Median price for each day of the week, Monday first."""
+        return [sketch.median for sketch in self.weekdays]
+
+    @property
+    def phase(self) -> float | None:
+        """Cycle phase of the latest day: 0.0 at the window low, 1.0 at the high.
+
+        Returns None until the window has a price range.
+        """
+        low, high = self.window.min, self.window.max
+        if not self.latest.count or low is None or high is None or high <= low:
+            return None
+        return min(1.0, max(0.0, (self.latest.mean - low) / (high - low)))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        return {
+            "window": self.window.to_dict(),
+            "moments": self.moments.to_dict(),
+            "weekdays": [sketch.to_dict() for sketch in self.weekdays],
+            "day": self.day,
+            "latest": self.latest.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Restore from :meth:`to_dict` output."""
+        return cls(
+            window=WindowedExtrema.from_dict(data["window"]),
+            moments=RunningMoments.from_dict(data["moments"]),
+            weekdays=[PriceSketch.from_dict(d) for d in data["weekdays"]],
+            day=data["day"],
+            latest=RunningMoments.from_dict(data["latest"]),
+        )
+
+
+class PriceCycleAnalytics:
+    """Incrementally maintained price-cycle aggregates.
+
+    Example:
+        >>> analytics = PriceCycleAnalytics(window_days=14)
+        >>> api.query(product=1, region=25)
+        >>> analytics.update(api.stations, product=1, region="Metro : North of River")
+        >>> stats = analytics.group("brand", "Puma", product=1)
+        >>> stats.moments.mean, stats.window.min, stats.phase
+    """
+
+    def __init__(self, window_days: int = 14) -> None:
+        """Initialize empty analytics.
+
+        Args:
+            window_days: Length of the rolling window used for extremes and
+                cycle phase. Two weekly cycles by default.
+        """
+        self.window_days = window_days
+        self.groups: dict[GroupKey, GroupStats] = {}
+        # (product, *station key) -> (day, price, group keys) last folded in.
+        self._seen: dict[
+            tuple[int, str, str], tuple[int, float, tuple[GroupKey, ...]]
+        ] = {}
+
+    def _group(self, key: GroupKey) -> GroupStats:
+        stats = self.groups.get(key)
+        if stats is None:
+            stats = self.groups[key] = GroupStats(WindowedExtrema(self.window_days))
+        return stats
+
+    def update(
+        self,
+        stations: Iterable[FuelStation],
+        product: int,
+        region: str | None = None,
+    ) -> int:
+        """Fold a snapshot into the aggregates.
+
+        Snapshots should be folded in date order. Stations whose price for
+        the snapshot date was already folded in are skipped, as are dates
+        older than a station's latest. A different price for an already seen
+        date replaces the earlier one. Each product is aggregated separately.
+
+        Args:
+            stations: Stations from one query, e.g. ``api.stations``.
+            product: Product ID the query was made for.
+            region: Region name the query was made for, if any.
+
+        Returns:
+            Number of stations whose observation changed the aggregates.
+        """
+        changed = 0
+        for station in stations:
+            price = to_float(station.price)
+            if math.isnan(price) or not station.date:
+                continue
+            try:
+                day = date.fromisoformat(station.date).toordinal()
+            except ValueError:
+                continue
+            seen_key = (product, *station.key)
+            seen = self._seen.get(seen_key)
+            if seen is not None and seen[0] >= day:
+                if seen[0] > day or seen[1] == price:
+                    continue  # older data, or unchanged
+                for key in seen[2]:
+                    self.groups[key].remove(day, seen[1])
+
+            keys: tuple[GroupKey, ...] = (
+                (STATION, "|".join(station.key), product),
+                (BRAND, station.brand, product),
+                (LOCATION, station.location, product),
+            )
+            if region is not None:
+                keys += ((REGION, region, product),)
+            for key in keys:
+                self._group(key).add(day, price)
+            self._seen[seen_key] = (day, price, keys)
+            changed += 1
+        return changed
+
+    def group(self, dimension: str, name: str, product: int) -> GroupStats:
+        """Return the aggregates for one group.
+
+        Args:
+            dimension: One of "station", "brand", "location" or "region".
+            name: Group value, e.g. a brand name. Station names are
+                ``"LOCATION|ADDRESS"`` as in :attr:`FuelStation.key`.
+            product: Product ID.
+
+        Raises:
+            FuelWatchError: If nothing has been recorded for the group.
+        """
+        try:
+            return self.groups[(dimension, name, product)]
+        except KeyError:
+            raise FuelWatchError(
+                f"No data for {dimension}: {name} (product {product})"
+            ) from None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the full state to a JSON-serializable dictionary."""
+        return {
+            "window_days": self.window_days,
+            "groups": [
+                [dimension, name, product, stats.to_dict()]
+                for (dimension, name, product), stats in self.groups.items()
+            ],
+            "seen": [
+                [list(station), day, price, [list(k) for k in keys]]
+                for station, (day, price, keys) in self._seen.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Restore from :meth:`to_dict` output."""
+        analytics = cls(window_days=data["window_days"])
+        for dimension, name, product, stats in data["groups"]:
+            analytics.groups[(dimension, name, product)] = GroupStats.from_dict(stats)
+        for (product, location, address), day, price, keys in data["seen"]:
+            analytics._seen[(product, location, address)] = (
+                day,
+                price,
+                tuple((d, n, p) for d, n, p in keys),
+            )
+        return analytics
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Atomically write the state to a JSON file."""
+        with atomic_write(path) as f:
+            f.write(json.dumps(self.to_dict()).encode())
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        """Read state written by :meth:`save`."""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
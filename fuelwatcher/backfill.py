@@ -0,0 +1,179 @@
+"""
+Concurrent backfill of recent FuelWatch history.
+
+The feed only serves ``day='DD/MM/YYYY'`` up to one week back, so history
+missed while a poller was down has to be rebuilt before it ages out.
+:func:`backfill` works out which (query, day) pairs are missing from a
+:class:`DirectoryStore` and fetches only those concurrently. Each response is
+stored atomically as soon as it arrives, so the store itself is the resume
+record: an interrupted run picks up where it stopped when started again.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from fuelwatcher.constants import TIMEZONE
+from fuelwatcher.files import atomic_write
+from fuelwatcher.fuelwatch import FuelWatch
+from fuelwatcher.models import FuelWatchError, Query
+
+logger = logging.getLogger(__name__)
+
+# How many days back the feed serves, counting today as day zero.
+MAX_AGE_DAYS = 7
+
+Pair = tuple[Query, date]
+
+
+def today() -> date:
+    """Return the current date in Western Australia."""
+    return datetime.now(TIMEZONE).date()
+
+
+class DirectoryStore:
+    """Raw RSS responses stored as ``<root>/<query slug>/<YYYY-MM-DD>.xml``.
+
+    Files are written atomically, so a crash never leaves a partial response
+    that would be mistaken for a complete one.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+
+    def path(self, query: Query, day: date) -> Path:
+        """Return the file path for a (query, day) pair."""
+        return self.root / query.slug / f"{day.isoformat()}.xml"
+
+    def has(self, query: Query, day: date) -> bool:
+        """Return True if the response for ``day`` is stored."""
+        return self.path(query, day).is_file()
+
+    def get(self, query: Query, day: date) -> bytes:
+        """Return the stored raw response.
+
+        Raises:
+            FuelWatchError: If nothing is stored for the pair.
+        """
+        try:
+            return self.path(query, day).read_bytes()
+        except FileNotFoundError:
+            raise FuelWatchError(f"No stored data for {query.slug} on {day}") from None
+
+    def put(self, query: Query, day: date, raw: bytes) -> None:
+        """Store a raw response, replacing any previous one."""
+        with atomic_write(self.path(query, day)) as f:
+            f.write(raw)
+
+
+@dataclass(slots=True)
+class Coverage:
+    """Outcome of a backfill run.
+
+    Attributes:
+        requested: Every (query, day) pair in the requested range
+        present: Pairs that were already stored before this run
+        fetched: Pairs fetched and stored by this run
+        failed: Pairs that could not be fetched, with the error message
+        unavailable: Pairs outside the days the feed serves, which cannot be
+            fetched
+    """
+
+    requested: list[Pair] = field(default_factory=list)
+    present: list[Pair] = field(default_factory=list)
+    fetched: list[Pair] = field(default_factory=list)
+    failed: dict[Pair, str] = field(default_factory=dict)
+    unavailable: list[Pair] = field(default_factory=list)
+
+    @property
+    def missing(self) -> list[Pair]:
+        """Pairs still not stored after the run."""
+        return [*self.failed, *self.unavailable]
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of requested pairs now stored (1.0 when none requested)."""
+        if not self.requested:
+            return 1.0
+        return (len(self.present) + len(self.fetched)) / len(self.requested)
+
+
+def days_between(start: date, end: date) -> list[date]:
+    """Return every date from ``start`` to ``end`` inclusive."""
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def backfill(
+    queries: Iterable[Query],
+    start: date,
+    end: date | None = None,
+    store: DirectoryStore | None = None,
+    workers: int = 8,
+    client: Callable[[], FuelWatch] = FuelWatch,
+) -> Coverage:
+    """Fetch the (query, day) pairs missing from a store, concurrently.
+
+    Args:
+        queries: Queries to cover, e.g. from :meth:`Query.grid`.
+        start: First day to cover.
+        end: Last day to cover. Defaults to today.
+        store: Where responses are kept. Defaults to ``./fuelwatch-data``.
+        workers: Number of concurrent requests.
+        client: Factory for the FuelWatch client used by each worker thread.
+
+    Returns:
+        Coverage report for the requested range.
+
+    Example:
+        >>> queries = Query.grid(products=[1, 4], regions=[25, 26, 27])
+        >>> report = backfill(queries, start=date.today() - timedelta(days=6))
+        >>> print(f"{report.ratio:.0%} covered, missing {report.missing}")
+    """
+    current = today()
+    end = end or current
+    store = store or DirectoryStore("fuelwatch-data")
+    oldest = current - timedelta(days=MAX_AGE_DAYS)
+
+    report = Coverage()
+    todo: list[Pair] = []
+    for query in queries:
+        for day in days_between(start, end):
+            pair = (query, day)
+            report.requested.append(pair)
+            if store.has(query, day):
+                report.present.append(pair)
+            elif day < oldest or day > current:
+                report.unavailable.append(pair)
+            else:
+                todo.append(pair)
+
+    local = threading.local()
+
+    def fetch(pair: Pair) -> bytes:
+        api = getattr(local, "api", None)
+        if api is None:
+            api = local.api = client()
+        query, day = pair
+        return api.query(**query.params(day=day.strftime("%d/%m/%Y")))
+
+    logger.info("Backfilling %d of %d pairs", len(todo), len(report.requested))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, pair): pair for pair in todo}
+        for future in as_completed(futures):
+            pair = futures[future]
+            try:
+                store.put(*pair, future.result())
+            except FuelWatchError as e:
+                logger.warning("Backfill of %s on %s failed: %s", *pair, e)
+                report.failed[pair] = str(e)
+                continue
+            report.fetched.append(pair)
+
+    return report
@@ -1,3 +1,8 @@
+from datetime import timedelta, timezone
+
+# FuelWatch publishes prices on Western Australian time (no daylight saving).
+TIMEZONE = timezone(timedelta(hours=8), "AWST")
+
 PRODUCT = {
     1: "Unleaded Petrol",
     2: "Premium Unleaded",
@@ -0,0 +1,187 @@
+"""
+Minimal suburb query covers.
+
+A ``query(suburb=..., surrounding=True)`` also returns the suburbs around the
+one asked for. Querying every target suburb this way fetches the same stations
+many times over. A :class:`Neighbourhoods` cache records which suburbs each
+surrounding query has returned before. :func:`plan_cover` then picks a small
+set of queries whose neighbourhoods cover every target, using greedy set cover
+with lazily re-evaluated gains. :func:`fetch_cover` runs that plan and
+deduplicates the stations.
+
+Neighbourhoods are learnt from the stations in a response, so a suburb without
+any station selling the product is not seen. Each new observation is merged
+into the cache, so coverage grows as more products and days are fetched.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import heapq
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Self
+
+from fuelwatcher.files import atomic_write
+from fuelwatcher.fuelwatch import FuelWatch
+from fuelwatcher.models import FuelStation
+
+
+class Neighbourhoods:
+    """Suburbs returned by past surrounding queries, keyed by queried suburb.
+
+    Suburbs are compared case-insensitively; queried suburbs keep the
+    spelling used for the query.
+    """
+
+    def __init__(self, neighbourhoods: dict[str, Iterable[str]] | None = None) -> None:
+        self._covers: dict[str, set[str]] = {}
+        for suburb, covered in (neighbourhoods or {}).items():
+            self.add(suburb, covered)
+
+    def add(self, suburb: str, covered: Iterable[str]) -> None:
+        """Merge suburbs observed for a surrounding query of ``suburb``."""
+        self._covers.setdefault(suburb, {suburb.upper()}).update(
+            name.upper() for name in covered
+        )
+
+    def record(self, suburb: str, stations: Iterable[FuelStation]) -> None:
+        """Learn a neighbourhood from the stations a query returned."""
+        self.add(suburb, (station.location for station in stations))
+
+    def get(self, suburb: str) -> frozenset[str]:
+        """Return the suburbs known to be covered by querying ``suburb``."""
+        return frozenset(self._covers.get(suburb, {suburb.upper()}))
+
+    def __contains__(self, suburb: object) -> bool:
+        return suburb in self._covers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._covers)
+
+    def __len__(self) -> int:
+        return len(self._covers)
+
+    def to_dict(self) -> dict[str, list[str]]:
+        """Return a JSON-serializable copy of the cache."""
+        return {suburb: sorted(covered) for suburb, covered in self._covers.items()}
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Atomically write the cache to a JSON file."""
+        with atomic_write(path) as f:
+            f.write(json.dumps(self.to_dict()).encode())
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        """Read a cache written by :meth:`save`; empty if the file is missing."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+
+def plan_cover(targets: Iterable[str], neighbourhoods: Neighbourhoods) -> list[str]:
+    """Return a near-minimal list of suburbs whose queries cover ``targets``.
+
+    Any known neighbourhood may be picked, including suburbs that are not
+    themselves targets. A target no known neighbourhood covers is queried
+    directly. Greedy set cover is within a factor of ln(n) of optimal.
+
+    Args:
+        targets: Suburbs that must be covered.
+        neighbourhoods: Neighbourhoods learnt from earlier responses.
+
+    Returns:
+        Suburbs to query with ``surrounding=True``, in the order picked.
+    """
+    targets = list(dict.fromkeys(targets))
+    uncovered = {suburb.upper() for suburb in targets}
+    candidates = {suburb: neighbourhoods.get(suburb) for suburb in neighbourhoods}
+    for suburb in targets:
+        candidates.setdefault(suburb, neighbourhoods.get(suburb))
+
+    # Gains only shrink as suburbs get covered, so a stale heap entry is
+    # re-scored when popped and pushed back if it no longer beats the next.
+    heap = [(-len(covers & uncovered), suburb) for suburb, covers in candidates.items()]
+    heapq.heapify(heap)
+    plan: list[str] = []
+    while uncovered and heap:
+        _, suburb = heapq.heappop(heap)
+        gain = len(candidates[suburb] & uncovered)
+        if not gain:
+            continue
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, suburb))
+            continue
+        plan.append(suburb)
+        uncovered -= candidates[suburb]
+    return plan
+
+
+@dataclass(slots=True)
+class CoverResult:
+    """Outcome of :func:`fetch_cover`.
+
+    Attributes:
+        stations: Stations in the target suburbs, each listed once
+        queries: Suburbs queried, in order
+    """
+
+    stations: list[FuelStation] = field(default_factory=list)
+    queries: list[str] = field(default_factory=list)
+
+
+def fetch_cover(
+    targets: Iterable[str],
+    neighbourhoods: Neighbourhoods | None = None,
+    client: Callable[[], FuelWatch] = FuelWatch,
+    workers: int = 8,
+    **filters: Any,
+) -> CoverResult:
+    """Fetch every station in ``targets`` with as few queries as possible.
+
+    The plan's queries run concurrently and their neighbourhoods are
+    recorded in ``neighbourhoods``. A planned target missing from a response
+    is taken to have no stations for the filters used.
+
+    Args:
+        targets: Suburbs to cover.
+        neighbourhoods: Cache to plan from and update. Pass the same cache
+            to later sweeps (or persist it with :meth:`Neighbourhoods.save`)
+            so they benefit from what this one learnt.
+        client: Factory for the FuelWatch client used by each query.
+        workers: Concurrent queries.
+        **filters: Other :meth:`FuelWatch.query` arguments, e.g. ``product=1``.
+
+    Returns:
+        Deduplicated stations located in the target suburbs.
+
+    Example:
+        >>> cache = Neighbourhoods.load("neighbourhoods.json")
+        >>> result = fetch_cover(["Bayswater", "Morley", "Inglewood"], cache)
+        >>> cache.save("neighbourhoods.json")
+    """
+    targets = list(dict.fromkeys(targets))
+    wanted = {suburb.upper() for suburb in targets}
+    neighbourhoods = neighbourhoods if neighbourhoods is not None else Neighbourhoods()
+    result = CoverResult()
+    seen: dict[tuple[str, str], FuelStation] = {}
+
+    def fetch(suburb: str) -> list[FuelStation]:
+        api = client()
+        api.query(suburb=suburb, surrounding=True, **filters)
+        return api.stations
+
+    result.queries = plan_cover(targets, neighbourhoods)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        responses = pool.map(fetch, result.queries)
+        for suburb, stations in zip(result.queries, responses, strict=True):
+            neighbourhoods.record(suburb, stations)
+            for station in stations:
+                if station.location.upper() in wanted:
+                    seen.setdefault(station.key, station)
+    result.stations = list(seen.values())
+    return result
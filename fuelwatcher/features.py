@@ -0,0 +1,214 @@
+"""
+Structured parsing of station site features and descriptions.
+
+``FuelStation.site_features`` and ``description`` are free text. This module
+parses them once into a normalized feature vocabulary and structured address
+and phone parts, memoizing results for text already seen (feeds repeat the
+same strings every poll). :class:`FeatureIndex` turns a snapshot into one
+bitset per feature, so feature filters become bitwise ANDs.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+
+from fuelwatcher.models import FuelStation
+
+# Canonical feature name -> pattern matching its spellings in the feed.
+VOCABULARY: dict[str, re.Pattern[str]] = {
+    name: re.compile(pattern, re.IGNORECASE)
+    for name, pattern in {
+        "open_24_hours": r"^(?:open\s*)?24\s*(?:hours?|hrs?)(?:\s*open)?$",
+        "eftpos": r"^eftpos$",
+        "atm": r"^atm$",
+        "car_wash": r"^car\s*wash$",
+        "air": r"^(?:free\s*)?air(?:\s*(?:and|&)\s*water)?$",
+        "toilets": r"^(?:toilets?|restrooms?)$",
+        "convenience_store": r"^(?:convenience\s*)?store$|^convenience$",
+        "cafe": r"^caf[eé]$|^coffee$",
+        "food": r"^(?:food|hot\s*food|restaurant)$",
+        "gas_bottles": r"^(?:gas\s*bottles?|swap\s*(?:and|&)\s*go)",
+        "trailer_hire": r"^trailer\s*hire$",
+        "truck_stop": r"^truck\s*(?:stop|parking)$",
+        "adblue": r"^ad\s*blue$",
+        "lpg": r"^lpg$",
+        "ev_charging": r"^(?:ev|electric\s*vehicle)\s*charg",
+    }.items()
+}
+
+_SPLIT_RE = re.compile(r"\s*[,;]\s*")
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_DESCRIPTION_RE = re.compile(
+    r"^\s*(?:Address:\s*(?P<street>[^,]*?)\s*,\s*(?P<suburb>[^,]*?)\s*(?:,|$))?"
+    r"(?:\s*Phone:\s*(?P<phone>[^,]*?)\s*(?:,|$))?"
+    r"(?P<rest>.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_PHONE_RE = re.compile(r"^\(?(?P<area>0\d)\)?\s*(?P<local>\d{4}\s*\d{4})$")
+
+
+@dataclass(frozen=True, slots=True)
+class Description:
+    """Structured parts of a station description.
+
+    Attributes:
+        street: Street address (may be None)
+        suburb: Suburb name (may be None)
+        phone: Phone number as written (may be None)
+        area_code: Two-digit phone area code, e.g. "08" (may be None)
+        local_number: Eight-digit local number without spaces (may be None)
+        features: Normalized features mentioned in the description
+    """
+
+    street: str | None
+    suburb: str | None
+    phone: str | None
+    area_code: str | None
+    local_number: str | None
+    features: frozenset[str]
+
+
+@lru_cache(maxsize=1024)
+def normalize_feature(text: str) -> str:
+    """Map one feature phrase to its canonical name.
+
+    Phrases outside :data:`VOCABULARY` are slugified, e.g. "Pie Shop" becomes
+    "pie_shop", so new features are still indexable.
+    """
+    text = text.strip()
+    for name, pattern in VOCABULARY.items():
+        if pattern.search(text):
+            return name
+    return _SLUG_RE.sub("_", text.lower()).strip("_")
+
+
+@lru_cache(maxsize=4096)
+def parse_features(text: str | None) -> frozenset[str]:
+    """Parse a comma-separated feature list into canonical feature names.
+
+    Args:
+        text: ``site_features`` text, e.g. ", Open 24 hours, EFTPOS".
+
+    Returns:
+        Set of canonical feature names.
+    """
+    if not text:
+        return frozenset()
+    names = (normalize_feature(part) for part in _SPLIT_RE.split(text))
+    return frozenset(name for name in names if name)
+
+
+@lru_cache(maxsize=4096)
+def parse_description(text: str | None) -> Description:
+    """Parse a station description into address, phone and features.
+
+    Args:
+        text: ``description`` text, e.g.
+            "Address: 502 Guildford Rd, BAYSWATER, Phone: (08) 9272 1133".
+
+    Returns:
+        Description with the parts that could be found.
+    """
+    match = _DESCRIPTION_RE.match(text or "")
+    if match is None:  # pragma: no cover - every group is optional
+        return Description(None, None, None, None, None, frozenset())
+    phone = match["phone"] or None
+    area_code = local_number = None
+    if phone:
+        phone_match = _PHONE_RE.match(phone)
+        if phone_match:
+            area_code = phone_match["area"]
+            local_number = phone_match["local"].replace(" ", "")
+    return Description(
+        street=match["street"] or None,
+        suburb=match["suburb"] or None,
+        phone=phone,
+        area_code=area_code,
+        local_number=local_number,
+        features=parse_features(match["rest"]),
+    )
+
+
+def station_features(station: FuelStation) -> frozenset[str]:
+    """Return all normalized features of a station.
+
+    Combines ``site_features`` with any features listed in ``description``.
+    """
+    return parse_features(station.site_features) | (
+        parse_description(station.description).features
+    )
+
+
+class FeatureIndex:
+    """Per-feature bitset index over one snapshot of stations.
+
+    Bit ``i`` of a feature's bitset is set when ``stations[i]`` has that
+    feature, so combining filters is a bitwise AND over Python integers.
+
+    Example:
+        >>> index = FeatureIndex(api.stations)
+        >>> index.filter("open_24_hours", "eftpos", "car_wash")
+    """
+
+    def __init__(self, stations: Iterable[FuelStation]) -> None:
+        """Build the index.
+
+        Args:
+            stations: Snapshot to index, e.g. ``api.stations``.
+        """
+        self._stations = list(stations)
+        self._all = (1 << len(self._stations)) - 1
+        size = (len(self._stations) + 7) // 8
+        bitmaps: dict[str, bytearray] = {}
+        for i, station in enumerate(self._stations):
+            for name in station_features(station):
+                bitmap = bitmaps.get(name)
+                if bitmap is None:
+                    bitmap = bitmaps[name] = bytearray(size)
+                bitmap[i >> 3] |= 1 << (i & 7)
+        self.bitsets: dict[str, int] = {
+            name: int.from_bytes(bitmap, "little") for name, bitmap in bitmaps.items()
+        }
+
+    @property
+    def features(self) -> frozenset[str]:
+        """Every feature present in the snapshot."""
+        return frozenset(self.bitsets)
+
+    def mask(self, *features: str) -> int:
+        """Return the bitset of stations having all of ``features``.
+
+        Features are canonical names or raw phrases such as "Car Wash".
+        """
+        mask = self._all
+        for feature in features:
+            mask &= self.bitsets.get(normalize_feature(feature), 0)
+            if not mask:
+                break
+        return mask
+
+    def select(self, mask: int) -> list[FuelStation]:
+        """Return the stations whose bits are set in ``mask``."""
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self._stations[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def filter(self, *features: str) -> list[FuelStation]:
+        """Return stations having all of ``features``, in snapshot order."""
+        return self.select(self.mask(*features))
+
+    def count(self, *features: str) -> int:
+        """Return how many stations have all of ``features``."""
+        return self.mask(*features).bit_count()
+
+    def __len__(self) -> int:
+        return len(self._stations)
+
+    def __iter__(self) -> Iterator[FuelStation]:
+        return iter(self._stations)
@@ -0,0 +1,44 @@
+"""
+Crash-safe file writes.
+
+:func:`atomic_write` writes to a temporary file in the target directory,
+flushes it to disk and renames it over the target. Readers see either the
+old file or the complete new one, never a partial write.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import os
+import tempfile
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+
+@contextmanager
+def atomic_write(path: str | os.PathLike[str]) -> Generator[BinaryIO]:
+    """Open ``path`` for binary writing, replacing it only on success.
+
+    Missing parent directories are created. If the block raises, the target
+    is left untouched and the temporary file is removed.
+
+    Args:
+        path: File to write.
+
+    Example:
+        >>> with atomic_write("state.json") as f:
+        ...     f.write(json.dumps(state).encode())
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -10,17 +10,23 @@ Australian governments Fuel Watch initiative.
 import json
 import logging
 import warnings
-from collections.abc import Mapping
-from xml.etree import ElementTree
+from collections.abc import AsyncIterator, Iterable, Mapping
 
 import requests
 from fake_useragent import UserAgent
 
 from fuelwatcher import BRAND, PRODUCT, REGION, SUBURB
-from fuelwatcher.models import FuelStation, FuelWatchError
+from fuelwatcher.hedging import HedgePolicy
+from fuelwatcher.models import FuelStation, FuelWatchError, Query
+from fuelwatcher.parsers import BACKENDS, Parser, get_parser
+from fuelwatcher.views import StationView, parse_views
+from fuelwatcher.watch import Change, Watcher
 
 logger = logging.getLogger(__name__)
 
+# Elements FuelStation keeps as None when missing; the others become "".
+_NULLABLE = frozenset({"phone", "site-features"})
+
 
 class FuelWatch:
     """Client for FuelWatch RSS Feed.
@@ -39,6 +45,8 @@ class FuelWatch:
         region: Mapping[int, str] = REGION,
         brand: Mapping[int, str] = BRAND,
         suburb: list[str] = SUBURB,
+        parser: str | Parser | None = None,
+        hedge: HedgePolicy | None = None,
     ) -> None:
         """Initialize FuelWatch client.
 
@@ -48,16 +56,30 @@ class FuelWatch:
             region: Valid region ID mapping (for validation)
             brand: Valid brand ID mapping (for validation)
             suburb: Valid suburb names list (for validation)
+            parser: XML parser backend name ('lxml', 'etree' or 'expat') or
+                instance. Defaults to $FUELWATCHER_PARSER, else lxml if
+                installed, otherwise etree.
+            hedge: Optional policy that duplicates requests slower than usual
+                and takes the first answer. Share one policy between clients
+                so they draw from the same hedge budget.
+
+        Raises:
+            FuelWatchError: If the parser backend is unknown or unavailable.
         """
         self.url: str = url
         self._product: Mapping[int, str] = product
         self._region: Mapping[int, str] = region
         self._brand: Mapping[int, str] = brand
         self._suburb: list[str] = suburb
+        self._hedge: HedgePolicy | None = hedge
+        self._parser: Parser = get_parser(parser)
         self._json: str | None = None
         self._xml: list[dict[str, str | None]] | None = None
         self._raw: bytes | None = None
         self._stations: list[FuelStation] | None = None
+        self._views: list[StationView] | None = None
+        # Elements missing from a compacted response, by station index.
+        self._missing: dict[int, tuple[str, ...]] = {}
         self._ua = UserAgent()
 
     @staticmethod
@@ -130,10 +152,7 @@ class FuelWatch:
         self._validate_region(region)
         self._validate_suburb(suburb)
 
-        # Reset cached data
-        self._xml = None
-        self._json = None
-        self._stations = None
+        self._reset()
 
         # Handle bool surrounding parameter
         surrounding_str: str | None = None
@@ -152,14 +171,11 @@ class FuelWatch:
         }
 
         try:
-            response = requests.get(
-                self.url,
-                timeout=30,
-                params=payload,
-                headers={"User-Agent": self._ua.random},
-            )
-            response.raise_for_status()
-            self._raw = response.content
+            if self._hedge is None:
+                self._raw = self._get(payload)
+            else:
+                kind = ",".join(k for k, v in payload.items() if v is not None)
+                self._raw = self._hedge.call(kind or "all", lambda: self._get(payload))
             return self._raw
         except requests.HTTPError as e:
             logger.warning(
@@ -173,33 +189,130 @@ class FuelWatch:
             logger.exception("Failed to retrieve response from FuelWatch")
             raise FuelWatchError(f"Request failed: {e}") from e
 
+    def _get(self, payload: dict[str, str | int | None]) -> bytes:
+        """Fetch the feed once, raising for HTTP error statuses."""
+        response = requests.get(
+            self.url,
+            timeout=30,
+            params=payload,
+            headers={"User-Agent": self._ua.random},
+        )
+        response.raise_for_status()
+        return response.content
+
+    def _reset(self) -> None:
+        """Drop data derived from a previous response."""
+        self._xml = None
+        self._json = None
+        self._stations = None
+        self._views = None
+        self._missing = {}
+
+    def load(self, raw: bytes) -> None:
+        """Load a previously retrieved RSS response instead of querying.
+
+        Args:
+            raw: Raw RSS XML bytes, as returned by :meth:`query`.
+        """
+        self._reset()
+        self._raw = raw
+
+    def compact(self, keep_raw: bool = False) -> list[FuelStation]:
+        """Build :attr:`stations` and drop every other cached representation.
+
+        The raw bytes, parsed dicts, JSON string and lazy views of a response
+        together take several times the memory of the stations alone.
+        Long-lived clients that only need stations can release the rest.
+        :attr:`xml` and :attr:`json` still work afterwards, rebuilt from the
+        stations on demand, and elements missing from the response are still
+        None there. :attr:`raw` is None unless ``keep_raw`` is set.
+
+        Args:
+            keep_raw: Keep the raw response bytes.
+
+        Returns:
+            The retained stations.
+
+        Raises:
+            FuelWatchError: If no data available (query() not called).
+        """
+        stations = self.stations
+        if self._xml is not None:
+            for i, item in enumerate(self._xml):
+                missing = tuple(
+                    key
+                    for key, value in item.items()
+                    if value is None and key not in _NULLABLE
+                )
+                if missing:
+                    self._missing[i] = missing
+        self._xml = None
+        self._json = None
+        self._views = None
+        if not keep_raw:
+            self._raw = None
+        return stations
+
+    async def watch(
+        self,
+        queries: Iterable[Query],
+        interval: float = 60.0,
+        queue_size: int = 1000,
+        day: str | None = None,
+    ) -> AsyncIterator[Change]:
+        """Yield added, removed and repriced stations as they change.
+
+        Polls each query every ``interval`` seconds with its own client
+        configured like this one. The first poll sets the baseline. To share
+        polls between many consumers, use :class:`~fuelwatcher.watch.Watcher`.
+
+        Args:
+            queries: Queries to watch.
+            interval: Seconds between polls of each query.
+            queue_size: Maximum changes buffered before polling pauses.
+            day: Day filter passed to every query.
+
+        Example:
+            >>> async for change in api.watch([Query(product=1, region=25)]):
+            ...     print(change.kind, change.station.trading_name)
+        """
+        watcher = Watcher(self._clone, interval, queue_size, day)
+        try:
+            async for change in watcher.subscribe(queries):
+                yield change
+        finally:
+            await watcher.close()
+
+    def _clone(self) -> "FuelWatch":
+        """Return a new client with this client's configuration.
+
+        Built-in parser backends are recreated, since their parsers must not
+        be shared between threads.
+        """
+        parser: str | Parser = self._parser
+        if type(parser) is BACKENDS.get(parser.name):
+            parser = parser.name
+        return type(self)(
+            url=self.url,
+            product=self._product,
+            region=self._region,
+            brand=self._brand,
+            suburb=self._suburb,
+            parser=parser,
+            hedge=self._hedge,
+        )
+
     def _parse_xml(self) -> list[dict[str, str | None]]:
         """Parse raw XML response into list of dictionaries."""
         if self._raw is None:
+            if self._stations is not None:  # compacted
+                items = [station.to_dict() for station in self._stations]
+                for i, missing in self._missing.items():
+                    items[i].update(dict.fromkeys(missing))
+                return items
             raise FuelWatchError("No data available. Call query() first.")
 
-        dom = ElementTree.fromstring(self._raw)
-        items = dom.findall("channel/item")
-
-        result: list[dict[str, str | None]] = []
-        for elem in items:
-            d = {
-                "title": elem.findtext("title"),
-                "description": elem.findtext("description"),
-                "brand": elem.findtext("brand"),
-                "date": elem.findtext("date"),
-                "price": elem.findtext("price"),
-                "trading-name": elem.findtext("trading-name"),
-                "location": elem.findtext("location"),
-                "address": elem.findtext("address"),
-                "phone": elem.findtext("phone"),
-                "latitude": elem.findtext("latitude"),
-                "longitude": elem.findtext("longitude"),
-                "site-features": elem.findtext("site-features"),
-            }
-            result.append(d)
-
-        return result
+        return self._parser.parse(self._raw)
 
     @property
     def raw(self) -> bytes | None:
@@ -256,6 +369,31 @@ class FuelWatch:
             self._stations = [FuelStation.from_xml_dict(d) for d in self.xml]
         return self._stations
 
+    @property
+    def station_views(self) -> list[StationView]:
+        """List of lazy StationView instances over the raw response.
+
+        A lighter alternative to :attr:`stations` when only a few fields are
+        read: items are located by byte offset without building an element
+        tree, and each field is decoded from :attr:`raw` on first access.
+
+        Returns:
+            List of StationView instances with FuelStation's attributes.
+
+        Raises:
+            FuelWatchError: If no data available (query() not called).
+
+        Example:
+            >>> api.query(product=1)
+            >>> cheapest = min(api.station_views, key=lambda s: float(s.price))
+            >>> cheapest.to_station()
+        """
+        if self._views is None:
+            if self._raw is None:
+                raise FuelWatchError("No data available. Call query() first.")
+            self._views = parse_views(self._raw)
+        return self._views
+
     @property
     def get_raw(self) -> bytes | None:
         """Return raw RSS response.
@@ -0,0 +1,245 @@
+"""
+Hedged requests for cutting tail latency.
+
+Most FuelWatch responses arrive quickly, but a few stall for seconds. With a
+:class:`HedgePolicy`, a request still unanswered after the observed latency
+quantile for its kind of query (p90 by default) is duplicated. Whichever copy
+answers first wins.
+
+Hedges are paid for from a global token budget: every request adds
+``budget`` tokens and every hedge spends one. The extra upstream load is
+therefore capped at roughly ``budget`` times the request rate, plus a small
+burst.
+
+A losing attempt cannot be interrupted once it has started, so it keeps its
+worker thread until it finishes. The number of such stragglers is capped, and
+no new hedge is fired while the cap is reached, so they can never starve the
+pool of threads for fresh requests. The hedge delay is measured from the
+moment an attempt starts running, not from when it was queued.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import TypeVar
+
+from fuelwatcher.models import FuelWatchError
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class HedgeStats:
+    """Counters for tuning a hedge policy.
+
+    Attributes:
+        requests: Calls made through the policy
+        hedged: Calls that fired a duplicate request
+        wins: Hedged calls answered first by the duplicate
+        losses: Hedged calls answered first by the original anyway
+        skipped: Calls that were due a hedge but the budget was exhausted
+            or too many losing attempts were still running
+    """
+
+    requests: int = 0
+    hedged: int = 0
+    wins: int = 0
+    losses: int = 0
+    skipped: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Fraction of requests that were hedged."""
+        return self.hedged / self.requests if self.requests else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """Fraction of decided hedges won by the duplicate."""
+        decided = self.wins + self.losses
+        return self.wins / decided if decided else 0.0
+
+
+class HedgePolicy:
+    """Adaptive hedging shared by any number of clients and threads.
+
+    Args:
+        quantile: Latency quantile after which a request is hedged.
+        budget: Hedge tokens earned per request, i.e. the long-run fraction
+            of requests that may be hedged.
+        burst: Maximum tokens that can accumulate.
+        window: Recent latencies kept per query kind.
+        min_samples: Samples needed before the quantile is trusted;
+            ``initial_delay`` is used until then.
+        initial_delay: Hedge delay in seconds for query kinds with too few
+            samples.
+        min_delay: Lower bound for the hedge delay.
+        max_workers: Threads available for concurrent attempts.
+        max_losers: Losing attempts allowed to run on after their call has
+            returned. Defaults to half of ``max_workers``.
+
+    Example:
+        >>> policy = HedgePolicy(quantile=0.9, budget=0.05)
+        >>> api = FuelWatch(hedge=policy)
+        >>> api.query(product=1, region=25)
+        >>> policy.stats().win_rate
+    """
+
+    def __init__(
+        self,
+        quantile: float = 0.9,
+        budget: float = 0.05,
+        burst: float = 10.0,
+        window: int = 256,
+        min_samples: int = 20,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.05,
+        max_workers: int = 32,
+        max_losers: int | None = None,
+    ) -> None:
+        if not 0.0 < quantile < 1.0:
+            raise FuelWatchError(f"Invalid hedge quantile: {quantile}")
+        if budget < 0 or burst < 0:
+            raise FuelWatchError("Hedge budget must not be negative")
+        self.quantile = quantile
+        self.budget = budget
+        self.burst = burst
+        self.window = window
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_losers = max_workers // 2 if max_losers is None else max_losers
+        self._losers = 0
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+        self._tokens = burst
+        self._stats = HedgeStats()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="fuelwatcher-hedge"
+        )
+
+    def delay(self, key: str) -> float:
+        """Return the current hedge delay in seconds for a query kind."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        index = min(len(samples) - 1, int(self.quantile * len(samples)))
+        return max(self.min_delay, samples[index])
+
+    def thresholds(self) -> dict[str, float]:
+        """Return the hedge delay of every query kind seen so far."""
+        with self._lock:
+            keys = list(self._samples)
+        return {key: self.delay(key) for key in keys}
+
+    def stats(self) -> HedgeStats:
+        """Return a snapshot of the hedge counters."""
+        with self._lock:
+            return self._stats
+
+    def _count(self, **increments: int) -> None:
+        stats = self._stats
+        self._stats = HedgeStats(
+            **{
+                name: getattr(stats, name) + increments.get(name, 0)
+                for name in HedgeStats.__slots__
+            }
+        )
+
+    def _observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def _submit(
+        self, key: str, fn: Callable[[], T]
+    ) -> tuple["Future[T]", threading.Event]:
+        """Queue an attempt; the event is set once a worker starts it."""
+        started = threading.Event()
+
+        def timed() -> T:
+            started.set()
+            start = time.perf_counter()
+            result = fn()
+            self._observe(key, time.perf_counter() - start)
+            return result
+
+        return self._pool.submit(timed), started
+
+    def _abandon(self, future: "Future[T]") -> None:
+        """Track a losing attempt until it finishes."""
+        if future.cancel():
+            return
+        with self._lock:
+            self._losers += 1
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future: "Future[T]") -> None:
+        with self._lock:
+            self._losers -= 1
+
+    def call(self, key: str, fn: Callable[[], T]) -> T:
+        """Call ``fn``, hedging it if it is slower than usual for ``key``.
+
+        Only successful attempts count towards the latency distribution. If
+        one attempt fails, the other is still awaited, and the first error is
+        raised only when both fail. A losing attempt already in flight cannot
+        be interrupted; its result is discarded when it finishes. No hedge is
+        fired while ``max_losers`` such attempts are still running.
+
+        Args:
+            key: Query kind whose latencies set the hedge delay.
+            fn: Blocking function to call, safe to run twice concurrently.
+
+        Returns:
+            Result of whichever attempt succeeded first.
+        """
+        with self._lock:
+            self._count(requests=1)
+            self._tokens = min(self.burst, self._tokens + self.budget)
+        primary, started = self._submit(key, fn)
+        started.wait()  # time spent queued for a worker is not latency
+        try:
+            return primary.result(timeout=self.delay(key))
+        except FutureTimeout:
+            pass
+
+        with self._lock:
+            allowed = self._tokens >= 1.0 and self._losers < self.max_losers
+            if allowed:
+                self._tokens -= 1.0
+                self._count(hedged=1)
+            else:
+                self._count(skipped=1)
+        if not allowed:
+            return primary.result()
+
+        hedge, _ = self._submit(key, fn)
+        pending: set[Future[T]] = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = future.exception()
+                if exc is not None:
+                    error = error or exc
+                    continue
+                for other in pending:
+                    self._abandon(other)
+                with self._lock:
+                    self._count(**{"wins" if future is hedge else "losses": 1})
+                return future.result()
+        assert error is not None
+        raise error
+
+    def close(self) -> None:
+        """Release the worker threads once in-flight attempts finish."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,237 @@
+"""
+Materialized cheapest-station leaderboards.
+
+:class:`Leaderboards` keeps one board per (product, region, brand, day).
+Each board is a list of ``(price, station key)`` pairs kept sorted with
+``bisect``, plus an any-brand board per (product, region, day). Folding in a
+new snapshot compares each station with what the board already holds:
+
+- unchanged stations cost one dict lookup
+- a repriced station moves only its own two entries
+- stations missing from the snapshot are removed
+
+Reading the k cheapest is a slice of the front of a sorted list, so it costs
+O(k) with no sorting. The latest day recorded for each (product, region) is
+indexed, and :meth:`Leaderboards.prune` drops days that are no longer needed.
+
+Writers hold a lock, and readers take the same lock only for the length of a
+slice. :meth:`Leaderboards.view` returns a read-only handle that can be
+shared with request handlers.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import math
+import threading
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from typing import NamedTuple, Self
+
+from fuelwatcher.models import FuelStation, StationKey, to_float
+
+# (product, region, brand, day); None is a wildcard for brand only.
+BoardKey = tuple[int | None, int | None, str | None, str]
+
+Scope = tuple[int | None, int | None, str]
+
+
+class Ranked(NamedTuple):
+    """A leaderboard position."""
+
+    price: float
+    station: FuelStation
+
+
+class Leaderboards:
+    """Incrementally maintained top-k boards over fetched snapshots.
+
+    Example:
+        >>> boards = Leaderboards()
+        >>> api.query(product=1, region=25)
+        >>> boards.update(api.stations, product=1, region=25)
+        >>> boards.top(10, product=1, region=25, day="2024-01-09")
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._boards: dict[BoardKey, list[tuple[float, StationKey]]] = {}
+        # What each snapshot scope currently contributes, by station key.
+        self._scopes: dict[Scope, dict[StationKey, tuple[float, FuelStation]]] = {}
+        # Latest day with a non-empty scope, by (product, region).
+        self._latest: dict[tuple[int | None, int | None], str] = {}
+
+    @classmethod
+    def from_stations(
+        cls,
+        stations: Iterable[FuelStation],
+        product: int | None = None,
+        region: int | None = None,
+    ) -> Self:
+        """Build boards from any collection of stations."""
+        boards = cls()
+        boards.update(stations, product=product, region=region)
+        return boards
+
+    def _insert(self, scope: Scope, brand: str, key: StationKey, price: float) -> None:
+        product, region, day = scope
+        for board_key in ((product, region, brand, day), (product, region, None, day)):
+            insort(self._boards.setdefault(board_key, []), (price, key))
+
+    def _remove(self, scope: Scope, brand: str, key: StationKey, price: float) -> None:
+        product, region, day = scope
+        for board_key in ((product, region, brand, day), (product, region, None, day)):
+            board = self._boards[board_key]
+            del board[bisect_left(board, (price, key))]
+            if not board:
+                del self._boards[board_key]
+
+    def _reindex(self, product: int | None, region: int | None) -> None:
+        days = [d for p, r, d in self._scopes if (p, r) == (product, region)]
+        if days:
+            self._latest[(product, region)] = max(days)
+        else:
+            self._latest.pop((product, region), None)
+
+    def update(
+        self,
+        stations: Iterable[FuelStation],
+        product: int | None = None,
+        region: int | None = None,
+        day: str | None = None,
+    ) -> int:
+        """Fold a snapshot of stations into the boards.
+
+        The snapshot replaces whatever was previously recorded for the same
+        (product, region, day): stations it no longer lists are dropped. When
+        ``day`` is given an empty snapshot clears that day.
+
+        Args:
+            stations: Stations from one query.
+            product: Product the stations were queried for.
+            region: Region the stations were queried for.
+            day: Day the prices apply to. Defaults to each station's date.
+
+        Returns:
+            Number of stations added, repriced or removed.
+        """
+        snapshots: dict[Scope, dict[StationKey, tuple[float, FuelStation]]] = {}
+        if day is not None:
+            snapshots[(product, region, day)] = {}
+        for station in stations:
+            price = to_float(station.price)
+            if math.isnan(price):
+                continue
+            scope = (product, region, day or station.date)
+            snapshots.setdefault(scope, {})[station.key] = (price, station)
+
+        changed = 0
+        with self._lock:
+            for scope, new in snapshots.items():
+                old = self._scopes.get(scope, {})
+                for key, (price, station) in old.items():
+                    if key not in new:
+                        self._remove(scope, station.brand, key, price)
+                        changed += 1
+                for key, (price, station) in new.items():
+                    before = old.get(key)
+                    if before is not None:
+                        if before[0] == price and before[1].brand == station.brand:
+                            continue
+                        self._remove(scope, before[1].brand, key, before[0])
+                    self._insert(scope, station.brand, key, price)
+                    changed += 1
+                if new:
+                    self._scopes[scope] = new
+                    latest = self._latest.get(scope[:2])
+                    if latest is None or scope[2] > latest:
+                        self._latest[scope[:2]] = scope[2]
+                elif old:
+                    del self._scopes[scope]
+                    self._reindex(*scope[:2])
+        return changed
+
+    def top(
+        self,
+        k: int,
+        product: int | None = None,
+        region: int | None = None,
+        brand: str | None = None,
+        day: str | None = None,
+    ) -> list[Ranked]:
+        """Return the ``k`` cheapest stations on a board, cheapest first.
+
+        Args:
+            k: Number of stations.
+            product: Product the snapshots were recorded under.
+            region: Region the snapshots were recorded under.
+            brand: Brand to restrict to, or None for every brand.
+            day: Day the prices apply to, e.g. "2024-01-09". Defaults to the
+                latest day recorded for the product and region.
+        """
+        with self._lock:
+            if day is None:
+                day = self._latest.get((product, region))
+                if day is None:
+                    return []
+            entries = self._boards.get((product, region, brand, day), [])[:k]
+            stations = self._scopes.get((product, region, day), {})
+            return [Ranked(price, stations[key][1]) for price, key in entries]
+
+    def keys(self) -> list[BoardKey]:
+        """Return the keys of every non-empty board."""
+        with self._lock:
+            return list(self._boards)
+
+    def prune(self, before: str) -> int:
+        """Drop every board for days earlier than ``before``.
+
+        Args:
+            before: First day to keep, e.g. "2024-01-09".
+
+        Returns:
+            Number of (product, region, day) snapshots dropped.
+        """
+        with self._lock:
+            stale = [scope for scope in self._scopes if scope[2] < before]
+            for scope in stale:
+                del self._scopes[scope]
+            for board_key in [k for k in self._boards if k[3] < before]:
+                del self._boards[board_key]
+            for product, region in {scope[:2] for scope in stale}:
+                self._reindex(product, region)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove every board, e.g. before rebuilding."""
+        with self._lock:
+            self._boards.clear()
+            self._scopes.clear()
+            self._latest.clear()
+
+    def view(self) -> "LeaderboardView":
+        """Return a read-only handle safe to share between threads."""
+        return LeaderboardView(self)
+
+
+class LeaderboardView:
+    """Read-only access to :class:`Leaderboards`."""
+
+    __slots__ = ("_boards",)
+
+    def __init__(self, boards: Leaderboards) -> None:
+        self._boards = boards
+
+    def top(
+        self,
+        k: int,
+        product: int | None = None,
+        region: int | None = None,
+        brand: str | None = None,
+        day: str | None = None,
+    ) -> list[Ranked]:
+        """Return the ``k`` cheapest stations, see :meth:`Leaderboards.top`."""
+        return self._boards.top(k, product, region, brand, day)
+
+    def keys(self) -> list[BoardKey]:
+        """Return the keys of every non-empty board."""
+        return self._boards.keys()
@@ -4,8 +4,11 @@ Data models and exceptions for FuelWatch.
 Copyright (C) 2018-2025, Daniel Michaels
 """
 
+import itertools
+import math
+from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import Self
+from typing import Any, Self
 
 
 class FuelWatchError(Exception):
@@ -14,6 +17,24 @@ class FuelWatchError(Exception):
     pass
 
 
+# Stable identity of a physical station, see FuelStation.key.
+StationKey = tuple[str, str]
+
+
+def to_float(value: str | None) -> float:
+    """Parse a numeric feed field such as a price or coordinate.
+
+    Returns:
+        The value, or NaN if it is missing or not a number.
+    """
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
 @dataclass(frozen=True, slots=True)
 class FuelStation:
     """Represents a single fuel station from FuelWatch.
@@ -46,6 +67,18 @@ class FuelStation:
     longitude: str
     site_features: str | None
 
+    @property
+    def key(self) -> StationKey:
+        """Stable identity of the physical station across queries.
+
+        Price, brand and trading name can change between products and days;
+        the site's suburb and street address do not.
+
+        Returns:
+            Tuple of upper-cased (location, address).
+        """
+        return (self.location.upper(), self.address.upper())
+
     def to_dict(self) -> dict[str, str | None]:
         """Convert to dictionary with hyphenated keys for backwards compatibility.
 
@@ -92,3 +125,67 @@ class FuelStation:
             longitude=data.get("longitude") or "",
             site_features=data.get("site-features"),
         )
+
+
+@dataclass(frozen=True, slots=True)
+class Query:
+    """A set of FuelWatch query filters, independent of the day.
+
+    Attributes:
+        product: Fuel type ID (may be None)
+        suburb: Suburb name (may be None)
+        region: Region ID (may be None)
+        brand: Brand ID (may be None)
+        surrounding: Include surrounding suburbs (may be None)
+    """
+
+    product: int | None = None
+    suburb: str | None = None
+    region: int | None = None
+    brand: int | None = None
+    surrounding: bool | None = None
+
+    def params(self, day: str | None = None) -> dict[str, Any]:
+        """Return keyword arguments for :meth:`FuelWatch.query`.
+
+        Args:
+            day: Optional day filter to include.
+        """
+        return {
+            "product": self.product,
+            "suburb": self.suburb,
+            "region": self.region,
+            "brand": self.brand,
+            "surrounding": self.surrounding,
+            "day": day,
+        }
+
+    @property
+    def slug(self) -> str:
+        """Stable, filesystem-safe identifier, e.g. "product-1_region-25"."""
+        parts = [
+            f"{name}-{value}"
+            for name, value in self.params().items()
+            if value is not None
+        ]
+        slug = "_".join(parts) or "all"
+        return "".join(c if c.isalnum() or c in "-_" else "+" for c in slug)
+
+    @classmethod
+    def grid(
+        cls,
+        products: Iterable[int | None] = (None,),
+        regions: Iterable[int | None] = (None,),
+        brands: Iterable[int | None] = (None,),
+        suburbs: Iterable[str | None] = (None,),
+        surrounding: bool | None = None,
+    ) -> list[Self]:
+        """Return every combination of the given filters.
+
+        Example:
+            >>> Query.grid(products=[1, 4], regions=[25, 26])  # 4 queries
+        """
+        return [
+            cls(product=p, suburb=s, region=r, brand=b, surrounding=surrounding)
+            for p, r, b, s in itertools.product(products, regions, brands, suburbs)
+        ]
@@ -0,0 +1,206 @@
+"""
+Pluggable XML parser backends for FuelWatch RSS responses.
+
+Every backend turns raw RSS bytes into the same list of station dictionaries
+(hyphenated keys, ``None`` for missing elements). Available backends:
+
+- ``lxml``: libxml2 via lxml, when installed
+- ``etree``: the standard library's ``xml.etree.ElementTree``
+- ``expat``: a streaming ``xml.parsers.expat`` event handler
+
+By default lxml is used if installed, otherwise ElementTree; the order
+follows ``benchmarks/bench_parsers.py``. Set the ``FUELWATCHER_PARSER``
+environment variable, or pass ``parser=`` to :class:`~fuelwatcher.FuelWatch`,
+to choose one explicitly.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import os
+from typing import Any, Protocol
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+from fuelwatcher.models import FuelWatchError
+
+try:
+    from lxml import etree as lxml_etree  # ty: ignore[unresolved-import]
+except ImportError:  # pragma: no cover - depends on environment
+    lxml_etree = None
+
+ENV_VAR = "FUELWATCHER_PARSER"
+
+# XML element names of the station fields, in feed order.
+FIELDS: tuple[str, ...] = (
+    "title",
+    "description",
+    "brand",
+    "date",
+    "price",
+    "trading-name",
+    "location",
+    "address",
+    "phone",
+    "latitude",
+    "longitude",
+    "site-features",
+)
+
+StationDict = dict[str, str | None]
+
+
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _from_tree(dom: Any) -> list[StationDict]:
+    """Extract station dicts from an ElementTree-compatible document.
+
+    Walks each item's children once instead of calling ``findtext()`` per
+    field, keeping its semantics: first match wins, missing text is "".
+    """
+    result: list[StationDict] = []
+    for elem in dom.iterfind("channel/item"):
+        item: StationDict = dict.fromkeys(FIELDS)
+        for child in elem:
+            tag = child.tag
+            if tag in _FIELD_SET and item[tag] is None:
+                item[tag] = child.text or ""
+        result.append(item)
+    return result
+
+
+class Parser(Protocol):
+    """Interface implemented by every parser backend."""
+
+    name: str
+
+    def parse(self, raw: bytes) -> list[StationDict]:
+        """Parse raw RSS bytes into station dictionaries.
+
+        Raises:
+            FuelWatchError: If the response is not well-formed XML.
+        """
+        ...
+
+
+class ElementTreeParser:
+    """Parse with the standard library's ElementTree."""
+
+    name = "etree"
+
+    def parse(self, raw: bytes) -> list[StationDict]:
+        try:
+            dom = ElementTree.fromstring(raw)
+        except ElementTree.ParseError as e:
+            raise FuelWatchError(f"Malformed XML response: {e}") from e
+        return _from_tree(dom)
+
+
+class LxmlParser:
+    """Parse with lxml, which must be installed."""
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        if lxml_etree is None:
+            raise FuelWatchError("The lxml parser requires lxml to be installed")
+        self._parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True)
+
+    def parse(self, raw: bytes) -> list[StationDict]:
+        assert lxml_etree is not None  # checked in __init__
+        try:
+            dom = lxml_etree.fromstring(raw, self._parser)
+        except lxml_etree.XMLSyntaxError as e:
+            raise FuelWatchError(f"Malformed XML response: {e}") from e
+        return _from_tree(dom)
+
+
+class ExpatParser:
+    """Parse with a raw expat event handler, without building a tree.
+
+    Mirrors ``findtext()`` semantics: the first matching child wins, and only
+    the text before that child's own first sub-element is kept.
+    """
+
+    name = "expat"
+
+    def parse(self, raw: bytes) -> list[StationDict]:
+        result: list[StationDict] = []
+        stack: list[str] = []
+        item: StationDict = {}
+        field = ""
+        text: list[str] | None = None
+
+        def commit() -> None:
+            nonlocal text
+            if text is not None:
+                item[field] = "".join(text)
+                text = None
+
+        def start(tag: str, attrs: object) -> None:
+            nonlocal item, field, text
+            commit()  # a field's text stops at its first sub-element
+            depth = len(stack)
+            if depth == 2 and tag == "item" and stack[1] == "channel":
+                item = dict.fromkeys(FIELDS)
+                result.append(item)
+            elif depth == 3 and stack[2] == "item" and stack[1] == "channel":
+                if tag in _FIELD_SET and item[tag] is None:
+                    field, text = tag, []
+            stack.append(tag)
+
+        def end(tag: str) -> None:
+            commit()
+            stack.pop()
+
+        def data(chunk: str) -> None:
+            if text is not None:
+                text.append(chunk)
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = data
+        try:
+            parser.Parse(raw, True)
+        except expat.ExpatError as e:
+            raise FuelWatchError(f"Malformed XML response: {e}") from e
+        return result
+
+
+# Backends by name, in order of preference as measured by bench_parsers.py.
+BACKENDS: dict[str, type[Parser]] = {
+    "lxml": LxmlParser,
+    "etree": ElementTreeParser,
+    "expat": ExpatParser,
+}
+
+
+def available() -> list[str]:
+    """Return the names of the backends usable here, preferred first."""
+    return [name for name in BACKENDS if name != "lxml" or lxml_etree is not None]
+
+
+def get_parser(parser: str | Parser | None = None) -> Parser:
+    """Resolve a parser backend.
+
+    Args:
+        parser: Backend name, a parser instance, or None to use the
+            ``FUELWATCHER_PARSER`` environment variable, falling back to the
+            first available backend: lxml if installed, otherwise etree.
+
+    Returns:
+        Parser instance.
+
+    Raises:
+        FuelWatchError: If the named backend is unknown or unavailable.
+    """
+    if parser is None:
+        parser = os.environ.get(ENV_VAR) or available()[0]
+    if not isinstance(parser, str):
+        return parser
+    if parser not in BACKENDS:
+        valid = ", ".join(BACKENDS)
+        raise FuelWatchError(f"Invalid parser: {parser}. Valid options: {valid}")
+    return BACKENDS[parser]()
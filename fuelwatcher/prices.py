@@ -0,0 +1,168 @@
+"""
+Cross-product price matrix.
+
+The feed returns one product per query. :func:`fetch_prices` runs the
+per-product queries concurrently, then hash-joins the results on
+:attr:`FuelStation.key` into a :class:`PriceMatrix`. The matrix has one row per
+physical station and one column per product.
+
+Each column is a contiguous ``array('d')``. A product a station does not sell
+is stored as NaN, so missing prices take no extra bookkeeping, and column-wide
+operations never touch Python objects.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import math
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, overload
+
+from fuelwatcher.constants import PRODUCT
+from fuelwatcher.fuelwatch import FuelWatch
+from fuelwatcher.models import FuelStation, FuelWatchError, StationKey, to_float
+
+_MISSING = math.nan
+
+
+@dataclass(frozen=True, slots=True)
+class StationPrices:
+    """One station with its price for every product it sells.
+
+    Attributes:
+        station: Station details, from the first product it appeared in
+        prices: Price by product ID, omitting products it does not sell
+    """
+
+    station: FuelStation
+    prices: dict[int, float]
+
+    @property
+    def key(self) -> StationKey:
+        """Stable station identity, see :attr:`FuelStation.key`."""
+        return self.station.key
+
+    def price(self, product: int) -> float | None:
+        """Return the price of a product, or None if it is not sold here."""
+        return self.prices.get(product)
+
+
+class PriceMatrix(Sequence[StationPrices]):
+    """Stations joined across products, with prices stored by column.
+
+    Rows are :class:`StationPrices` records, built when accessed.
+
+    Args:
+        results: Stations returned for each product ID.
+    """
+
+    def __init__(self, results: Mapping[int, Iterable[FuelStation]]) -> None:
+        self.products: tuple[int, ...] = tuple(results)
+        self.stations: list[FuelStation] = []
+        self._index: dict[StationKey, int] = {}
+        per_product: list[list[tuple[int, float]]] = []
+        # Pass one assigns rows, so each column can be allocated exactly once.
+        for stations in results.values():
+            cells = []
+            for station in stations:
+                key = station.key
+                row = self._index.get(key)
+                if row is None:
+                    row = self._index[key] = len(self.stations)
+                    self.stations.append(station)
+                cells.append((row, to_float(station.price)))
+            per_product.append(cells)
+        self._columns: dict[int, array[float]] = {}
+        for product, cells in zip(self.products, per_product, strict=True):
+            column = array("d", [_MISSING]) * len(self.stations)
+            for row, price in cells:
+                column[row] = price
+            self._columns[product] = column
+
+    def column(self, product: int) -> "array[float]":
+        """Return the price column of a product, NaN where it is not sold.
+
+        Raises:
+            FuelWatchError: If the product was not fetched.
+        """
+        try:
+            return self._columns[product]
+        except KeyError:
+            raise FuelWatchError(f"Product {product} is not in the matrix") from None
+
+    def coverage(self, product: int) -> int:
+        """Return how many stations sell a product."""
+        return sum(not math.isnan(price) for price in self.column(product))
+
+    def _row(self, row: int) -> StationPrices:
+        prices = {}
+        for product, column in self._columns.items():
+            price = column[row]
+            if not math.isnan(price):
+                prices[product] = price
+        return StationPrices(self.stations[row], prices)
+
+    def get(self, key: StationKey) -> StationPrices | None:
+        """Return the row for a station key, or None if it is absent."""
+        row = self._index.get(key)
+        return None if row is None else self._row(row)
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    @overload
+    def __getitem__(self, index: int) -> StationPrices: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[StationPrices]: ...
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self._row(row) for row in range(len(self))[index]]
+        return self._row(range(len(self))[index])
+
+    def __iter__(self) -> Iterator[StationPrices]:
+        return map(self._row, range(len(self)))
+
+
+def fetch_prices(
+    products: Iterable[int] | None = None,
+    client: Callable[[], FuelWatch] = FuelWatch,
+    workers: int | None = None,
+    **filters: Any,
+) -> PriceMatrix:
+    """Query several products concurrently and join them by station.
+
+    Args:
+        products: Product IDs to fetch. Defaults to every product in
+            :data:`~fuelwatcher.constants.PRODUCT`.
+        client: Factory for the FuelWatch client used by each query.
+        workers: Concurrent queries. Defaults to one per product.
+        **filters: Other :meth:`FuelWatch.query` arguments applied to every
+            product, e.g. ``region=25`` or ``day='tomorrow'``.
+
+    Returns:
+        Joined price matrix, with columns in the order of ``products``.
+
+    Raises:
+        FuelWatchError: If any product's query fails.
+
+    Example:
+        >>> matrix = fetch_prices([1, 2, 4], region=25)
+        >>> for row in matrix:
+        ...     print(row.station.trading_name, row.price(1), row.price(4))
+    """
+    products = list(dict.fromkeys(PRODUCT if products is None else products))
+    if not products:
+        return PriceMatrix({})
+
+    def fetch(product: int) -> list[FuelStation]:
+        api = client()
+        api.query(product=product, **filters)
+        return api.stations
+
+    with ThreadPoolExecutor(max_workers=workers or len(products)) as pool:
+        results = dict(zip(products, pool.map(fetch, products), strict=True))
+    return PriceMatrix(results)
@@ -0,0 +1,340 @@
+"""
+Detecting when tomorrow's prices are published.
+
+Tomorrow's prices appear in the feed some time after 2:30PM AWST. Rather than
+re-fetching every ``day='tomorrow'`` query blindly, a
+:class:`PublicationDetector` repeatedly probes one small query. A single
+suburb is enough: the response is empty until publication and
+non-empty after it. Probing is spread out before the expected time and
+tightens to ``min_interval`` as the window opens. If prices are later than
+usual, e.g. during an outage, it backs off again to ``max_interval``. The
+first non-empty probe triggers a concurrent fetch of every configured query.
+
+Each detection is kept in :class:`PublishStats`. The expected time and the
+probing window move with the observed publish times.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import json
+import logging
+import os
+import queue
+import statistics
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from typing import Any, Self
+
+from fuelwatcher.constants import TIMEZONE
+from fuelwatcher.files import atomic_write
+from fuelwatcher.fuelwatch import FuelWatch
+from fuelwatcher.models import FuelWatchError, Query
+from fuelwatcher.views import scan
+
+logger = logging.getLogger(__name__)
+
+# Earliest time tomorrow's prices are documented to be available.
+PUBLISH_TIME = dtime(14, 30)
+
+# A busy suburb queried on its own: small, but never empty once published.
+DEFAULT_PROBE = Query(product=1, suburb="Morley", surrounding=False)
+
+
+@dataclass(frozen=True, slots=True)
+class Publication:
+    """One observed publication of tomorrow's prices.
+
+    Attributes:
+        day: Date the prices were published on (the day before they apply)
+        detected_at: Time of the first non-empty probe
+        last_empty_at: Time of the last empty probe before it, or None if no
+            probe came back empty first
+        probes: Probes sent before detection, including the detecting one
+        failures: Probes among them whose request failed
+    """
+
+    day: date
+    detected_at: datetime
+    last_empty_at: datetime | None
+    probes: int
+    failures: int = 0
+
+    @property
+    def lag(self) -> timedelta | None:
+        """Upper bound on how late publication was detected."""
+        if self.last_empty_at is None:
+            return None
+        return self.detected_at - self.last_empty_at
+
+
+def _seconds(moment: datetime) -> float:
+    local = moment.astimezone(TIMEZONE)
+    return (
+        local.hour * 3600 + local.minute * 60 + local.second + local.microsecond / 1e6
+    )
+
+
+class PublishStats:
+    """History of observed publications, persisted as JSON.
+
+    Only publications bracketed by an empty probe tell us when publishing
+    happened; those are the ones used for the timing estimates.
+    """
+
+    def __init__(self, publications: Iterable[Publication] = ()) -> None:
+        self.publications: list[Publication] = list(publications)
+
+    def record(self, publication: Publication) -> None:
+        """Add an observed publication."""
+        self.publications.append(publication)
+
+    def _observed(self) -> list[float]:
+        return [
+            _seconds(p.detected_at)
+            for p in self.publications
+            if p.last_empty_at is not None
+        ]
+
+    def expected(self) -> dtime:
+        """Return the median observed publish time, or 2:30PM with no history."""
+        observed = self._observed()
+        if not observed:
+            return PUBLISH_TIME
+        seconds = int(statistics.median(observed))
+        return dtime(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+    def spread(self) -> timedelta:
+        """Return the spread between earliest and latest observed publication."""
+        observed = self._observed()
+        if len(observed) < 2:
+            return timedelta(0)
+        return timedelta(seconds=max(observed) - min(observed))
+
+    def mean_lag(self) -> timedelta | None:
+        """Return the average detection lag, or None with no bracketed history."""
+        lags = [p.lag for p in self.publications if p.lag is not None]
+        if not lags:
+            return None
+        return sum(lags, timedelta(0)) / len(lags)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable copy of the history."""
+        rows = []
+        for p in self.publications:
+            row = asdict(p)
+            row["day"] = p.day.isoformat()
+            row["detected_at"] = p.detected_at.isoformat()
+            row["last_empty_at"] = p.last_empty_at and p.last_empty_at.isoformat()
+            rows.append(row)
+        return {"publications": rows}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Self:
+        """Restore history produced by :meth:`to_dict`."""
+        return cls(
+            Publication(
+                day=date.fromisoformat(row["day"]),
+                detected_at=datetime.fromisoformat(row["detected_at"]),
+                last_empty_at=row["last_empty_at"]
+                and datetime.fromisoformat(row["last_empty_at"]),
+                probes=row["probes"],
+                failures=row.get("failures", 0),
+            )
+            for row in data["publications"]
+        )
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Atomically write the history to a JSON file."""
+        with atomic_write(path) as f:
+            f.write(json.dumps(self.to_dict()).encode())
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        """Read history written by :meth:`save`; empty if the file is missing."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+
+@dataclass(slots=True)
+class Release:
+    """Tomorrow's prices, fetched as soon as they were published.
+
+    Attributes:
+        publication: When publication was detected
+        responses: Raw response for each configured query
+        failed: Error message for each query that could not be fetched
+    """
+
+    publication: Publication
+    responses: dict[Query, bytes] = field(default_factory=dict)
+    failed: dict[Query, str] = field(default_factory=dict)
+
+
+class PublicationDetector:
+    """Probe for tomorrow's prices and fetch them the moment they appear.
+
+    Args:
+        queries: Queries to fetch with ``day='tomorrow'`` once published.
+        client: Factory for FuelWatch clients.
+        probe: Small query whose response signals publication.
+        stats: Publication history to adapt to and record into.
+        min_interval: Seconds between probes once the window has opened.
+        max_interval: Seconds between probes at the start of the window.
+        lead: How long before the expected publish time probing starts,
+            widened by the observed spread of publish times. Probing backs
+            off again once it is this long past the latest expected time.
+        workers: Concurrent requests for the full fetch.
+        now: Returns the current time; override for testing.
+        sleep: Blocks for the given seconds; override for testing.
+
+    Example:
+        >>> stats = PublishStats.load("publish.json")
+        >>> detector = PublicationDetector(Query.grid(products=[1, 4]), stats=stats)
+        >>> release = detector.run()
+        >>> stats.save("publish.json")
+    """
+
+    def __init__(
+        self,
+        queries: Iterable[Query],
+        client: Callable[[], FuelWatch] = FuelWatch,
+        probe: Query = DEFAULT_PROBE,
+        stats: PublishStats | None = None,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        lead: timedelta = timedelta(minutes=10),
+        workers: int = 8,
+        now: Callable[[], datetime] = lambda: datetime.now(TIMEZONE),
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not 0 < min_interval <= max_interval:
+            raise FuelWatchError(
+                f"Invalid probe intervals: {min_interval}, {max_interval}"
+            )
+        self.queries = list(dict.fromkeys(queries))
+        self.client = client
+        self.probe = probe
+        self.stats = stats if stats is not None else PublishStats()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lead = lead
+        self.workers = workers
+        self.now = now
+        self.sleep = sleep
+
+    def window(self, day: date) -> tuple[datetime, datetime]:
+        """Return when probing starts and when it reaches full speed on ``day``."""
+        expected = datetime.combine(day, self.stats.expected(), TIMEZONE)
+        # Reach full speed by the earliest publish time seen, not the median.
+        opens = expected - self.stats.spread()
+        return opens - self.lead, opens
+
+    def deadline(self, day: date) -> datetime:
+        """Return when probing on ``day`` starts backing off again."""
+        expected = datetime.combine(day, self.stats.expected(), TIMEZONE)
+        return expected + self.stats.spread() + self.lead
+
+    def interval(self, moment: datetime) -> float:
+        """Return the seconds to wait before the next probe at ``moment``.
+
+        Before the window it sleeps until the window starts. Inside it, the
+        interval shrinks linearly from ``max_interval`` to ``min_interval``.
+        Past the :meth:`deadline` it grows back to ``max_interval`` over
+        ``lead``, so a late publication or an outage is not probed every
+        ``min_interval`` until midnight.
+        """
+        day = moment.astimezone(TIMEZONE).date()
+        start, opens = self.window(day)
+        if moment < start:
+            return (start - moment).total_seconds()
+        span = self.max_interval - self.min_interval
+        if moment < opens:
+            return self.max_interval - (moment - start) / (opens - start) * span
+        overdue = moment - self.deadline(day)
+        if overdue <= timedelta(0):
+            return self.min_interval
+        if overdue >= self.lead:
+            return self.max_interval
+        return self.min_interval + overdue / self.lead * span
+
+    def _published(self, api: FuelWatch) -> bool:
+        raw = api.query(**self.probe.params(day="tomorrow"))
+        return len(scan(raw)) > 0
+
+    def wait(self) -> Publication:
+        """Block until tomorrow's prices are published, and record it.
+
+        A failed probe is retried on the normal schedule. It says nothing
+        about publication, so it never counts as the last empty probe.
+        """
+        api = self.client()
+        day = self.now().astimezone(TIMEZONE).date()
+        last_empty: datetime | None = None
+        probes = failures = 0
+        while True:
+            sent = self.now()
+            probes += 1
+            try:
+                if self._published(api):
+                    break
+            except FuelWatchError as e:
+                logger.warning("Publication probe failed: %s", e)
+                failures += 1
+            else:
+                last_empty = sent
+            self.sleep(self.interval(self.now()))
+        publication = Publication(day, sent, last_empty, probes, failures)
+        self.stats.record(publication)
+        logger.info("Tomorrow's prices detected at %s", sent.isoformat())
+        return publication
+
+    def clients(self) -> list[FuelWatch]:
+        """Build one client per worker the full fetch will use."""
+        return [self.client() for _ in range(min(self.workers, len(self.queries)))]
+
+    def fetch(
+        self, clients: Sequence[FuelWatch] | None = None
+    ) -> dict[Query, bytes | FuelWatchError]:
+        """Fetch every configured query for tomorrow concurrently.
+
+        Args:
+            clients: Clients to share between the workers, e.g. from
+                :meth:`clients`. Built on demand if not given.
+        """
+        idle: queue.SimpleQueue[FuelWatch] = queue.SimpleQueue()
+        for api in clients or self.clients():
+            idle.put(api)
+
+        def fetch(query: Query) -> bytes | FuelWatchError:
+            api = idle.get()
+            try:
+                return api.query(**query.params(day="tomorrow"))
+            except FuelWatchError as e:
+                return e
+            finally:
+                idle.put(api)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(self.queries, pool.map(fetch, self.queries), strict=True))
+
+    def run(self) -> Release:
+        """Wait for publication, then fetch all configured queries.
+
+        The fetch clients are built before probing starts, so none of that
+        setup delays the fetch once prices appear.
+        """
+        clients = self.clients()
+        release = Release(self.wait())
+        for query, result in self.fetch(clients).items():
+            if isinstance(result, FuelWatchError):
+                release.failed[query] = str(result)
+            else:
+                release.responses[query] = result
+        return release
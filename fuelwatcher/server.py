@@ -0,0 +1,308 @@
+"""
+Caching reverse proxy for the FuelWatch RSS feed.
+
+Serves the same query parameters as the FuelWatch RSS endpoint from a shared
+cache, so any number of local ``FuelWatch(url=...)`` clients collapse into a
+single upstream fetch per distinct query. Concurrent misses for the same query
+are coalesced into one in-flight request.
+
+Run with ``python -m fuelwatcher.server --port 8080`` and point clients at
+``http://localhost:8080/fuelwatch/fuelWatchRSS``. Appending ``/json`` to any
+path returns the parsed stations as JSON instead of RSS.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections.abc import Callable, Generator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from fuelwatcher.fuelwatch import FuelWatch
+from fuelwatcher.models import FuelWatchError
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_URL = "https://www.fuelwatch.wa.gov.au/fuelwatch/fuelWatchRSS"
+
+# Query parameter names accepted by the FuelWatch RSS endpoint, mapped to the
+# matching FuelWatch.query() keyword and whether the value is an integer ID.
+PARAMS: dict[str, tuple[str, bool]] = {
+    "Product": ("product", True),
+    "Suburb": ("suburb", False),
+    "Region": ("region", True),
+    "Brand": ("brand", True),
+    "Surrounding": ("surrounding", False),
+    "Day": ("day", False),
+}
+
+QueryKey = tuple[tuple[str, Any], ...]
+
+
+@dataclass(slots=True)
+class _Entry:
+    """A cached upstream response and its lazily rendered JSON."""
+
+    expires: float
+    raw: bytes
+    json: str | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight block on the same result (or exception) instead of repeating it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Any, Future] = {}
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` for ``key`` unless an identical call is already running.
+
+        Args:
+            key: Hashable identity of the call.
+            fn: Zero-argument callable producing the result.
+
+        Returns:
+            The result of the single in-flight execution.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+class ProxyCache:
+    """Shared, TTL-bounded cache of upstream responses.
+
+    Args:
+        fetch: Callable taking ``FuelWatch.query()`` keyword arguments and
+            returning raw RSS bytes. Defaults to a pooled FuelWatch client
+            pointed at ``upstream``.
+        ttl: Seconds a cached response stays fresh. Expired responses are
+            evicted when next looked up, and swept at most once per ``ttl``.
+        upstream: Upstream RSS URL used by the default fetcher.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., bytes] | None = None,
+        ttl: float = 300.0,
+        upstream: str = UPSTREAM_URL,
+    ) -> None:
+        self.ttl = ttl
+        self.upstream = upstream
+        self.upstream_fetches = 0
+        self._fetch = fetch or self._default_fetch
+        self._lock = threading.Lock()
+        self._entries: dict[QueryKey, _Entry] = {}
+        self._swept = time.monotonic()
+        self._flight = SingleFlight()
+        # Idle clients. Handler threads are short-lived, so clients are
+        # pooled rather than kept per thread; the pool grows to the peak
+        # number of concurrent fetches and renders.
+        self._clients: list[FuelWatch] = []
+
+    @contextmanager
+    def _client(self) -> Generator[FuelWatch]:
+        with self._lock:
+            client = self._clients.pop() if self._clients else None
+        if client is None:
+            client = FuelWatch(url=self.upstream)
+        try:
+            yield client
+        finally:
+            with self._lock:
+                self._clients.append(client)
+
+    def _default_fetch(self, **kwargs: Any) -> bytes:
+        with self._client() as client:
+            return client.query(**kwargs)
+
+    @staticmethod
+    def key(params: dict[str, Any]) -> QueryKey:
+        """Return a canonical cache key for a set of query keyword arguments."""
+        return tuple(sorted((k, v) for k, v in params.items() if v is not None))
+
+    def _lookup(self, key: QueryKey) -> _Entry | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires > now:
+                return entry
+            del self._entries[key]
+        return None
+
+    def _sweep(self, now: float) -> None:
+        """Evict every expired entry. Call with the lock held."""
+        self._swept = now
+        expired = [key for key, e in self._entries.items() if e.expires <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def _miss(self, key: QueryKey) -> _Entry:
+        # Another caller may have filled the entry while we queued for the flight.
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+        raw = self._fetch(**dict(key))
+        now = time.monotonic()
+        entry = _Entry(now + self.ttl, raw)
+        with self._lock:
+            self.upstream_fetches += 1
+            self._entries[key] = entry
+            if now - self._swept >= self.ttl:
+                self._sweep(now)
+        return entry
+
+    def _get(self, params: dict[str, Any]) -> _Entry:
+        key = self.key(params)
+        return self._lookup(key) or self._flight.do(key, lambda: self._miss(key))
+
+    def raw(self, **params: Any) -> bytes:
+        """Return the RSS response for a query, fetching upstream on a miss.
+
+        Raises:
+            FuelWatchError: If validation or the upstream request fails.
+        """
+        return self._get(params).raw
+
+    def json(self, **params: Any) -> str:
+        """Return the parsed stations for a query as a JSON string.
+
+        Raises:
+            FuelWatchError: If validation or the upstream request fails.
+        """
+        entry = self._get(params)
+        if entry.json is None:
+            with self._client() as api:
+                api.load(entry.raw)
+                # Racing threads may both render; the results are identical.
+                entry.json = api.json
+        return entry.json
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+
+def parse_params(query_string: str) -> dict[str, Any]:
+    """Convert an RSS endpoint query string into FuelWatch.query() kwargs.
+
+    Raises:
+        FuelWatchError: If an integer parameter is not a number.
+    """
+    params: dict[str, Any] = {}
+    for name, values in parse_qs(query_string).items():
+        if name not in PARAMS or not values:
+            continue
+        kwarg, is_int = PARAMS[name]
+        value = values[-1]
+        if is_int:
+            try:
+                params[kwarg] = int(value)
+            except ValueError:
+                raise FuelWatchError(f"Invalid {name}: {value}") from None
+        else:
+            params[kwarg] = value
+    return params
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    """Serve RSS (or ``/json``) responses from the server's ProxyCache."""
+
+    @property
+    def cache(self) -> ProxyCache:
+        """The cache shared by the server handling this request."""
+        if not isinstance(self.server, ProxyServer):
+            raise TypeError("ProxyHandler must be served by a ProxyServer")
+        return self.server.cache
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        as_json = url.path.rstrip("/").endswith("/json")
+        try:
+            params = parse_params(url.query)
+            if as_json:
+                body = self.cache.json(**params).encode("ascii")
+                content_type = "application/json"
+            else:
+                body = self.cache.raw(**params)
+                content_type = "text/xml; charset=UTF-8"
+        except FuelWatchError as e:
+            # Upstream failures chain the requests exception; validation doesn't.
+            status = (
+                HTTPStatus.BAD_GATEWAY
+                if isinstance(e.__cause__, Exception)
+                else HTTPStatus.BAD_REQUEST
+            )
+            self.send_error(status, str(e))
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class ProxyServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one ProxyCache across all requests."""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], cache: ProxyCache | None = None
+    ) -> None:
+        super().__init__(address, ProxyHandler)
+        self.cache = cache or ProxyCache()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the caching proxy from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ttl", type=float, default=300.0)
+    parser.add_argument("--upstream", default=UPSTREAM_URL)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    cache = ProxyCache(ttl=args.ttl, upstream=args.upstream)
+    with ProxyServer((args.host, args.port), cache) as httpd:
+        logger.info("Serving FuelWatch proxy on %s:%s", args.host, args.port)
+        httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Batched bulk sinks for exporting stations.
+
+Sinks accept any iterable of stations (``FuelStation`` instances, lazy
+``StationView`` objects, snapshots) and write them in large batches instead of
+one ``to_dict()`` and one insert per row:
+
+- :class:`SQLiteSink`: ``executemany`` inside one transaction per batch
+- :class:`CSVSink`: ``csv.writer`` over a large write buffer
+- :class:`ParquetSink`: columnar Arrow record batches, when pyarrow is installed
+
+Rows are buffered until ``batch_size`` rows are pending or ``flush_interval``
+seconds have passed since the last flush. Flushing happens synchronously in
+``write()``, so a producer can never outrun the sink by more than one batch.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import abc
+import csv
+import dataclasses
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from operator import attrgetter
+from typing import Any, Self
+
+from fuelwatcher.models import FuelStation, FuelWatchError
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pa = pq = None
+
+COLUMNS: tuple[str, ...] = tuple(f.name for f in dataclasses.fields(FuelStation))
+
+Row = tuple[str | None, ...]
+
+_row = attrgetter(*COLUMNS)
+
+
+class Sink(abc.ABC):
+    """Base class buffering station rows and flushing them in batches.
+
+    Subclasses implement :meth:`_write_batch` and optionally :meth:`_close`.
+
+    Args:
+        batch_size: Rows to buffer before writing a batch.
+        flush_interval: Maximum seconds rows may wait in the buffer, checked
+            on each write. None disables time-based flushing.
+    """
+
+    def __init__(
+        self, batch_size: int = 10_000, flush_interval: float | None = 5.0
+    ) -> None:
+        if batch_size < 1:
+            raise FuelWatchError(f"Invalid batch size: {batch_size}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.batches_written = 0
+        self._buffer: list[Row] = []
+        self._last_flush = time.monotonic()
+        self._closed = False
+
+    def write(self, stations: Iterable[Any]) -> int:
+        """Buffer stations, flushing whenever a batch fills up.
+
+        Args:
+            stations: Objects with FuelStation's attributes.
+
+        Returns:
+            Number of stations accepted.
+        """
+        if self._closed:
+            raise FuelWatchError("Sink is closed")
+        buffer = self._buffer
+        count = 0
+        for station in stations:
+            buffer.append(_row(station))
+            count += 1
+            if len(buffer) >= self.batch_size:
+                self.flush()
+                buffer = self._buffer
+        if (
+            self.flush_interval is not None
+            and buffer
+            and time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+        return count
+
+    def flush(self) -> None:
+        """Write any buffered rows now.
+
+        If the write fails the rows stay buffered, so a later flush or
+        close retries them.
+        """
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            try:
+                self._write_batch(batch)
+            except BaseException:
+                self._buffer = batch + self._buffer
+                raise
+            self.rows_written += len(batch)
+            self.batches_written += 1
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush remaining rows and release resources.
+
+        If the final flush fails the sink stays open, so closing can be
+        retried without losing the buffered rows.
+        """
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._close()
+
+    @abc.abstractmethod
+    def _write_batch(self, rows: list[Row]) -> None:
+        """Write one batch of rows."""
+
+    def _close(self) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class SQLiteSink(Sink):
+    """Insert stations into a SQLite table in batched transactions.
+
+    Args:
+        database: Path to the database file, or an open connection.
+        table: Table name; created with one TEXT column per field if missing.
+        fast: Use WAL journaling with ``synchronous=NORMAL``, trading
+            durability of the last transaction on power loss for throughput.
+            Only applied to databases the sink opens itself; a connection
+            passed in is left as configured.
+        **kwargs: Buffering options, see :class:`Sink`.
+    """
+
+    def __init__(
+        self,
+        database: str | os.PathLike[str] | sqlite3.Connection,
+        table: str = "stations",
+        fast: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        if not table.isidentifier():
+            raise FuelWatchError(f"Invalid table name: {table}")
+        self._owns_connection = not isinstance(database, sqlite3.Connection)
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+        else:
+            self.connection = sqlite3.connect(database)
+        if fast and self._owns_connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{name} TEXT" for name in COLUMNS)
+        with self.connection:
+            self.connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        placeholders = ", ".join("?" * len(COLUMNS))
+        self._insert = f"INSERT INTO {table} VALUES ({placeholders})"
+
+    def _write_batch(self, rows: list[Row]) -> None:
+        with self.connection:
+            self.connection.executemany(self._insert, rows)
+
+    def _close(self) -> None:
+        if self._owns_connection:
+            self.connection.close()
+
+
+class CSVSink(Sink):
+    """Write stations to a CSV file with a header row.
+
+    Args:
+        path: Output file path. Appends without a second header if it exists
+            and is non-empty.
+        buffer_bytes: Size of the underlying file write buffer.
+        **kwargs: Buffering options, see :class:`Sink`.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        buffer_bytes: int = 1 << 20,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._file = open(
+            path, "a", newline="", encoding="utf-8", buffering=buffer_bytes
+        )
+        self._writer = csv.writer(self._file)
+        if self._file.tell() == 0:
+            self._writer.writerow(COLUMNS)
+
+    def _write_batch(self, rows: list[Row]) -> None:
+        self._writer.writerows(rows)
+
+    def flush(self) -> None:
+        super().flush()
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(Sink):
+    """Write stations to a Parquet file as columnar record batches.
+
+    Requires pyarrow. Each flushed batch becomes one row group.
+
+    Args:
+        path: Output file path (overwritten).
+        compression: Parquet compression codec.
+        **kwargs: Buffering options, see :class:`Sink`.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        compression: str = "zstd",
+        **kwargs: Any,
+    ) -> None:
+        if pa is None or pq is None:
+            raise FuelWatchError("ParquetSink requires pyarrow to be installed")
+        super().__init__(**kwargs)
+        self._schema = pa.schema([(name, pa.string()) for name in COLUMNS])
+        self._writer = pq.ParquetWriter(
+            os.fspath(path), self._schema, compression=compression
+        )
+
+    def _write_batch(self, rows: list[Row]) -> None:
+        assert pa is not None  # checked in __init__
+        columns = [pa.array(column, pa.string()) for column in zip(*rows, strict=True)]
+        self._writer.write_batch(
+            pa.RecordBatch.from_arrays(columns, schema=self._schema)
+        )
+
+    def _close(self) -> None:
+        self._writer.close()
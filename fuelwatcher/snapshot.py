@@ -0,0 +1,363 @@
+"""
+Compact binary snapshots of FuelStation results.
+
+A snapshot stores a set of stations as fixed-width numeric columns (price,
+latitude, longitude) alongside a deduplicated UTF-8 string table. Each row is
+tagged with the product its price is for, so one file can hold every product
+for the state. Files are written atomically and opened with ``mmap``, so every
+process on a host shares one page-cached copy and stations are decoded lazily,
+one row at a time.
+
+Layout (all integers little-endian)::
+
+    header    magic, version, station count, string count
+    columns   float64 price[n], latitude[n], longitude[n]  (NaN if missing)
+    products  uint32 product[n]            (0xFFFFFFFF if not given)
+    fields    uint32 string index[n][12]   (0xFFFFFFFF for None)
+    offsets   uint32 string offset[strings + 1]
+    strings   UTF-8 string data
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import Self, overload
+
+from fuelwatcher.files import atomic_write
+from fuelwatcher.models import FuelStation, FuelWatchError, to_float
+
+MAGIC = b"FWSNAP\x00\x00"
+VERSION = 2
+
+# magic, version, station count, string count, reserved
+_HEADER = struct.Struct("<8sIIII")
+_HEADER_SIZE = 32
+_NONE = 0xFFFFFFFF
+
+FIELDS: tuple[str, ...] = (
+    "title",
+    "description",
+    "brand",
+    "date",
+    "price",
+    "trading_name",
+    "location",
+    "address",
+    "phone",
+    "latitude",
+    "longitude",
+    "site_features",
+)
+NUMERIC_FIELDS: tuple[str, ...] = ("price", "latitude", "longitude")
+
+
+def _little_endian(data: array) -> bytes:
+    if sys.byteorder == "big":
+        data = array(data.typecode, data)
+        data.byteswap()
+    return data.tobytes()
+
+
+def write_snapshot(
+    path: str | os.PathLike[str],
+    stations: Iterable[FuelStation],
+    product: int | None = None,
+) -> int:
+    """Write stations to a binary snapshot file atomically.
+
+    The snapshot is written to a temporary file in the target directory and
+    moved into place, so readers never observe a partially written file.
+
+    Args:
+        path: Destination file path.
+        stations: Stations to store.
+        product: Product the prices are for, recorded on every row.
+
+    Returns:
+        Number of stations written.
+    """
+    return _write(path, [(_NONE if product is None else product, stations)])
+
+
+def write_products_snapshot(
+    path: str | os.PathLike[str], stations: Mapping[int, Iterable[FuelStation]]
+) -> int:
+    """Write stations for several products to one snapshot file atomically.
+
+    Args:
+        path: Destination file path.
+        stations: Stations by the product ID their prices are for.
+
+    Returns:
+        Number of stations written.
+
+    Example:
+        >>> write_products_snapshot("state.fws", {1: ulp.stations, 4: diesel.stations})
+    """
+    return _write(path, stations.items())
+
+
+def _write(
+    path: str | os.PathLike[str], groups: Iterable[tuple[int, Iterable[FuelStation]]]
+) -> int:
+    strings: dict[str, int] = {}
+    fields = array("I")
+    products = array("I")
+    columns = {name: array("d") for name in NUMERIC_FIELDS}
+
+    count = 0
+    for product, group in groups:
+        for station in group:
+            products.append(product)
+            for name in FIELDS:
+                value = getattr(station, name)
+                if value is None:
+                    fields.append(_NONE)
+                else:
+                    fields.append(strings.setdefault(value, len(strings)))
+            for name in NUMERIC_FIELDS:
+                columns[name].append(to_float(getattr(station, name)))
+            count += 1
+
+    offsets = array("I", [0])
+    blob = bytearray()
+    for value in strings:
+        blob += value.encode("utf-8")
+        offsets.append(len(blob))
+
+    header = _HEADER.pack(MAGIC, VERSION, count, len(strings), 0)
+    with atomic_write(path) as f:
+        f.write(header.ljust(_HEADER_SIZE, b"\x00"))
+        for name in NUMERIC_FIELDS:
+            f.write(_little_endian(columns[name]))
+        f.write(_little_endian(products))
+        f.write(_little_endian(fields))
+        f.write(_little_endian(offsets))
+        f.write(blob)
+    return count
+
+
+class Snapshot(Sequence[FuelStation]):
+    """Read-only, memory-mapped view of a station snapshot.
+
+    Stations are decoded on access; numeric columns are exposed as
+    ``memoryview`` objects without copying. Reading from a closed snapshot
+    raises FuelWatchError.
+
+    Example:
+        >>> write_snapshot("metro.fws", api.stations)
+        >>> with Snapshot("metro.fws") as snap:
+        ...     cheapest = min(range(len(snap)), key=snap.prices.__getitem__)
+        ...     print(snap[cheapest].trading_name)
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Open a snapshot file.
+
+        Args:
+            path: Snapshot file written by :func:`write_snapshot`.
+
+        Raises:
+            FuelWatchError: If the file is not a valid snapshot.
+        """
+        if sys.byteorder != "little":
+            raise FuelWatchError("Snapshots can only be mapped on little-endian hosts")
+
+        self._closed = False
+        with open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise FuelWatchError(f"Empty snapshot file: {path}") from None
+
+        try:
+            self._map(path)
+        except BaseException:
+            self._mmap.close()
+            raise
+        self._strings: dict[int, str] = {}
+
+    def _map(self, path: str | os.PathLike[str]) -> None:
+        if len(self._mmap) < _HEADER_SIZE:
+            raise FuelWatchError(f"Truncated snapshot file: {path}")
+        magic, version, count, nstrings, _ = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise FuelWatchError(f"Not a FuelWatch snapshot: {path}")
+        if version != VERSION:
+            raise FuelWatchError(f"Unsupported snapshot version: {version}")
+
+        size = _HEADER_SIZE + 8 * count * len(NUMERIC_FIELDS)
+        size += 4 * count * (1 + len(FIELDS)) + 4 * (nstrings + 1)
+        if len(self._mmap) < size:
+            raise FuelWatchError(f"Truncated snapshot file: {path}")
+
+        view = memoryview(self._mmap)
+        pos = _HEADER_SIZE
+        self._columns: dict[str, memoryview[float]] = {}
+        for name in NUMERIC_FIELDS:
+            end = pos + 8 * count
+            self._columns[name] = view[pos:end].cast("d")
+            pos = end
+        end = pos + 4 * count
+        self._products = view[pos:end].cast("I")
+        pos, end = end, end + 4 * count * len(FIELDS)
+        self._fields = view[pos:end].cast("I")
+        pos, end = end, end + 4 * (nstrings + 1)
+        self._offsets = view[pos:end].cast("I")
+        self._data = view[end:]
+        view.release()
+        self._count = count
+        if len(self._data) < self._offsets[-1]:
+            self.close()
+            raise FuelWatchError(f"Truncated snapshot file: {path}")
+
+    def _string(self, index: int) -> str | None:
+        if index == _NONE:
+            return None
+        value = self._strings.get(index)
+        if value is None:
+            start, end = self._offsets[index], self._offsets[index + 1]
+            value = self._strings[index] = str(self._data[start:end], "utf-8")
+        return value
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise FuelWatchError("Snapshot is closed")
+
+    def field(self, index: int, name: str) -> str | None:
+        """Decode a single field of one station without building the station.
+
+        Args:
+            index: Station row.
+            name: FuelStation attribute name.
+        """
+        self._check_open()
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        return self._string(self._fields[index * len(FIELDS) + FIELDS.index(name)])
+
+    def product(self, index: int) -> int | None:
+        """Return the product a station's price is for, or None if not given.
+
+        Args:
+            index: Station row.
+        """
+        self._check_open()
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        product = self._products[index]
+        return None if product == _NONE else product
+
+    def _station(self, index: int) -> FuelStation:
+        base = index * len(FIELDS)
+        (
+            title,
+            description,
+            brand,
+            date,
+            price,
+            trading_name,
+            location,
+            address,
+            phone,
+            latitude,
+            longitude,
+            site_features,
+        ) = (self._string(i) for i in self._fields[base : base + len(FIELDS)])
+        return FuelStation(
+            title=title or "",
+            description=description or "",
+            brand=brand or "",
+            date=date or "",
+            price=price or "",
+            trading_name=trading_name or "",
+            location=location or "",
+            address=address or "",
+            phone=phone,
+            latitude=latitude or "",
+            longitude=longitude or "",
+            site_features=site_features,
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> FuelStation: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[FuelStation]: ...
+
+    def __getitem__(self, index: int | slice) -> FuelStation | list[FuelStation]:
+        self._check_open()
+        if isinstance(index, slice):
+            return [self._station(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        return self._station(index)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[FuelStation]:
+        for i in range(self._count):
+            self._check_open()
+            yield self._station(i)
+
+    @property
+    def prices(self) -> "memoryview[float]":
+        """Station prices as float64 (NaN where the price is missing)."""
+        self._check_open()
+        return self._columns["price"]
+
+    @property
+    def latitudes(self) -> "memoryview[float]":
+        """Station latitudes as float64."""
+        self._check_open()
+        return self._columns["latitude"]
+
+    @property
+    def longitudes(self) -> "memoryview[float]":
+        """Station longitudes as float64."""
+        self._check_open()
+        return self._columns["longitude"]
+
+    @property
+    def products(self) -> "memoryview[int]":
+        """Product ID of each row as uint32 (0xFFFFFFFF where not given)."""
+        self._check_open()
+        return self._products
+
+    @property
+    def closed(self) -> bool:
+        """True once :meth:`close` has been called."""
+        return self._closed
+
+    def close(self) -> None:
+        """Release the memory map. Stations already decoded remain valid.
+
+        Views taken from the columns, such as ``snap.prices[:10]``, keep
+        the map alive. If any are still held the snapshot is closed but the
+        file stays mapped until the last of them is released.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for column in self._columns.values():
+            column.release()
+        for view in (self._products, self._fields, self._offsets, self._data):
+            view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # unmapped when the outstanding views are garbage collected
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
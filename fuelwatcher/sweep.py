@@ -0,0 +1,409 @@
+"""
+Distributed sweeps of the FuelWatch query space.
+
+A sweep splits every (query, day) combination into work units and hands them
+to workers through a lease-based queue. A worker that dies holding a lease
+simply lets it expire, and the unit is handed to someone else. Results are
+written to a :class:`~fuelwatcher.backfill.DirectoryStore`, where each unit
+has exactly one file that is atomically replaced, so a unit completed twice
+merges idempotently.
+
+No broker is needed:
+
+- :class:`MemoryQueue` coordinates threads within one process
+- :class:`SQLiteQueue` coordinates processes, and hosts sharing storage, via
+  SQLite's file locking
+
+:func:`sweep` runs a whole sweep across local worker processes.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import dataclasses
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Protocol
+
+from fuelwatcher.backfill import DirectoryStore
+from fuelwatcher.fuelwatch import FuelWatch
+from fuelwatcher.models import FuelWatchError, Query
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass(frozen=True, slots=True)
+class WorkUnit:
+    """One query for one day.
+
+    Attributes:
+        query: Query filters
+        day: Day to fetch
+    """
+
+    query: Query
+    day: date
+
+    @property
+    def id(self) -> str:
+        """Stable unit identifier, e.g. "product-1_region-25/2024-01-09"."""
+        return f"{self.query.slug}/{self.day.isoformat()}"
+
+    def to_json(self) -> str:
+        """Serialize for storage in a queue."""
+        return json.dumps(
+            {"query": dataclasses.asdict(self.query), "day": self.day.isoformat()}
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "WorkUnit":
+        """Restore from :meth:`to_json` output."""
+        data = json.loads(text)
+        return cls(Query(**data["query"]), date.fromisoformat(data["day"]))
+
+
+def plan(queries: Iterable[Query], days: Iterable[date]) -> list[WorkUnit]:
+    """Return a work unit for every combination of queries and days."""
+    days = list(days)
+    return [WorkUnit(query, day) for query in queries for day in days]
+
+
+class WorkQueue(Protocol):
+    """Lease-based queue of work units shared by workers."""
+
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        """Add units, ignoring any already queued. Returns how many were new."""
+        ...
+
+    def lease(self, worker: str, seconds: float) -> WorkUnit | None:
+        """Lease the next pending (or expired) unit, or None if none is ready."""
+        ...
+
+    def complete(self, unit: WorkUnit) -> None:
+        """Mark a unit done."""
+        ...
+
+    def fail(self, unit: WorkUnit, error: str) -> None:
+        """Record a failed attempt; the unit is retried until attempts run out."""
+        ...
+
+    def remaining(self) -> int:
+        """Return the number of units pending or leased."""
+        ...
+
+    def failures(self) -> dict[str, str]:
+        """Return the last error of every permanently failed unit, by id."""
+        ...
+
+
+@dataclass(slots=True)
+class _Entry:
+    unit: WorkUnit
+    state: str = PENDING
+    owner: str | None = None
+    expires: float = 0.0
+    attempts: int = 0
+    error: str | None = None
+
+
+class MemoryQueue:
+    """In-process work queue for worker threads.
+
+    Args:
+        max_attempts: Leases a unit may receive before it is marked failed.
+    """
+
+    def __init__(self, max_attempts: int = 3) -> None:
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._entries: dict[str, _Entry] = {}
+
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        added = 0
+        with self._lock:
+            for unit in units:
+                if unit.id not in self._entries:
+                    self._entries[unit.id] = _Entry(unit)
+                    added += 1
+        return added
+
+    def lease(self, worker: str, seconds: float) -> WorkUnit | None:
+        now = time.time()
+        with self._lock:
+            for entry in self._entries.values():
+                ready = entry.state == PENDING or (
+                    entry.state == LEASED and entry.expires < now
+                )
+                if not ready:
+                    continue
+                if entry.attempts >= self.max_attempts:
+                    entry.state = FAILED
+                    entry.error = entry.error or "lease expired"
+                    continue
+                entry.state, entry.owner = LEASED, worker
+                entry.expires = now + seconds
+                entry.attempts += 1
+                return entry.unit
+        return None
+
+    def complete(self, unit: WorkUnit) -> None:
+        with self._lock:
+            entry = self._entries[unit.id]
+            entry.state, entry.owner, entry.error = DONE, None, None
+
+    def fail(self, unit: WorkUnit, error: str) -> None:
+        with self._lock:
+            entry = self._entries[unit.id]
+            if entry.state == DONE:
+                return
+            entry.error = error
+            entry.owner = None
+            entry.state = FAILED if entry.attempts >= self.max_attempts else PENDING
+
+    def remaining(self) -> int:
+        with self._lock:
+            return sum(e.state in (PENDING, LEASED) for e in self._entries.values())
+
+    def failures(self) -> dict[str, str]:
+        with self._lock:
+            return {
+                uid: e.error or ""
+                for uid, e in self._entries.items()
+                if e.state == FAILED
+            }
+
+
+class SQLiteQueue:
+    """Work queue in a SQLite database shared by processes or hosts.
+
+    Leasing runs in a ``BEGIN IMMEDIATE`` transaction, so exactly one worker
+    wins each unit. Lease expiry uses wall-clock time, so hosts sharing the
+    database need reasonably synchronized clocks.
+
+    Args:
+        path: Database file. Created if missing.
+        max_attempts: Leases a unit may receive before it is marked failed.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], max_attempts: int = 3) -> None:
+        self.path = os.fspath(path)
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS units ("
+                "id TEXT PRIMARY KEY, unit TEXT NOT NULL, state TEXT NOT NULL, "
+                "owner TEXT, expires REAL NOT NULL DEFAULT 0, "
+                "attempts INTEGER NOT NULL DEFAULT 0, error TEXT)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._connection())
+
+    def put(self, units: Iterable[WorkUnit]) -> int:
+        rows = [(unit.id, unit.to_json(), PENDING) for unit in units]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO units (id, unit, state) VALUES (?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def lease(self, worker: str, seconds: float) -> WorkUnit | None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE units SET state = ?, error = coalesce(error, ?) "
+                "WHERE state = ? AND expires < ? AND attempts >= ?",
+                (FAILED, "lease expired", LEASED, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, unit FROM units WHERE attempts < ? AND "
+                "(state = ? OR (state = ? AND expires < ?)) ORDER BY rowid LIMIT 1",
+                (self.max_attempts, PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE units SET state = ?, owner = ?, expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (LEASED, worker, now + seconds, row[0]),
+            )
+        return WorkUnit.from_json(row[1])
+
+    def complete(self, unit: WorkUnit) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE units SET state = ?, owner = NULL, error = NULL WHERE id = ?",
+                (DONE, unit.id),
+            )
+
+    def fail(self, unit: WorkUnit, error: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE units SET owner = NULL, error = ?, state = CASE "
+                "WHEN attempts >= ? THEN ? ELSE ? END WHERE id = ? AND state != ?",
+                (error, self.max_attempts, FAILED, PENDING, unit.id, DONE),
+            )
+
+    def remaining(self) -> int:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT count(*) FROM units WHERE state IN (?, ?)", (PENDING, LEASED)
+            )
+            .fetchone()
+        )
+        return row[0]
+
+    def failures(self) -> dict[str, str]:
+        rows = self._connection().execute(
+            "SELECT id, error FROM units WHERE state = ?", (FAILED,)
+        )
+        return {uid: error or "" for uid, error in rows}
+
+
+class _Transaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT`` (or ``ROLLBACK``) context manager."""
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def work(
+    queue: WorkQueue,
+    store: DirectoryStore,
+    worker: str | None = None,
+    client: Callable[[], FuelWatch] = FuelWatch,
+    lease_seconds: float = 60.0,
+    poll_interval: float = 1.0,
+) -> int:
+    """Process units from a queue until none remain.
+
+    When nothing is leasable but other workers still hold leases, the worker
+    waits, ready to take over any lease that expires.
+
+    Args:
+        queue: Shared work queue.
+        store: Where fetched responses are written.
+        worker: Worker name recorded on leases. Defaults to host:pid:thread.
+        client: FuelWatch factory.
+        lease_seconds: How long a unit is reserved for this worker.
+        poll_interval: Seconds to wait when no unit is ready.
+
+    Returns:
+        Number of units this worker completed.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    api = client()
+    completed = 0
+    while True:
+        unit = queue.lease(worker, lease_seconds)
+        if unit is None:
+            if not queue.remaining():
+                return completed
+            time.sleep(poll_interval)
+            continue
+        try:
+            raw = api.query(**unit.query.params(day=unit.day.strftime("%d/%m/%Y")))
+            store.put(unit.query, unit.day, raw)
+        except FuelWatchError as e:
+            logger.warning("Sweep unit %s failed: %s", unit.id, e)
+            queue.fail(unit, str(e))
+            continue
+        queue.complete(unit)
+        completed += 1
+
+
+def _worker_main(
+    queue_path: str,
+    max_attempts: int,
+    store_root: str,
+    client: Callable[[], FuelWatch],
+    lease_seconds: float,
+) -> None:
+    queue = SQLiteQueue(queue_path, max_attempts=max_attempts)
+    work(queue, DirectoryStore(store_root), client=client, lease_seconds=lease_seconds)
+
+
+@dataclass(slots=True)
+class SweepReport:
+    """Outcome of a sweep.
+
+    Attributes:
+        units: Number of units in the sweep
+        failed: Last error of each unit that exhausted its attempts, by id
+    """
+
+    units: int
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+def sweep(
+    units: Iterable[WorkUnit],
+    store: DirectoryStore,
+    queue_path: str | os.PathLike[str],
+    processes: int = 4,
+    client: Callable[[], FuelWatch] = FuelWatch,
+    lease_seconds: float = 60.0,
+    max_attempts: int = 3,
+) -> SweepReport:
+    """Run a sweep across local worker processes.
+
+    The queue lives in ``queue_path``; workers on other hosts can join the
+    same sweep by calling :func:`work` with a :class:`SQLiteQueue` on that
+    file. Re-running an interrupted sweep with the same file resumes it.
+
+    Args:
+        units: Work units, e.g. from :func:`plan`.
+        store: Where fetched responses are written.
+        queue_path: SQLite file coordinating the workers.
+        processes: Number of local worker processes.
+        client: Picklable FuelWatch factory used by each worker.
+        lease_seconds: Lease duration before a unit is reassigned.
+        max_attempts: Leases a unit may receive before it is marked failed.
+
+    Returns:
+        Sweep report.
+    """
+    units = list(units)
+    queue = SQLiteQueue(queue_path, max_attempts=max_attempts)
+    queue.put(units)
+    args = (os.fspath(queue_path), max_attempts, os.fspath(store.root), client)
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(*args, lease_seconds))
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    return SweepReport(units=len(units), failed=queue.failures())
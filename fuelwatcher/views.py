@@ -0,0 +1,237 @@
+"""
+Lazy, zero-copy station views over a raw FuelWatch RSS response.
+
+Instead of building an element tree and decoding every field, the response is
+scanned once for the byte offsets of each item's fields. A :class:`StationView`
+keeps a ``memoryview`` of the retained response and decodes a field only the
+first time it is read.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import html
+import re
+from array import array
+from typing import Any
+
+from fuelwatcher.models import FuelStation, FuelWatchError
+
+# FuelStation attribute name -> XML tag, in FuelStation field order.
+FIELDS: dict[str, str] = {
+    "title": "title",
+    "description": "description",
+    "brand": "brand",
+    "date": "date",
+    "price": "price",
+    "trading_name": "trading-name",
+    "location": "location",
+    "address": "address",
+    "phone": "phone",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "site_features": "site-features",
+}
+# Fields that are None (rather than "") when absent, matching FuelStation.
+OPTIONAL_FIELDS = frozenset({"phone", "site_features"})
+
+_TAG_INDEX = {tag.encode(): i for i, tag in enumerate(FIELDS.values())}
+_TEXT = rb"([^<]*(?:<!\[CDATA\[.*?\]\]>[^<]*)*)"
+# Fast path: an item whose fields appear in feed order, each optional. Every
+# field contributes two groups: its text, and an empty group for <tag/>.
+_ORDERED_ITEM_RE = re.compile(
+    rb"<item>\s*"
+    + b"".join(
+        rb"(?:<"
+        + tag
+        + rb">"
+        + _TEXT
+        + rb"</"
+        + tag
+        + rb">\s*|<"
+        + tag
+        + rb"\s*/>()\s*)?"
+        for tag in map(re.escape, _TAG_INDEX)
+    )
+    + rb"</item>",
+    re.DOTALL,
+)
+# Fallback for anything else: item boundaries, or a station field element with
+# its text captured as a span.
+_TOKEN_RE = re.compile(
+    rb"<(/?item)(?:\s[^>]*)?>"
+    rb"|<(" + b"|".join(map(re.escape, _TAG_INDEX)) + rb")(?:\s[^>]*)?"
+    rb"(?:/>|>" + _TEXT + rb"(</\2\s*>)?)",
+    re.DOTALL,
+)
+_ITEM_START_RE = re.compile(rb"<item(?:\s[^>]*)?(/?)>")
+_ENCODING_RE = re.compile(rb"""<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""")
+_CDATA_RE = re.compile(r"<!\[CDATA\[(.*?)\]\]>", re.DOTALL)
+
+_ABSENT = -1
+_UNDECODED: Any = object()
+
+
+def _encoding(raw: bytes) -> str:
+    match = _ENCODING_RE.match(raw.lstrip(b"\xef\xbb\xbf"))
+    encoding = match.group(1).decode("ascii") if match else "utf-8"
+    if encoding.lower().replace("-", "").replace("_", "") in {"utf16", "utf32"}:
+        raise FuelWatchError(f"Lazy parsing does not support {encoding} responses")
+    return encoding
+
+
+def _decode(buf: memoryview, start: int, end: int, encoding: str) -> str:
+    text = str(buf[start:end], encoding)
+    if "\r" in text:  # XML end-of-line handling, before references expand
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "<" in text:
+        text = _CDATA_RE.sub(lambda m: m.group(1).replace("&", "&amp;"), text)
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+
+def _scan_item(raw: bytes, pos: int, row: list[int]) -> int:
+    """Record field spans of the item body starting at ``pos``; return its end."""
+    search = _TOKEN_RE.search
+    token = search(raw, pos)
+    while token is not None:
+        pos = token.end()
+        if token.group(1) == b"/item":
+            return pos
+        tag = token.group(2)
+        if tag is not None:
+            if token.group(3) is not None and token.group(4) is None:
+                # Mixed content: like findtext(), keep only the text before
+                # the first child, then skip the rest of the element.
+                close = raw.find(b"</" + tag, pos)
+                pos = len(raw) if close == -1 else raw.find(b">", close) + 1
+            i = 2 * _TAG_INDEX[tag]
+            if row[i] != _ABSENT:
+                pass  # findtext() semantics: first occurrence wins
+            elif token.start(3) == -1:  # self-closing element
+                row[i] = row[i + 1] = token.end()
+            else:
+                row[i], row[i + 1] = token.span(3)
+        token = search(raw, pos)
+    return len(raw)
+
+
+def scan(raw: bytes) -> array:
+    """Record the byte spans of every item field in a raw RSS response.
+
+    Args:
+        raw: Raw RSS XML bytes.
+
+    Returns:
+        Flat array of ``(start, end)`` offsets, ``len(FIELDS)`` pairs per item.
+        Absent fields have both offsets set to -1.
+    """
+    width = len(FIELDS)
+    spans = array("q")
+    fast = _ORDERED_ITEM_RE.match
+    find = _ITEM_START_RE.search
+    start = find(raw)
+    while start is not None:
+        if start.group(1):  # <item/>
+            spans.extend([_ABSENT] * (2 * width))
+            start = find(raw, start.end())
+            continue
+        pos = start.start()
+        match = fast(raw, pos)
+        if match is not None:
+            regs = match.regs
+            for i in range(1, 2 * width + 1, 2):
+                text, empty = regs[i], regs[i + 1]
+                spans.extend(text if text[0] != -1 else empty)
+            pos = match.end()
+        else:
+            row = [_ABSENT] * (2 * width)
+            pos = _scan_item(raw, start.end(), row)
+            spans.extend(row)
+        start = find(raw, pos)
+    return spans
+
+
+class StationView:
+    """Read-only station whose fields are decoded on first access.
+
+    Exposes the same attributes as :class:`FuelStation`, plus
+    :meth:`to_station` and :meth:`to_dict` for full conversion.
+    """
+
+    __slots__ = ("_buf", "_spans", "_base", "_encoding", "_values")
+
+    title: str
+    description: str
+    brand: str
+    date: str
+    price: str
+    trading_name: str
+    location: str
+    address: str
+    phone: str | None
+    latitude: str
+    longitude: str
+    site_features: str | None
+
+    def __init__(
+        self, buf: memoryview, spans: array, index: int, encoding: str = "utf-8"
+    ) -> None:
+        self._buf = buf
+        self._spans = spans
+        self._base = 2 * len(FIELDS) * index
+        self._encoding = encoding
+        self._values: list[Any] = [_UNDECODED] * len(FIELDS)
+
+    def _field(self, i: int, optional: bool) -> str | None:
+        value = self._values[i]
+        if value is _UNDECODED:
+            start = self._spans[self._base + 2 * i]
+            if start == _ABSENT:
+                value = None if optional else ""
+            else:
+                end = self._spans[self._base + 2 * i + 1]
+                value = _decode(self._buf, start, end, self._encoding)
+            self._values[i] = value
+        return value
+
+    def to_station(self) -> FuelStation:
+        """Decode every field into a :class:`FuelStation`."""
+        return FuelStation(**{name: getattr(self, name) for name in FIELDS})
+
+    def to_dict(self) -> dict[str, str | None]:
+        """Convert to dictionary with hyphenated keys, like FuelStation."""
+        return {tag: getattr(self, name) for name, tag in FIELDS.items()}
+
+    def __repr__(self) -> str:
+        return f"StationView(trading_name={self.trading_name!r}, price={self.price!r})"
+
+
+def _field_property(i: int, name: str) -> property:
+    optional = name in OPTIONAL_FIELDS
+    return property(
+        lambda self: self._field(i, optional),
+        doc=f"Station {name}, decoded on first access.",
+    )
+
+
+for _i, _name in enumerate(FIELDS):
+    setattr(StationView, _name, _field_property(_i, _name))
+
+
+def parse_views(raw: bytes) -> list[StationView]:
+    """Build lazy station views over a raw RSS response without copying it.
+
+    Args:
+        raw: Raw RSS XML bytes. The views keep a reference to this buffer.
+
+    Raises:
+        FuelWatchError: If the response encoding cannot be scanned bytewise.
+    """
+    encoding = _encoding(raw)
+    spans = scan(raw)
+    buf = memoryview(raw)
+    return [
+        StationView(buf, spans, i, encoding)
+        for i in range(len(spans) // (2 * len(FIELDS)))
+    ]
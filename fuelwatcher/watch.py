@@ -0,0 +1,235 @@
+"""
+Async stream of station changes.
+
+A :class:`Watcher` polls each query on a schedule and publishes only the
+stations that were added, removed or repriced since the previous poll. Each
+query is polled by one shared task no matter how many subscribers want it;
+the task stops when its last subscriber leaves.
+
+Unchanged responses are detected by hashing the raw bytes and skip parsing
+entirely. Otherwise stations are matched on :attr:`FuelStation.key` in a hash
+map, so a tick costs one dict lookup and price comparison per station.
+
+Every subscriber has a bounded queue. When it is full the poller waits for
+the subscriber to catch up, so a slow consumer delays the next poll instead
+of growing memory without bound.
+
+A failed request or an unparseable response is logged and retried on the
+next tick. Any other error stops the poll task and is raised from
+:meth:`Watcher.subscribe` in every subscriber, so none is left waiting on a
+stream that will never produce again.
+
+    Copyright (C) 2018-2026, Daniel Michaels
+"""
+
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncIterator, Callable, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from fuelwatcher.models import FuelStation, FuelWatchError, Query, StationKey
+
+if TYPE_CHECKING:
+    from fuelwatcher.fuelwatch import FuelWatch
+
+logger = logging.getLogger(__name__)
+
+ADDED = "added"
+REMOVED = "removed"
+REPRICED = "repriced"
+
+ChangeKind = Literal["added", "removed", "repriced"]
+
+
+@dataclass(frozen=True, slots=True)
+class Change:
+    """A single station change between two polls of a query.
+
+    Attributes:
+        kind: "added", "removed" or "repriced"
+        query: Query the change was observed on
+        station: Current station (the last known one when removed)
+        previous: Station before a reprice (None otherwise)
+    """
+
+    kind: ChangeKind
+    query: Query
+    station: FuelStation
+    previous: FuelStation | None = None
+
+
+def diff(
+    query: Query,
+    old: dict[StationKey, FuelStation],
+    new: dict[StationKey, FuelStation],
+) -> list[Change]:
+    """Return the changes between two snapshots keyed by station.
+
+    Stations whose other fields changed without a price change are not
+    reported.
+    """
+    changes: list[Change] = []
+    for key, station in new.items():
+        before = old.get(key)
+        if before is None:
+            changes.append(Change(ADDED, query, station))
+        elif before.price != station.price:
+            changes.append(Change(REPRICED, query, station, before))
+    changes.extend(
+        Change(REMOVED, query, station)
+        for key, station in old.items()
+        if key not in new
+    )
+    return changes
+
+
+class _Poll:
+    """Shared polling state for one query."""
+
+    def __init__(self, query: Query) -> None:
+        self.query = query
+        self.subscribers: set[asyncio.Queue[Change | Exception]] = set()
+        self.task: asyncio.Task[None] | None = None
+        self.digest: bytes | None = None
+        self.stations: dict[StationKey, FuelStation] | None = None
+
+
+class Watcher:
+    """Poll queries on a schedule and fan changes out to subscribers.
+
+    Example:
+        >>> watcher = Watcher(FuelWatch, interval=60)
+        >>> async for change in watcher.subscribe([Query(product=1, region=25)]):
+        ...     print(change.kind, change.station.trading_name, change.station.price)
+    """
+
+    def __init__(
+        self,
+        client: "Callable[[], FuelWatch]",
+        interval: float = 60.0,
+        queue_size: int = 1000,
+        day: str | None = None,
+    ) -> None:
+        """Initialize a watcher.
+
+        Args:
+            client: Factory for the FuelWatch client used by each poll task.
+            interval: Seconds between polls of each query.
+            queue_size: Maximum changes buffered per subscriber.
+            day: Day filter passed to every query, e.g. 'tomorrow'.
+        """
+        self.client = client
+        self.interval = interval
+        self.queue_size = queue_size
+        self.day = day
+        self._polls: dict[Query, _Poll] = {}
+
+    async def _fetch(self, api: "FuelWatch", query: Query) -> bytes:
+        return await asyncio.to_thread(api.query, **query.params(day=self.day))
+
+    async def _parse(
+        self, poll: _Poll, api: "FuelWatch", raw: bytes
+    ) -> dict[StationKey, FuelStation] | None:
+        """Return the stations in ``raw``, or None if it is unchanged."""
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest == poll.digest:
+            return None
+        stations = await asyncio.to_thread(
+            lambda: {station.key: station for station in api.stations}
+        )
+        poll.digest = digest  # only once parsed, so a bad response is retried
+        return stations
+
+    async def _run(self, poll: _Poll) -> None:
+        try:
+            api = self.client()
+            while True:
+                try:
+                    raw = await self._fetch(api, poll.query)
+                    stations = await self._parse(poll, api, raw)
+                except FuelWatchError as e:
+                    logger.warning("Watch poll of %s failed: %s", poll.query.slug, e)
+                else:
+                    if stations is not None:
+                        await self._publish(poll, stations)
+                await asyncio.sleep(self.interval)
+        except Exception as e:
+            logger.exception("Watch of %s stopped", poll.query.slug)
+            self._fail(poll, e)
+
+    def _fail(self, poll: _Poll, error: Exception) -> None:
+        """Hand ``error`` to every subscriber of a poll that has died."""
+        for queue in poll.subscribers:
+            while queue.full():  # the error matters more than stale changes
+                queue.get_nowait()
+            queue.put_nowait(error)
+
+    async def _publish(
+        self, poll: _Poll, stations: dict[StationKey, FuelStation]
+    ) -> None:
+        if poll.stations is None:
+            poll.stations = stations  # first poll sets the baseline
+            return
+        changes = diff(poll.query, poll.stations, stations)
+        poll.stations = stations
+        for change in changes:
+            for queue in list(poll.subscribers):
+                if queue in poll.subscribers:  # may leave while we wait
+                    await queue.put(change)
+
+    def _join(self, query: Query, queue: "asyncio.Queue[Change | Exception]") -> None:
+        poll = self._polls.get(query)
+        if poll is None:
+            poll = self._polls[query] = _Poll(query)
+        poll.subscribers.add(queue)
+        if poll.task is None or poll.task.done():
+            poll.task = asyncio.create_task(self._run(poll))
+
+    def _leave(self, query: Query, queue: "asyncio.Queue[Change | Exception]") -> None:
+        poll = self._polls.get(query)
+        if poll is None:
+            return
+        poll.subscribers.discard(queue)
+        # Unblock a poller waiting on this subscriber's full queue.
+        while not queue.empty():
+            queue.get_nowait()
+        if not poll.subscribers:
+            if poll.task is not None:
+                poll.task.cancel()
+            del self._polls[query]
+
+    async def subscribe(self, queries: Iterable[Query]) -> AsyncIterator[Change]:
+        """Yield changes for ``queries`` until the consumer stops iterating.
+
+        The first poll of a query establishes its baseline; only later
+        changes are yielded. Breaking out of the loop, closing the generator
+        or cancelling the consuming task unsubscribes cleanly.
+
+        Raises:
+            FuelWatchError: A poll task stopped on an unexpected error.
+        """
+        queries = list(dict.fromkeys(queries))
+        queue: asyncio.Queue[Change | Exception] = asyncio.Queue(
+            maxsize=self.queue_size
+        )
+        for query in queries:
+            self._join(query, queue)
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise FuelWatchError(f"Watch stopped: {item}") from item
+                yield item
+        finally:
+            for query in queries:
+                self._leave(query, queue)
+
+    async def close(self) -> None:
+        """Stop every poll task."""
+        tasks = [poll.task for poll in self._polls.values() if poll.task]
+        self._polls.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
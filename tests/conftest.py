@@ -0,0 +1,89 @@
+"""Shared fixture feeds, loaded clients and canned clients for the tests."""
+
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fuelwatcher import FuelStation, FuelWatch
+
+FIXTURES = Path(__file__).parent / "fixtures"
+FEED = (FIXTURES / "feed.xml").read_bytes()
+EMPTY = (FIXTURES / "empty.xml").read_bytes()
+
+
+def loaded(raw: bytes = FEED) -> FuelWatch:
+    """Return a FuelWatch client with ``raw`` loaded."""
+    api = FuelWatch()
+    api.load(raw)
+    return api
+
+
+@pytest.fixture
+def loaded_api() -> FuelWatch:
+    """FuelWatch loaded with the fixture feed."""
+    return loaded()
+
+
+@pytest.fixture
+def stations(loaded_api: FuelWatch) -> list[FuelStation]:
+    """Stations parsed from the fixture feed: Puma, Vibe and BP."""
+    return loaded_api.stations
+
+
+class CannedClient:
+    """Client factory whose clients answer queries with canned responses.
+
+    Pass an instance wherever a ``Callable[[], FuelWatch]`` is expected.
+    Every query made by any of its clients is recorded in :attr:`calls`.
+    Instances answering with bytes can be pickled for worker processes;
+    queries made there are not recorded here.
+
+    Args:
+        respond: Response bytes for every query, or a function of the query
+            keyword arguments returning them (or raising FuelWatchError).
+    """
+
+    def __init__(self, respond: bytes | Callable[..., bytes] = FEED) -> None:
+        self.respond = respond
+        self.calls: list[dict[str, Any]] = []
+        self.clients = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> FuelWatch:
+        with self._lock:
+            self.clients += 1
+        return _CannedFuelWatch(self)
+
+    def answer(self, kwargs: dict[str, Any]) -> bytes:
+        """Record a query and return its canned response."""
+        with self._lock:
+            self.calls.append(kwargs)
+        if isinstance(self.respond, bytes):
+            return self.respond
+        return self.respond(**kwargs)
+
+
+class _CannedFuelWatch(FuelWatch):
+    def __init__(self, canned: CannedClient) -> None:
+        super().__init__()
+        self._canned = canned
+
+    def query(self, **kwargs: Any) -> bytes:  # type: ignore[override]
+        raw = self._canned.answer(kwargs)
+        self.load(raw)
+        return raw
+
+    def _clone(self) -> FuelWatch:
+        return self._canned()
@@ -0,0 +1,198 @@
+"""Tests for incremental price-cycle analytics."""
+
+import dataclasses
+import statistics
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from fuelwatcher import FuelStation, FuelWatchError
+from fuelwatcher.analytics import (
+    PriceCycleAnalytics,
+    PriceSketch,
+    RunningMoments,
+    WindowedExtrema,
+)
+
+START = date(2024, 1, 1)  # a Monday
+
+
+def on_day(stations: list[FuelStation], offset: int, bump: float) -> list[FuelStation]:
+    """Copy stations to START + offset days with prices raised by ``bump``."""
+    day = (START + timedelta(days=offset)).isoformat()
+    return [
+        dataclasses.replace(s, date=day, price=f"{float(s.price) + bump:.1f}")
+        for s in stations
+    ]
+
+
+def test_running_moments_match_statistics() -> None:
+    """Streaming moments agree with a full recomputation, including merges."""
+    values = [171.9, 174.5, 179.9, 165.0, 181.3]
+    left, right = RunningMoments(), RunningMoments()
+    for v in values[:2]:
+        left.add(v)
+    for v in values[2:]:
+        right.add(v)
+    left.merge(right)
+
+    assert left.count == 5
+    assert left.mean == pytest.approx(statistics.mean(values))
+    assert left.variance == pytest.approx(statistics.variance(values))
+    assert (left.min, left.max) == (165.0, 181.3)
+
+    left.remove(181.3)
+    assert left.mean == pytest.approx(statistics.mean(values[:4]))
+    assert left.variance == pytest.approx(statistics.variance(values[:4]))
+
+
+def test_windowed_extrema_expire() -> None:
+    """Extremes only cover the last ``days`` days."""
+    window = WindowedExtrema(days=3)
+    for day, value in enumerate([150.0, 190.0, 170.0, 160.0, 165.0]):
+        window.add(day, value)
+    assert (window.min, window.max) == (160.0, 170.0)
+    window.remove(3, 160.0)
+    assert (window.min, window.max) == (165.0, 170.0)
+    window.remove(2, 170.0)
+    assert (window.min, window.max) == (165.0, 165.0)
+
+
+def test_windowed_extrema_out_of_order_days() -> None:
+    """Late days join the window in place; days already outside are ignored."""
+    window = WindowedExtrema(days=2)
+    window.add(12, 1.0)
+    window.add(10, 0.5)
+    assert (window.min, window.max) == (1.0, 1.0)
+    window.expire(12)
+    assert (window.min, window.max) == (1.0, 1.0)
+
+    window.add(11, 0.5)
+    window.add(11, 3.0)
+    assert (window.min, window.max) == (0.5, 3.0)
+    window.add(13, 2.0)
+    assert (window.min, window.max) == (1.0, 2.0)
+    window.remove(12, 1.0)
+    assert (window.min, window.max) == (2.0, 2.0)
+
+
+def test_backfilled_day_in_shared_group(stations: list[FuelStation]) -> None:
+    """An older day folded in for another region only counts inside the window."""
+    analytics = PriceCycleAnalytics(window_days=2)
+    analytics.update(on_day(stations, 10, 0)[:1], product=1, region="North")
+    for offset, bump, region in ((8, -20.0, "South"), (9, -10.0, "East")):
+        [other] = on_day(stations, offset, bump)[:1]
+        other = dataclasses.replace(other, address=f"1 {region} Rd")
+        analytics.update([other], product=1, region=region)
+
+    puma = analytics.group("brand", "Puma", product=1)
+    assert (puma.window.min, puma.window.max) == (161.9, 171.9)
+    assert puma.moments.count == 3
+
+
+def test_price_sketch_quantiles_and_merge() -> None:
+    """The sketch is exact at 0.1 cent resolution and mergeable."""
+    a, b = PriceSketch(), PriceSketch()
+    for v in (171.9, 174.5):
+        a.add(v)
+    for v in (179.9, 165.0, 181.3):
+        b.add(v)
+    a.merge(b)
+    assert a.median == 174.5
+    assert a.quantile(0) == 165.0
+    assert a.quantile(1) == 181.3
+    a.remove(165.0)
+    assert a.count == 4
+    assert PriceSketch.from_dict(a.to_dict()).median == a.median
+
+
+def test_update_skips_unchanged_snapshots(stations: list[FuelStation]) -> None:
+    """Re-polling the same day changes nothing."""
+    analytics = PriceCycleAnalytics()
+    assert analytics.update(on_day(stations, 0, 0), product=1) == 3
+    assert analytics.update(on_day(stations, 0, 0), product=1) == 0
+    assert analytics.group("brand", "Puma", product=1).moments.count == 1
+
+
+def test_update_replaces_corrected_prices(stations: list[FuelStation]) -> None:
+    """A new price for an already folded day replaces the old one."""
+    analytics = PriceCycleAnalytics()
+    analytics.update(on_day(stations, 0, 0), product=1)
+    assert analytics.update(on_day(stations, 0, 1.0)[:1], product=1) == 1
+
+    puma = analytics.group("brand", "Puma", product=1)
+    assert puma.moments.count == 1
+    assert puma.moments.mean == pytest.approx(172.9)
+    assert puma.weekday_medians()[0] == 172.9
+
+
+def test_products_are_aggregated_separately(stations: list[FuelStation]) -> None:
+    """A second product on the same day is not mistaken for a reprice."""
+    analytics = PriceCycleAnalytics()
+    analytics.update(on_day(stations, 0, 0), product=1)
+    assert analytics.update(on_day(stations, 0, 20.0), product=4) == 3
+
+    ulp = analytics.group("brand", "Puma", product=1)
+    diesel = analytics.group("brand", "Puma", product=4)
+    assert (ulp.moments.count, ulp.moments.mean) == (1, 171.9)
+    assert (ulp.window.min, ulp.window.max) == (171.9, 171.9)
+    assert diesel.moments.mean == pytest.approx(191.9)
+
+
+def test_retracted_price_leaves_window(stations: list[FuelStation]) -> None:
+    """A corrected price no longer counts towards the window extremes."""
+    analytics = PriceCycleAnalytics()
+    analytics.update(on_day(stations, 0, 20.0), product=1)
+    analytics.update(on_day(stations, 1, 0), product=1)
+    analytics.update(on_day(stations, 1, 30.0)[:1], product=1)
+
+    puma = analytics.group("brand", "Puma", product=1)
+    assert (puma.window.min, puma.window.max) == (191.9, 201.9)
+    restored = WindowedExtrema.from_dict(puma.window.to_dict())
+    assert (restored.min, restored.max) == (191.9, 201.9)
+
+
+def test_weekly_cycle_aggregates(stations: list[FuelStation]) -> None:
+    """Weekday medians and cycle phase follow a synthetic weekly cycle."""
+    cycle = [20.0, 15.0, 10.0, 5.0, 0.0, 0.0, 0.0]  # peak Monday, trough Fri
+    analytics = PriceCycleAnalytics(window_days=7)
+    for offset in range(14):
+        analytics.update(
+            on_day(stations, offset, cycle[offset % 7]), product=1, region="North"
+        )
+
+    region = analytics.group("region", "North", product=1)
+    assert region.moments.count == 42
+    assert region.window.min == 171.9
+    assert region.window.max == 199.9
+    medians = region.weekday_medians()
+    assert medians[0] == 194.5
+    assert medians[4] == 174.5
+    low, high = 171.9, 199.9
+    trough = statistics.mean([171.9, 174.5, 179.9])
+    assert region.phase == pytest.approx((trough - low) / (high - low))
+
+    analytics.update(on_day(stations, 14, 20.0), product=1, region="North")
+    peak = statistics.mean([191.9, 194.5, 199.9])
+    assert region.phase == pytest.approx((peak - low) / (high - low))
+
+
+def test_state_round_trip(tmp_path: Path, stations: list[FuelStation]) -> None:
+    """Saved state restores to identical aggregates that keep updating."""
+    analytics = PriceCycleAnalytics()
+    for offset in range(3):
+        analytics.update(on_day(stations, offset, offset), product=1, region="North")
+    path = tmp_path / "analytics.json"
+    analytics.save(path)
+    restored = PriceCycleAnalytics.load(path)
+
+    assert restored.to_dict() == analytics.to_dict()
+    assert restored.update(on_day(stations, 2, 2), product=1) == 0
+    assert restored.update(on_day(stations, 3, 3), product=1) == 3
+
+
+def test_unknown_group_raises_error() -> None:
+    """Looking up a group with no data raises FuelWatchError."""
+    with pytest.raises(FuelWatchError, match="No data for brand: Nope"):
+        PriceCycleAnalytics().group("brand", "Nope", product=1)
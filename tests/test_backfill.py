@@ -0,0 +1,99 @@
+"""Tests for concurrent history backfill."""
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fuelwatcher import FuelWatchError, Query
+from fuelwatcher.backfill import DirectoryStore, backfill, today
+from tests.conftest import FEED, CannedClient
+
+
+def test_query_slug_and_grid() -> None:
+    """Query.grid expands combinations with stable slugs."""
+    queries = Query.grid(products=[1, 4], regions=[25, 26])
+    assert len(queries) == 4
+    assert queries[0].slug == "product-1_region-25"
+    assert Query(suburb="Mount Lawley", surrounding=False).slug == (
+        "suburb-Mount+Lawley_surrounding-False"
+    )
+    assert Query().slug == "all"
+
+
+def test_backfill_fetches_only_missing_pairs(tmp_path: Path) -> None:
+    """Stored pairs are skipped; the rest are fetched and stored."""
+    store = DirectoryStore(tmp_path)
+    queries = Query.grid(products=[1, 4])
+    start = today() - timedelta(days=2)
+    store.put(queries[0], start, FEED)
+
+    client = CannedClient()
+    report = backfill(queries, start, store=store, client=client)
+
+    assert len(report.requested) == 6
+    assert report.present == [(queries[0], start)]
+    assert len(report.fetched) == 5
+    assert report.ratio == 1.0
+    assert len(client.calls) == 5
+    assert {c["day"] for c in client.calls} == {
+        (start + timedelta(days=n)).strftime("%d/%m/%Y") for n in range(3)
+    }
+    assert store.get(queries[1], start) == FEED
+
+
+def test_backfill_reports_unavailable_days(tmp_path: Path) -> None:
+    """Days older than a week cannot be fetched and are reported."""
+    old = today() - timedelta(days=9)
+    report = backfill(
+        [Query(product=1)],
+        old,
+        old + timedelta(days=2),
+        store=DirectoryStore(tmp_path),
+        client=CannedClient(),
+    )
+    assert len(report.unavailable) == 2
+    assert len(report.fetched) == 1
+    assert report.ratio == pytest.approx(1 / 3)
+
+
+def test_backfill_resumes_from_store(tmp_path: Path) -> None:
+    """After a failed run, the next run fetches only what's left."""
+    store = DirectoryStore(tmp_path / "data")
+    start = today() - timedelta(days=3)
+    bad = (start + timedelta(days=1)).strftime("%d/%m/%Y")
+
+    def flaky(**kwargs: Any) -> bytes:
+        if kwargs["day"] == bad:
+            raise FuelWatchError("Request failed: timeout")
+        return FEED
+
+    first = backfill([Query(product=1)], start, store=store, client=CannedClient(flaky))
+    assert len(first.failed) == 1
+    assert "timeout" in next(iter(first.failed.values()))
+
+    client = CannedClient()
+    second = backfill([Query(product=1)], start, store=store, client=client)
+    assert [c["day"] for c in client.calls] == [bad]
+    assert second.ratio == 1.0
+
+
+def test_backfill_refetches_pairs_missing_from_store(tmp_path: Path) -> None:
+    """A pair counts as done only while its file is in the store."""
+    store = DirectoryStore(tmp_path / "data")
+    start = today() - timedelta(days=1)
+    query = Query(product=1)
+    backfill([query], start, store=store, client=CannedClient())
+
+    store.path(query, start).unlink()
+    client = CannedClient()
+    report = backfill([query], start, store=store, client=client)
+    assert report.fetched == [(query, start)]
+    assert [c["day"] for c in client.calls] == [start.strftime("%d/%m/%Y")]
+
+
+def test_store_get_missing_raises_error(tmp_path: Path) -> None:
+    """Reading an absent pair raises FuelWatchError."""
+    with pytest.raises(FuelWatchError, match="No stored data"):
+        DirectoryStore(tmp_path).get(Query(), date(2024, 1, 1))
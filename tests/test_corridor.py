@@ -0,0 +1,117 @@
+"""Tests for batched route-corridor search."""
+
+import dataclasses
+import math
+import random
+
+import pytest
+
+from fuelwatcher import FuelStation, FuelWatchError
+from fuelwatcher.corridor import METRES_PER_DEGREE, CorridorIndex
+from fuelwatcher.prices import PriceMatrix
+from tests.conftest import loaded
+
+LAT = -31.95
+# Degrees of longitude per metre at LAT.
+LON_PER_M = 1 / (METRES_PER_DEGREE * math.cos(math.radians(LAT)))
+LAT_PER_M = 1 / METRES_PER_DEGREE
+
+
+def fixture_station() -> FuelStation:
+    """Return a fixture station to copy."""
+    return loaded().stations[0]
+
+
+TEMPLATE = fixture_station()
+
+
+def at(name: str, east: float, north: float, price: str) -> FuelStation:
+    """Return a station ``east``/``north`` metres from (LAT, 115.86)."""
+    return dataclasses.replace(
+        TEMPLATE,
+        trading_name=name,
+        address=f"{name} Rd",
+        latitude=str(LAT + north * LAT_PER_M),
+        longitude=str(115.86 + east * LON_PER_M),
+        price=price,
+    )
+
+
+def route(*points: tuple[float, float]) -> list[tuple[float, float]]:
+    """Return a route through points given in metres east/north."""
+    return [(LAT + n * LAT_PER_M, 115.86 + e * LON_PER_M) for e, n in points]
+
+
+STATIONS = [
+    at("Near cheap", 5000, 1500, "170.0"),
+    at("Near dear", 2000, -500, "190.0"),
+    at("On route", 9000, 0, "180.0"),
+    at("Past end", 12500, 0, "150.0"),
+    at("Too far", 5000, 2500, "140.0"),
+    dataclasses.replace(TEMPLATE, latitude="", price="100.0"),
+]
+
+
+def test_ranks_stations_inside_corridor() -> None:
+    """Stations within the radius are ranked by price with distances."""
+    index = CorridorIndex(STATIONS)
+    assert len(index) == 5  # the station without coordinates is skipped
+    [candidates] = index.search([route((0, 0), (10000, 0))], radius=2000)
+    assert [c.station.trading_name for c in candidates] == [
+        "Near cheap",
+        "On route",
+        "Near dear",
+    ]
+    cheap = candidates[0]
+    assert cheap.price == 170.0
+    assert cheap.distance == pytest.approx(1500, abs=1)
+    assert cheap.along == pytest.approx(5000, abs=1)
+
+
+def test_batch_returns_one_list_per_route() -> None:
+    """Routes are answered in order; limits and bends are respected."""
+    index = CorridorIndex(STATIONS, cell_size=500)
+    results = index.search(
+        [
+            route((0, 0), (10000, 0)),
+            route((10000, 0), (12000, 0), (12000, 3000)),
+            route((5000, 2400)),
+            [],
+        ],
+        radius=2000,
+        limit=2,
+    )
+    assert [len(r) for r in results] == [2, 2, 2, 0]
+    assert [c.station.trading_name for c in results[1]] == ["Past end", "On route"]
+    assert results[1][0].distance == pytest.approx(500, abs=1)
+    assert [c.station.trading_name for c in results[2]] == ["Too far", "Near cheap"]
+
+
+def test_matches_brute_force() -> None:
+    """The grid never misses or adds stations compared with checking all."""
+    rng = random.Random(7)
+    stations = [
+        at(f"S{i}", rng.uniform(0, 50000), rng.uniform(0, 50000), "170.0")
+        for i in range(400)
+    ]
+    routes = [
+        route(*[(rng.uniform(0, 50000), rng.uniform(0, 50000)) for _ in range(4)])
+        for _ in range(30)
+    ]
+    index = CorridorIndex(stations, cell_size=1000)
+    everything = CorridorIndex(stations, cell_size=1e9)
+    for r in routes:
+        assert index.nearby(r, 2000).keys() == everything.nearby(r, 2000).keys()
+
+
+def test_from_price_matrix() -> None:
+    """A price matrix column can be indexed; NaN prices are skipped."""
+    matrix = PriceMatrix({4: STATIONS[:2], 5: STATIONS[2:4]})
+    index = CorridorIndex.from_prices(matrix, 4)
+    assert [s.trading_name for s in index.stations] == ["Near cheap", "Near dear"]
+
+
+def test_invalid_cell_size() -> None:
+    """Cell sizes must be positive."""
+    with pytest.raises(FuelWatchError, match="cell size"):
+        CorridorIndex(STATIONS, cell_size=0)
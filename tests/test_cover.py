@@ -0,0 +1,83 @@
+"""Tests for minimal suburb query covers."""
+
+import re
+from pathlib import Path
+from typing import Any
+
+from fuelwatcher.cover import Neighbourhoods, fetch_cover, plan_cover
+from tests.conftest import FEED, CannedClient
+
+ITEMS = re.compile(rb"<item>.*</item>", re.S)
+ITEM = ITEMS.search(FEED).group().split(b"</item>")[0] + b"</item>"
+
+# Suburbs each surrounding query returns, as the live feed would.
+AROUND = {
+    "Bayswater": ["BAYSWATER", "MAYLANDS", "MORLEY", "INGLEWOOD"],
+    "Morley": ["MORLEY", "BAYSWATER", "NORANDA", "DIANELLA"],
+    "Maylands": ["MAYLANDS", "BAYSWATER", "INGLEWOOD"],
+    "Inglewood": ["INGLEWOOD", "MAYLANDS", "BAYSWATER", "MOUNT LAWLEY"],
+    "Noranda": ["NORANDA", "MORLEY"],
+    "Dianella": ["DIANELLA", "MORLEY", "NORANDA"],
+}
+TARGETS = ["Bayswater", "Morley", "Maylands", "Inglewood", "Noranda", "Dianella"]
+
+
+def feed_for(suburb: str, **kwargs: Any) -> bytes:
+    """Return a feed with one station in each suburb around ``suburb``."""
+    items = [
+        re.sub(
+            rb"<location>[^<]*</location>",
+            b"<location>" + location.encode() + b"</location>",
+            ITEM,
+        )
+        for location in AROUND[suburb]
+    ]
+    return ITEMS.sub(lambda _: b"".join(items), FEED, count=1)
+
+
+def learnt() -> Neighbourhoods:
+    """Return a cache that has seen every surrounding query."""
+    return Neighbourhoods(AROUND)
+
+
+def test_plan_without_history_queries_every_target() -> None:
+    """With nothing learnt, each target has to be queried itself."""
+    assert plan_cover(TARGETS, Neighbourhoods()) == sorted(TARGETS)
+
+
+def test_plan_picks_small_cover() -> None:
+    """Greedy cover needs two queries where six were naive."""
+    plan = plan_cover(TARGETS, learnt())
+    assert plan == ["Bayswater", "Dianella"]
+
+
+def test_plan_may_use_non_target_suburbs() -> None:
+    """A known neighbourhood outside the targets can cover them."""
+    cache = Neighbourhoods({"Beechboro": ["Morley", "Noranda", "Dianella"]})
+    assert plan_cover(["Morley", "Noranda", "Dianella"], cache) == ["Beechboro"]
+
+
+def test_fetch_cover_learns_and_deduplicates() -> None:
+    """A first sweep learns neighbourhoods; the next one needs fewer queries."""
+    client = CannedClient(feed_for)
+    cache = Neighbourhoods()
+    first = fetch_cover(TARGETS, cache, client=client, product=1)
+    assert sorted(first.queries) == sorted(TARGETS)
+    assert all(r["surrounding"] is True for r in client.calls)
+    assert all(r["product"] == 1 for r in client.calls)
+    locations = sorted(station.location for station in first.stations)
+    assert locations == sorted(s.upper() for s in TARGETS)
+
+    second = fetch_cover(TARGETS, cache, client=CannedClient(feed_for))
+    assert len(second.queries) == 2
+    assert {s.key for s in second.stations} == {s.key for s in first.stations}
+
+
+def test_neighbourhoods_save_and_load(tmp_path: Path) -> None:
+    """The cache round-trips through JSON and loads empty when missing."""
+    path = tmp_path / "neighbourhoods.json"
+    assert len(Neighbourhoods.load(path)) == 0
+    learnt().save(path)
+    cache = Neighbourhoods.load(path)
+    assert "Bayswater" in cache
+    assert cache.get("Noranda") == {"NORANDA", "MORLEY"}
@@ -0,0 +1,81 @@
+"""Tests for site-feature and description parsing."""
+
+import pytest
+
+from fuelwatcher import FuelStation
+from fuelwatcher.features import (
+    FeatureIndex,
+    normalize_feature,
+    parse_description,
+    parse_features,
+    station_features,
+)
+
+
+@pytest.fixture
+def index(stations: list[FuelStation]) -> FeatureIndex:
+    """Feature index over the fixture feed."""
+    return FeatureIndex(stations)
+
+
+@pytest.mark.parametrize(
+    ("text", "name"),
+    [
+        ("Open 24 hours", "open_24_hours"),
+        ("24 Hrs", "open_24_hours"),
+        ("EFTPOS", "eftpos"),
+        ("Car Wash", "car_wash"),
+        ("Air & Water", "air"),
+        ("Café", "cafe"),
+        ("Pie Shop", "pie_shop"),
+    ],
+)
+def test_normalize_feature(text: str, name: str) -> None:
+    """Feature phrases map onto the canonical vocabulary."""
+    assert normalize_feature(text) == name
+
+
+def test_parse_features_is_memoized() -> None:
+    """Repeated text returns the cached result."""
+    text = ", Open 24 hours, EFTPOS, Car Wash"
+    assert parse_features(text) == {"open_24_hours", "eftpos", "car_wash"}
+    assert parse_features(text) is parse_features(text)
+    assert parse_features(None) == frozenset()
+
+
+def test_parse_description() -> None:
+    """Descriptions split into address, phone and feature parts."""
+    desc = parse_description(
+        "Address: 502 Guildford Rd, BAYSWATER, Phone: (08) 9272 1133, Open 24 hours"
+    )
+    assert desc.street == "502 Guildford Rd"
+    assert desc.suburb == "BAYSWATER"
+    assert desc.phone == "(08) 9272 1133"
+    assert (desc.area_code, desc.local_number) == ("08", "92721133")
+    assert desc.features == {"open_24_hours"}
+
+
+def test_parse_description_without_phone() -> None:
+    """Missing parts are None."""
+    desc = parse_description("Address: 877 Beaufort St, INGLEWOOD")
+    assert (desc.street, desc.suburb) == ("877 Beaufort St", "INGLEWOOD")
+    assert desc.phone is None
+    assert desc.features == frozenset()
+    assert parse_description("").street is None
+
+
+def test_station_features_merges_sources(index: FeatureIndex) -> None:
+    """Features come from both site_features and description."""
+    bayswater = next(iter(index))
+    assert station_features(bayswater) == {"open_24_hours", "eftpos", "car_wash"}
+
+
+def test_feature_index_filters(index: FeatureIndex) -> None:
+    """Filters AND feature bitsets together."""
+    assert index.features == {"open_24_hours", "eftpos", "car_wash"}
+    names = [s.trading_name for s in index.filter("eftpos")]
+    assert names == ["Puma Bayswater", "Vibe Morley"]
+    matches = index.filter("Open 24 hours", "EFTPOS", "car_wash")
+    assert [s.trading_name for s in matches] == ["Puma Bayswater"]
+    assert index.count("eftpos", "atm") == 0
+    assert index.count() == len(index) == 3
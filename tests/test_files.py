@@ -0,0 +1,29 @@
+"""Tests for crash-safe file writes."""
+
+from pathlib import Path
+
+import pytest
+
+from fuelwatcher.files import atomic_write
+
+
+def test_atomic_write_replaces_file(tmp_path: Path) -> None:
+    """The target is replaced and missing directories are created."""
+    path = tmp_path / "nested" / "state.json"
+    with atomic_write(path) as f:
+        f.write(b"old")
+    with atomic_write(path) as f:
+        f.write(b"new")
+    assert path.read_bytes() == b"new"
+    assert [p.name for p in path.parent.iterdir()] == ["state.json"]
+
+
+def test_atomic_write_failure_keeps_old_file(tmp_path: Path) -> None:
+    """An error inside the block leaves the previous file untouched."""
+    path = tmp_path / "state.json"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError), atomic_write(path) as f:
+        f.write(b"partial")
+        raise RuntimeError("crash")
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
@@ -5,6 +5,7 @@ import warnings
 import pytest
 
 from fuelwatcher import FuelStation, FuelWatch, FuelWatchError
+from tests.conftest import FEED, FIXTURES
 
 
 @pytest.fixture
@@ -231,3 +232,72 @@ def test_deprecated_get_xml_still_works(queried_api: FuelWatch) -> None:
         xml = queried_api.get_xml
         assert xml is not None
         assert isinstance(xml, list)
+
+
+def test_fuel_station_key() -> None:
+    """FuelStation.key identifies the site regardless of case or price."""
+    station = FuelStation(
+        title="Test",
+        description="",
+        brand="BP",
+        date="",
+        price="140.0",
+        trading_name="Test BP",
+        location="Perth",
+        address="456 Test Ave",
+        phone=None,
+        latitude="",
+        longitude="",
+        site_features=None,
+    )
+    assert station.key == ("PERTH", "456 TEST AVE")
+
+
+def test_compact_keeps_only_stations() -> None:
+    """compact() drops cached representations; xml and json still work."""
+    api = FuelWatch()
+    api.load(FEED)
+    xml, json_text = api.xml, api.json
+    stations = api.compact()
+    assert api.raw is None
+    assert (api._xml, api._json, api._views) == (None, None, None)
+    assert api.stations is stations
+    assert api.xml == xml
+    assert api.json == json_text
+
+
+def test_compact_keeps_missing_elements_none() -> None:
+    """Rebuilt xml and json keep None for elements absent from the feed."""
+    api = FuelWatch()
+    api.load((FIXTURES / "odd.xml").read_bytes())
+    xml, json_text = api.xml, api.json
+    assert any(item["title"] is None for item in xml)
+    api.compact()
+    assert api.xml == xml
+    assert api.json == json_text
+    api.compact()
+    assert api.xml == xml
+
+
+def test_compact_can_keep_raw() -> None:
+    """keep_raw leaves the response bytes in place."""
+    api = FuelWatch()
+    api.load(FEED)
+    api.compact(keep_raw=True)
+    assert api.raw == FEED
+    assert api._xml is None
+
+
+def test_compact_without_data_raises() -> None:
+    """Compacting before a query raises like the other accessors."""
+    with pytest.raises(FuelWatchError):
+        FuelWatch().compact()
+
+
+def test_clone_copies_configuration() -> None:
+    """Clones share validation tables but get their own built-in parser."""
+    api = FuelWatch(url="http://localhost/rss", suburb=["PERTH"], parser="etree")
+    clone = api._clone()
+    assert (clone.url, clone._suburb) == ("http://localhost/rss", ["PERTH"])
+    assert clone._parser.name == "etree"
+    assert clone._parser is not api._parser
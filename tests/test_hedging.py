@@ -0,0 +1,144 @@
+"""Tests for hedged requests."""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+import requests
+
+from fuelwatcher import FuelWatch, FuelWatchError
+from fuelwatcher.hedging import HedgePolicy
+from tests.conftest import FEED
+
+
+def scripted(*delays: float, fail: tuple[int, ...] = ()) -> Callable[[], int]:
+    """Return a function whose nth call sleeps ``delays[n]`` and returns n."""
+    calls = iter(range(len(delays)))
+    lock = threading.Lock()
+
+    def fn() -> int:
+        with lock:
+            n = next(calls)
+        time.sleep(delays[n])
+        if n in fail:
+            raise FuelWatchError(f"attempt {n} failed")
+        return n
+
+    return fn
+
+
+@pytest.fixture
+def policy() -> Any:
+    """Policy that hedges after 50ms with a budget for two hedges."""
+    policy = HedgePolicy(initial_delay=0.05, budget=0.0, burst=2.0)
+    yield policy
+    policy.close()
+
+
+def test_fast_request_is_not_hedged(policy: HedgePolicy) -> None:
+    """Requests answering within the delay never fire a duplicate."""
+    assert policy.call("product", scripted(0.0)) == 0
+    assert policy.stats().hedged == 0
+    assert policy.stats().requests == 1
+
+
+def test_slow_request_is_hedged_and_hedge_wins(policy: HedgePolicy) -> None:
+    """A stalled request is duplicated and the faster duplicate answers."""
+    start = time.perf_counter()
+    assert policy.call("product", scripted(1.0, 0.0)) == 1
+    assert time.perf_counter() - start < 0.5
+    stats = policy.stats()
+    assert (stats.hedged, stats.wins, stats.losses) == (1, 1, 0)
+    assert stats.win_rate == 1.0
+
+
+def test_original_can_still_win(policy: HedgePolicy) -> None:
+    """If the original answers before the duplicate, it counts as a loss."""
+    assert policy.call("product", scripted(0.1, 1.0)) == 0
+    assert (policy.stats().wins, policy.stats().losses) == (0, 1)
+
+
+def test_failed_attempt_falls_back_to_other(policy: HedgePolicy) -> None:
+    """One failing attempt does not fail the call; both failing does."""
+    assert policy.call("a", scripted(0.1, 0.2, fail=(0,))) == 1
+    with pytest.raises(FuelWatchError, match="attempt 1 failed"):
+        policy.call("b", scripted(0.2, 0.06, fail=(0, 1)))
+
+
+def test_budget_limits_hedges(policy: HedgePolicy) -> None:
+    """Once the budget is spent, slow requests just wait."""
+    for _ in range(3):
+        policy.call("product", scripted(0.1, 0.0))
+    stats = policy.stats()
+    assert (stats.requests, stats.hedged, stats.skipped) == (3, 2, 1)
+
+
+def test_running_losers_block_new_hedges() -> None:
+    """No hedge fires while max_losers abandoned attempts are still running."""
+    policy = HedgePolicy(initial_delay=0.05, budget=0.0, burst=5.0, max_losers=1)
+    try:
+        assert policy.call("a", scripted(0.5, 0.0)) == 1  # leaves one loser
+        assert policy.call("b", scripted(0.1, 0.0)) == 0  # waits, no hedge
+        stats = policy.stats()
+        assert (stats.hedged, stats.skipped) == (1, 1)
+        time.sleep(0.5)
+        assert policy.call("c", scripted(0.1, 0.0)) == 1
+    finally:
+        policy.close()
+
+
+def test_queue_wait_does_not_trigger_hedge() -> None:
+    """The hedge delay starts when an attempt runs, not when it is queued."""
+    policy = HedgePolicy(initial_delay=0.1, max_workers=1)
+    try:
+        blocker = threading.Thread(target=policy.call, args=("a", scripted(0.3)))
+        blocker.start()
+        time.sleep(0.01)
+        assert policy.call("b", scripted(0.05)) == 0  # queued ~290ms, ran 50ms
+        blocker.join()
+        assert policy.stats().hedged == 0
+    finally:
+        policy.close()
+
+
+def test_delay_adapts_to_observed_latency() -> None:
+    """The hedge delay follows the latency quantile once enough samples exist."""
+    policy = HedgePolicy(min_samples=10, initial_delay=5.0, min_delay=0.0)
+    assert policy.delay("product") == 5.0
+    for n in range(10):
+        policy._observe("product", n / 100)
+    assert policy.delay("product") == 0.09
+    assert policy.thresholds() == {"product": 0.09}
+    policy.close()
+
+
+def test_invalid_quantile() -> None:
+    """Quantiles outside (0, 1) are rejected."""
+    with pytest.raises(FuelWatchError, match="quantile"):
+        HedgePolicy(quantile=1.0)
+
+
+def test_fuelwatch_query_is_hedged(
+    monkeypatch: pytest.MonkeyPatch, policy: HedgePolicy
+) -> None:
+    """FuelWatch routes requests through the policy, keyed by query kind."""
+    delays = iter([1.0, 0.0])
+
+    class Response:
+        content = FEED
+
+        def raise_for_status(self) -> None:
+            pass
+
+    def get(*args: Any, **kwargs: Any) -> Response:
+        time.sleep(next(delays))
+        return Response()
+
+    monkeypatch.setattr(requests, "get", get)
+    api = FuelWatch(hedge=policy)
+    assert api.query(product=1, region=25) == FEED
+    assert policy.stats().wins == 1
+    assert set(policy.thresholds()) == {"Product,Region"}
+    assert api._clone()._hedge is policy
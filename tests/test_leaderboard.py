@@ -0,0 +1,124 @@
+"""Tests for incrementally maintained leaderboards."""
+
+import dataclasses
+import threading
+
+from fuelwatcher import FuelStation
+from fuelwatcher.leaderboard import Leaderboards, LeaderboardView
+from tests.conftest import loaded
+
+DAY = "2024-01-09"
+
+
+def stations() -> list[FuelStation]:
+    """Return the fixture stations: Puma 171.9, Vibe 174.5, BP 179.9."""
+    return loaded().stations
+
+
+def names(ranked: list) -> list[str]:
+    """Return the trading names of ranked entries."""
+    return [entry.station.trading_name for entry in ranked]
+
+
+def test_top_k_is_sorted_by_price() -> None:
+    """Boards answer the cheapest stations overall and per brand."""
+    boards = Leaderboards.from_stations(stations(), product=1, region=25)
+    top = boards.top(2, product=1, region=25, day=DAY)
+    assert [entry.price for entry in top] == [171.9, 174.5]
+    assert boards.top(10, product=1, region=25) == boards.top(3, 1, 25, day=DAY)
+    assert names(boards.top(5, 1, 25, brand="BP")) == ["BP Inglewood"]
+    assert boards.top(5, product=4, region=25) == []
+    assert (1, 25, None, DAY) in boards.keys()
+
+
+def test_reprice_moves_only_that_station() -> None:
+    """A repriced station moves; an unchanged snapshot changes nothing."""
+    current = stations()
+    boards = Leaderboards()
+    assert boards.update(current, product=1, region=25) == 3
+    assert boards.update(current, product=1, region=25) == 0
+
+    current[2] = dataclasses.replace(current[2], price="150.0")
+    assert boards.update(current, product=1, region=25) == 1
+    top = boards.top(3, product=1, region=25)
+    assert top[0].station is current[2]
+    assert [entry.price for entry in top] == [150.0, 171.9, 174.5]
+    assert boards.top(1, 1, 25, brand="BP")[0].price == 150.0
+
+
+def test_missing_station_is_removed() -> None:
+    """Stations absent from a new snapshot leave the boards."""
+    boards = Leaderboards.from_stations(stations(), product=1, region=25)
+    assert boards.update(stations()[1:], product=1, region=25) == 1
+    assert len(boards.top(10, product=1, region=25)) == 2
+    assert boards.top(10, 1, 25, brand="Puma") == []
+    assert (1, 25, "Puma", DAY) not in boards.keys()
+
+
+def test_empty_snapshot_clears_given_day() -> None:
+    """An empty snapshot for an explicit day removes that day's stations."""
+    boards = Leaderboards.from_stations(stations(), product=1, region=25)
+    boards.update(stations(), product=1, region=25, day="2024-01-10")
+    assert boards.update([], product=1, region=25, day="2024-01-10") == 3
+    assert boards.top(10, product=1, region=25, day="2024-01-10") == []
+    assert len(boards.top(10, product=1, region=25)) == 3  # back to DAY
+    assert boards.update([], product=1, region=25) == 0
+
+
+def test_prune_drops_past_days() -> None:
+    """Pruning removes earlier days and their boards only."""
+    boards = Leaderboards()
+    boards.update(stations(), product=1, region=25)
+    boards.update(stations()[:1], product=1, region=25, day="2024-01-10")
+    assert boards.prune(before="2024-01-10") == 1
+    assert {key[3] for key in boards.keys()} == {"2024-01-10"}
+    assert boards.top(10, product=1, region=25, day=DAY) == []
+    assert len(boards.top(10, product=1, region=25)) == 1
+    assert boards.prune(before="2024-01-11") == 1
+    assert boards.top(10, product=1, region=25) == []
+
+
+def test_days_and_scopes_are_separate() -> None:
+    """Each (product, region, day) has its own boards; top defaults to latest."""
+    boards = Leaderboards()
+    boards.update(stations(), product=1, region=25)
+    boards.update(stations()[:1], product=1, region=25, day="2024-01-10")
+    boards.update(stations()[2:], product=4, region=25)
+    assert len(boards.top(10, product=1, region=25)) == 1
+    assert len(boards.top(10, product=1, region=25, day=DAY)) == 3
+    assert names(boards.top(10, product=4, region=25)) == ["BP Inglewood"]
+    boards.clear()
+    assert boards.keys() == []
+
+
+def test_view_is_read_only_and_thread_safe() -> None:
+    """The view reads consistently while another thread keeps updating."""
+    boards = Leaderboards()
+    view = boards.view()
+    assert isinstance(view, LeaderboardView)
+    assert not hasattr(view, "update")
+    base = stations()
+    errors: list[BaseException] = []
+
+    def write() -> None:
+        for n in range(200):
+            repriced = [
+                dataclasses.replace(s, price=f"{170 + (n * 7 + i) % 13}.0")
+                for i, s in enumerate(base)
+            ]
+            boards.update(repriced, product=1, region=25)
+
+    def read() -> None:
+        try:
+            for _ in range(500):
+                prices = [entry.price for entry in view.top(3, product=1, region=25)]
+                assert prices == sorted(prices)
+        except BaseException as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=write), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
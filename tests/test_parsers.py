@@ -0,0 +1,132 @@
+"""Conformance tests for the XML parser backends.
+
+Every backend must produce identical results for the same feed, so choosing a
+faster parser can never change what callers see.
+"""
+
+import pytest
+
+from fuelwatcher import FuelWatch, FuelWatchError
+from fuelwatcher.parsers import (
+    BACKENDS,
+    ENV_VAR,
+    ElementTreeParser,
+    ExpatParser,
+    available,
+    get_parser,
+)
+from fuelwatcher.views import parse_views
+from tests.conftest import FEED, FIXTURES
+
+FEEDS = sorted(p.name for p in FIXTURES.glob("*.xml"))
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request: pytest.FixtureRequest) -> str:
+    """Each parser backend name, skipping those not installed."""
+    if request.param not in available():
+        pytest.skip(f"{request.param} is not installed")
+    return request.param
+
+
+@pytest.mark.parametrize("feed", FEEDS)
+def test_backends_agree(backend: str, feed: str) -> None:
+    """Every backend matches the ElementTree reference output."""
+    raw = (FIXTURES / feed).read_bytes()
+    assert get_parser(backend).parse(raw) == ElementTreeParser().parse(raw)
+
+
+@pytest.mark.parametrize("feed", [f for f in FEEDS if f != "utf16.xml"])
+def test_lazy_views_agree(feed: str) -> None:
+    """Lazy station views decode to the same fields as the parsers."""
+    raw = (FIXTURES / feed).read_bytes()
+    views = [view.to_dict() for view in parse_views(raw)]
+    expected = ElementTreeParser().parse(raw)
+    # Views, like FuelStation, substitute "" for missing required fields.
+    for item in expected:
+        for key, value in item.items():
+            if value is None and key not in ("phone", "site-features"):
+                item[key] = ""
+    assert views == expected
+
+
+def test_feed_contents(backend: str) -> None:
+    """Missing optional elements are None; present ones keep their text."""
+    items = get_parser(backend).parse(FEED)
+    assert len(items) == 3
+    assert items[0]["trading-name"] == "Puma Bayswater"
+    assert items[0]["site-features"] == ", Open 24 hours, EFTPOS, Car Wash"
+    assert items[2]["phone"] is None
+    assert items[2]["site-features"] is None
+
+
+def test_encodings(backend: str) -> None:
+    """Declared non-UTF-8 encodings are decoded."""
+    parser = get_parser(backend)
+    latin = parser.parse((FIXTURES / "latin1.xml").read_bytes())
+    utf16 = parser.parse((FIXTURES / "utf16.xml").read_bytes())
+    assert latin[0]["trading-name"] == "Puma Bayswater Café"
+    assert utf16[1]["trading-name"] == "Vibe Morley ☕"
+
+
+def test_odd_markup(backend: str) -> None:
+    """Entities, CDATA, self-closing and repeated elements follow findtext()."""
+    first, second, empty = get_parser(backend).parse(
+        (FIXTURES / "odd.xml").read_bytes()
+    )
+    assert first["title"] == "185.0: Caltex & Co – Perth"
+    assert first["trading-name"] == "Fish & Chips <Fuel>"
+    assert first["phone"] == ""
+    assert first["site-features"] == ""
+    assert second["title"] == "First"
+    assert second["address"] == "12 "
+    assert empty == dict.fromkeys(empty)
+
+
+def test_line_endings(backend: str) -> None:
+    """CRLF and lone CR in text and CDATA read as LF; &#13; stays CR."""
+    [item] = get_parser(backend).parse((FIXTURES / "crlf.xml").read_bytes())
+    assert item["description"] == (
+        "Address: 502 Guildford Rd,\n        BAYSWATER,\nOpen 24 hours"
+    )
+    assert item["trading-name"] == "Puma\nBayswater"
+    assert item["address"] == "502 Guildford Rd\r"
+
+
+def test_empty_channel(backend: str) -> None:
+    """A channel without items parses to an empty list."""
+    assert get_parser(backend).parse((FIXTURES / "empty.xml").read_bytes()) == []
+
+
+def test_malformed_xml_raises_error(backend: str) -> None:
+    """Malformed responses raise FuelWatchError from every backend."""
+    with pytest.raises(FuelWatchError, match="Malformed XML response"):
+        get_parser(backend).parse(b"<rss><channel><item></channel></rss>")
+
+
+def test_default_is_fastest_available(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without an override, the first available backend is used."""
+    monkeypatch.delenv(ENV_VAR, raising=False)
+    assert get_parser().name == available()[0]
+
+
+def test_environment_override(monkeypatch: pytest.MonkeyPatch) -> None:
+    """FUELWATCHER_PARSER selects the backend."""
+    monkeypatch.setenv(ENV_VAR, "expat")
+    assert get_parser().name == "expat"
+    assert FuelWatch()._parser.name == "expat"
+
+
+def test_constructor_override(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The parser argument takes precedence over the environment."""
+    monkeypatch.setenv(ENV_VAR, "lxml")
+    api = FuelWatch(parser=ExpatParser())
+    api.load(FEED)
+    assert api._parser.name == "expat"
+    assert api.stations[0].price == "171.9"
+
+
+def test_invalid_parser_raises_error() -> None:
+    """Unknown backend names raise FuelWatchError."""
+    with pytest.raises(FuelWatchError, match="Invalid parser"):
+        FuelWatch(parser="beautifulsoup")
@@ -0,0 +1,84 @@
+"""Tests for the cross-product price matrix."""
+
+import math
+import re
+from typing import Any
+
+import pytest
+
+from fuelwatcher import FuelWatchError
+from fuelwatcher.prices import PriceMatrix, fetch_prices
+from tests.conftest import FEED, CannedClient, loaded
+
+ITEMS = re.findall(rb"<item>.*?</item>", FEED, re.S)
+BAYSWATER = ("BAYSWATER", "502 GUILDFORD RD")
+MORLEY = ("MORLEY", "101 WALTER RD W")
+INGLEWOOD = ("INGLEWOOD", "877 BEAUFORT ST")
+
+
+def feed_with(*items: bytes) -> bytes:
+    """Return the fixture feed with its items replaced."""
+    start, end = FEED.index(ITEMS[0]), FEED.index(ITEMS[-1]) + len(ITEMS[-1])
+    return FEED[:start] + b"".join(items) + FEED[end:]
+
+
+def reprice(item: bytes, price: bytes) -> bytes:
+    """Return an item with a different price."""
+    return re.sub(rb"<price>[^<]*", b"<price>" + price, item)
+
+
+# Diesel skips Morley; LPG is only sold at Inglewood.
+FEEDS = {
+    1: FEED,
+    4: feed_with(reprice(ITEMS[0], b"189.9"), reprice(ITEMS[2], b"185.5")),
+    5: feed_with(reprice(ITEMS[2], b"99.9")),
+}
+
+
+def by_product(**kwargs: Any) -> bytes:
+    """Serve a different canned feed per product."""
+    if kwargs["product"] not in FEEDS:
+        raise FuelWatchError("HTTP error from FuelWatch: 500")
+    return FEEDS[kwargs["product"]]
+
+
+def test_fetch_prices_joins_products() -> None:
+    """Each station appears once, with a price for every product it sells."""
+    client = CannedClient(by_product)
+    matrix = fetch_prices([1, 4, 5], client=client, region=25)
+
+    assert len(client.calls) == 3
+    assert all(r["region"] == 25 for r in client.calls)
+    assert matrix.products == (1, 4, 5)
+    assert [row.key for row in matrix] == [BAYSWATER, MORLEY, INGLEWOOD]
+    assert matrix.get(BAYSWATER).prices == {1: 171.9, 4: 189.9}
+    assert matrix.get(MORLEY).prices == {1: 174.5}
+    assert matrix.get(INGLEWOOD).price(5) == 99.9
+    assert matrix.get(MORLEY).price(4) is None
+    assert matrix.get(("NOWHERE", "1 NO ST")) is None
+
+
+def test_columns_use_nan_for_missing() -> None:
+    """Price columns are contiguous doubles aligned with the stations."""
+    matrix = fetch_prices([1, 4, 5], client=CannedClient(by_product))
+    diesel = matrix.column(4)
+    assert diesel.typecode == "d"
+    assert diesel[0] == 189.9 and math.isnan(diesel[1])
+    assert [matrix.coverage(p) for p in matrix.products] == [3, 2, 1]
+    with pytest.raises(FuelWatchError, match="not in the matrix"):
+        matrix.column(2)
+
+
+def test_station_first_seen_in_later_product() -> None:
+    """Stations absent from the first product still get a row."""
+    only_lpg = loaded(FEEDS[5]).stations
+    matrix = PriceMatrix({1: loaded(feed_with(ITEMS[0])).stations, 5: only_lpg})
+    assert [row.prices for row in matrix] == [{1: 171.9}, {5: 99.9}]
+    assert matrix[-1].key == INGLEWOOD
+    assert len(matrix[:1]) == 1
+
+
+def test_failed_product_raises() -> None:
+    """A failing product query fails the whole fetch."""
+    with pytest.raises(FuelWatchError):
+        fetch_prices([1, 2], client=CannedClient(by_product))
@@ -0,0 +1,170 @@
+"""Tests for tomorrow's price publication detection."""
+
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fuelwatcher import FuelWatchError, Query
+from fuelwatcher.constants import TIMEZONE
+from fuelwatcher.publish import (
+    DEFAULT_PROBE,
+    Publication,
+    PublicationDetector,
+    PublishStats,
+)
+from tests.conftest import EMPTY, FEED, CannedClient
+
+DAY = date(2024, 1, 9)
+
+
+def at(hour: int, minute: int, second: int = 0) -> datetime:
+    """Return a time on DAY in AWST."""
+    return datetime.combine(DAY, time(hour, minute, second), TIMEZONE)
+
+
+class Clock:
+    """Simulated time advanced only by sleeping."""
+
+    def __init__(self, start: datetime) -> None:
+        self.current = start
+        self.sleeps: list[float] = []
+
+    def now(self) -> datetime:
+        return self.current
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.current += timedelta(seconds=seconds)
+
+
+def feed_client(
+    clock: Clock, published: datetime, down: tuple[datetime, datetime] | None = None
+) -> CannedClient:
+    """Return a client factory whose tomorrow feed appears at ``published``.
+
+    Every request fails during the ``down`` interval, and product 5 always
+    fails.
+    """
+
+    def respond(**kwargs: Any) -> bytes:
+        assert kwargs["day"] == "tomorrow"
+        if kwargs.get("product") == 5 or (down and down[0] <= clock.now() < down[1]):
+            raise FuelWatchError("HTTP error from FuelWatch: 503")
+        return FEED if clock.now() >= published else EMPTY
+
+    return CannedClient(respond)
+
+
+def test_interval_tightens_through_window() -> None:
+    """Probing sleeps until the window, then speeds up towards 2:30PM."""
+    detector = PublicationDetector([], min_interval=1.0, max_interval=61.0)
+    assert detector.window(DAY) == (at(14, 20), at(14, 30))
+    assert detector.interval(at(9, 0)) == 5 * 3600 + 20 * 60
+    assert detector.interval(at(14, 20)) == 61.0
+    assert detector.interval(at(14, 25)) == 31.0
+    assert detector.interval(at(14, 35)) == 1.0
+
+
+def test_interval_backs_off_when_late() -> None:
+    """Past the deadline probing slows back down to max_interval."""
+    detector = PublicationDetector([], min_interval=1.0, max_interval=61.0)
+    assert detector.deadline(DAY) == at(14, 40)
+    assert detector.interval(at(14, 40)) == 1.0
+    assert detector.interval(at(14, 45)) == 31.0
+    assert detector.interval(at(14, 50)) == 61.0
+    assert detector.interval(at(23, 0)) == 61.0
+
+
+def test_late_publication_is_probed_sparingly() -> None:
+    """A publication hours late costs about one probe a minute, not a second."""
+    clock = Clock(at(14, 0))
+    detector = PublicationDetector(
+        [], feed_client(clock, at(17, 0)), now=clock.now, sleep=clock.sleep
+    )
+    publication = detector.wait()
+    assert publication.detected_at - at(17, 0) <= timedelta(seconds=61)
+    # About 600 at full speed up to the deadline, then one a minute; probing
+    # at min_interval throughout would have taken about 9,000.
+    assert publication.probes < 900
+
+
+def test_window_adapts_to_history() -> None:
+    """The window follows the median publish time, widened by the spread."""
+    stats = PublishStats(
+        Publication(DAY, at(14, minute), at(14, minute) - timedelta(seconds=1), 5)
+        for minute in (32, 34, 40)
+    )
+    assert stats.expected() == time(14, 34)
+    assert stats.spread() == timedelta(minutes=8)
+    assert stats.mean_lag() == timedelta(seconds=1)
+    detector = PublicationDetector([], stats=stats)
+    assert detector.window(DAY) == (at(14, 16), at(14, 26))
+
+
+def test_run_detects_and_fetches_everything() -> None:
+    """Publication triggers a fetch of every query, and is recorded."""
+    clock = Clock(at(13, 0))
+    client = feed_client(clock, published=at(14, 31, 30))
+    queries = [Query(product=1, region=25), Query(product=4), Query(product=5)]
+    stats = PublishStats()
+    detector = PublicationDetector(
+        queries, client, stats=stats, now=clock.now, sleep=clock.sleep
+    )
+    release = detector.run()
+
+    publication = release.publication
+    assert at(14, 31, 30) <= publication.detected_at <= at(14, 31, 31)
+    assert publication.lag <= timedelta(seconds=1)
+    assert publication.probes < 200  # blind 1s polling from 1PM: ~5500
+    assert stats.publications == [publication]
+    assert set(release.responses) == set(queries[:2])
+    assert release.responses[queries[0]] == FEED
+    assert release.failed == {queries[2]: "HTTP error from FuelWatch: 503"}
+    assert client.calls[0] == DEFAULT_PROBE.params(day="tomorrow")
+    assert client.clients == 1 + len(queries)  # probe, then one per worker
+
+
+def test_failed_probes_are_not_empty_probes() -> None:
+    """Probes that fail are counted apart and never bracket publication."""
+    clock = Clock(at(14, 29))
+    client = feed_client(clock, at(14, 30), down=(at(14, 29, 30), at(14, 31)))
+    detector = PublicationDetector([], client, now=clock.now, sleep=clock.sleep)
+    publication = detector.wait()
+    assert 0 < publication.failures < publication.probes - 1
+    assert publication.last_empty_at is not None
+    assert publication.last_empty_at < at(14, 29, 30)
+    assert publication.detected_at >= at(14, 31)
+
+
+def test_already_published_is_not_used_for_timing() -> None:
+    """A first probe that finds prices does not skew the expected time."""
+    clock = Clock(at(16, 0))
+    detector = PublicationDetector(
+        [], feed_client(clock, at(14, 30)), now=clock.now, sleep=clock.sleep
+    )
+    publication = detector.wait()
+    assert (publication.probes, publication.last_empty_at) == (1, None)
+    assert detector.stats.expected() == time(14, 30)
+    assert clock.sleeps == []
+
+
+def test_stats_save_and_load(tmp_path: Path) -> None:
+    """History round-trips through JSON and loads empty when missing."""
+    path = tmp_path / "publish.json"
+    assert PublishStats.load(path).publications == []
+    stats = PublishStats(
+        [
+            Publication(DAY, at(14, 33), at(14, 32, 59), 7),
+            Publication(DAY, at(16, 0), None, 1),
+        ]
+    )
+    stats.save(path)
+    assert PublishStats.load(path).publications == stats.publications
+
+
+def test_invalid_intervals() -> None:
+    """The minimum interval must be positive and not above the maximum."""
+    with pytest.raises(FuelWatchError, match="intervals"):
+        PublicationDetector([], min_interval=10, max_interval=5)
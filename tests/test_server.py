@@ -0,0 +1,163 @@
+"""Tests for the caching FuelWatch proxy."""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from fuelwatcher.models import FuelWatchError
+from fuelwatcher.server import ProxyCache, ProxyServer, SingleFlight, parse_params
+from tests.conftest import FEED
+
+
+class SlowUpstream:
+    """Fake upstream fetcher that counts calls and takes a while to answer."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.calls: list[dict[str, Any]] = []
+
+    def __call__(self, **kwargs: Any) -> bytes:
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        return FEED
+
+
+@pytest.fixture
+def server() -> Iterator[tuple[ProxyServer, SlowUpstream]]:
+    """Run a proxy on an ephemeral port backed by a fake upstream."""
+    upstream = SlowUpstream(delay=0)
+    httpd = ProxyServer(("127.0.0.1", 0), ProxyCache(fetch=upstream))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, upstream
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_single_flight_coalesces_concurrent_calls() -> None:
+    """Concurrent calls for one key run the function once."""
+    flight = SingleFlight()
+    calls = []
+
+    def work() -> int:
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    results: list[int] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("k", work)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [42] * 8
+    assert len(calls) == 1
+
+
+def test_single_flight_propagates_errors() -> None:
+    """Errors reach the caller and do not stick to the key."""
+    flight = SingleFlight()
+
+    def fail() -> None:
+        raise FuelWatchError("boom")
+
+    with pytest.raises(FuelWatchError, match="boom"):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: "ok") == "ok"
+
+
+def test_cache_coalesces_identical_queries() -> None:
+    """Concurrent identical queries produce a single upstream fetch."""
+    upstream = SlowUpstream()
+    cache = ProxyCache(fetch=upstream)
+    threads = [
+        threading.Thread(target=cache.raw, kwargs={"product": 1, "region": 25})
+        for _ in range(10)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(upstream.calls) == 1
+    assert upstream.calls[0] == {"product": 1, "region": 25}
+    cache.raw(region=25, product=1)
+    assert cache.upstream_fetches == 1
+
+
+def test_cache_expires_after_ttl() -> None:
+    """Stale entries are refetched."""
+    upstream = SlowUpstream(delay=0)
+    cache = ProxyCache(fetch=upstream, ttl=0)
+    cache.raw(product=1)
+    cache.raw(product=1)
+    assert len(upstream.calls) == 2
+
+
+def test_cache_evicts_expired_entries() -> None:
+    """Expired entries are dropped on lookup and by the periodic sweep."""
+    cache = ProxyCache(fetch=SlowUpstream(delay=0), ttl=0.05)
+    cache.raw(product=1)
+    cache.raw(product=2)
+    time.sleep(0.06)
+    assert cache._lookup(cache.key({"product": 1})) is None
+    assert list(cache._entries) == [(("product", 2),)]
+    cache.raw(product=3)
+    assert list(cache._entries) == [(("product", 3),)]
+
+
+def test_clients_are_reused_across_threads() -> None:
+    """Rendering JSON on new threads reuses pooled clients."""
+    cache = ProxyCache(fetch=SlowUpstream(delay=0))
+    for product in (1, 2, 3):
+        thread = threading.Thread(target=cache.json, kwargs={"product": product})
+        thread.start()
+        thread.join()
+    assert len(cache._clients) == 1
+
+
+def test_parse_params_matches_rss_names() -> None:
+    """RSS parameter names map onto FuelWatch.query() keywords."""
+    params = parse_params("Product=2&Region=25&Day=yesterday&Other=x")
+    assert params == {"product": 2, "region": 25, "day": "yesterday"}
+    with pytest.raises(FuelWatchError, match="Invalid Product"):
+        parse_params("Product=abc")
+
+
+def test_server_serves_rss_and_json(
+    server: tuple[ProxyServer, SlowUpstream],
+) -> None:
+    """RSS and JSON views of one query share a single upstream fetch."""
+    httpd, upstream = server
+    base = f"http://127.0.0.1:{httpd.server_address[1]}/fuelwatch/fuelWatchRSS"
+
+    with urllib.request.urlopen(f"{base}?Product=1") as resp:
+        assert resp.read() == FEED
+    with urllib.request.urlopen(f"{base}/json?Product=1") as resp:
+        stations = json.loads(resp.read())
+
+    assert stations[0]["trading-name"] == "Puma Bayswater"
+    assert len(upstream.calls) == 1
+
+
+def test_server_rejects_invalid_query(
+    server: tuple[ProxyServer, SlowUpstream],
+) -> None:
+    """Invalid parameters are reported as 400 without an upstream fetch."""
+    httpd, upstream = server
+    base = f"http://127.0.0.1:{httpd.server_address[1]}/fuelwatch/fuelWatchRSS"
+
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(f"{base}?Product=abc")
+    assert exc.value.code == 400
+    assert upstream.calls == []
@@ -0,0 +1,127 @@
+"""Tests for batched station sinks."""
+
+import csv
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from fuelwatcher import FuelStation, FuelWatch, FuelWatchError
+from fuelwatcher.sinks import COLUMNS, CSVSink, ParquetSink, Sink, SQLiteSink
+
+
+def rows(stations: list[FuelStation]) -> list[tuple[str | None, ...]]:
+    """Expected table rows for stations."""
+    return [tuple(getattr(s, name) for name in COLUMNS) for s in stations]
+
+
+def test_sqlite_sink_batches(tmp_path: Path, loaded_api: FuelWatch) -> None:
+    """Rows are inserted once per full batch and on close."""
+    db = tmp_path / "fuel.db"
+    with SQLiteSink(db, batch_size=2, flush_interval=None) as sink:
+        assert sink.write(loaded_api.stations * 2) == 6
+        assert sink.batches_written == 3
+        sink.write(loaded_api.stations[:1])
+        assert sink.rows_written == 6
+    assert sink.rows_written == 7
+
+    with sqlite3.connect(db) as conn:
+        stored = conn.execute("SELECT * FROM stations").fetchall()
+    assert stored == rows(loaded_api.stations * 2 + loaded_api.stations[:1])
+
+
+def test_sqlite_sink_accepts_lazy_views(loaded_api: FuelWatch) -> None:
+    """Streaming StationView objects write the same rows as FuelStation."""
+    conn = sqlite3.connect(":memory:")
+    with SQLiteSink(conn, table="views", fast=False) as sink:
+        sink.write(loaded_api.station_views)
+    assert conn.execute("SELECT * FROM views").fetchall() == rows(loaded_api.stations)
+
+
+def test_sink_flushes_after_interval(loaded_api: FuelWatch) -> None:
+    """Time-based flushing writes partial batches."""
+    conn = sqlite3.connect(":memory:")
+    sink = SQLiteSink(conn, fast=False, flush_interval=0)
+    sink.write(loaded_api.stations)
+    assert conn.execute("SELECT COUNT(*) FROM stations").fetchone() == (3,)
+    sink.close()
+    with pytest.raises(FuelWatchError, match="closed"):
+        sink.write(loaded_api.stations)
+
+
+def test_failed_batch_stays_buffered(loaded_api: FuelWatch) -> None:
+    """Rows from a failed write are retried by the next flush."""
+    conn = sqlite3.connect(":memory:")
+    sink = SQLiteSink(conn, fast=False, batch_size=2, flush_interval=None)
+    conn.execute(
+        "CREATE TRIGGER jam BEFORE INSERT ON stations "
+        "BEGIN SELECT RAISE(ABORT, 'locked'); END"
+    )
+    with pytest.raises(sqlite3.IntegrityError, match="locked"):
+        sink.write(loaded_api.stations)
+    assert sink.rows_written == 0
+
+    conn.execute("DROP TRIGGER jam")
+    sink.write(loaded_api.stations[2:])
+    sink.close()
+    assert conn.execute("SELECT COUNT(*) FROM stations").fetchone() == (3,)
+    assert (sink.rows_written, sink.batches_written) == (3, 1)
+
+
+def test_sqlite_sink_leaves_passed_connection_journal(
+    tmp_path: Path, loaded_api: FuelWatch
+) -> None:
+    """Pragmas are only set on databases the sink opens itself."""
+    conn = sqlite3.connect(tmp_path / "theirs.db")
+    with SQLiteSink(conn) as sink:
+        sink.write(loaded_api.stations)
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+
+    with SQLiteSink(tmp_path / "ours.db"):
+        pass
+    ours = sqlite3.connect(tmp_path / "ours.db")
+    assert ours.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    ours.close()
+    conn.close()
+
+
+def test_sink_requires_write_batch() -> None:
+    """Sink is abstract until a subclass implements _write_batch."""
+    with pytest.raises(TypeError, match="_write_batch"):
+        Sink()  # type: ignore[abstract]
+
+
+def test_csv_sink(tmp_path: Path, loaded_api: FuelWatch) -> None:
+    """CSV output has one header row, even when appending."""
+    path = tmp_path / "stations.csv"
+    with CSVSink(path) as sink:
+        sink.write(loaded_api.stations)
+    with CSVSink(path) as sink:
+        sink.write(loaded_api.stations[:1])
+
+    with open(path, newline="", encoding="utf-8") as f:
+        lines = list(csv.reader(f))
+    assert lines[0] == list(COLUMNS)
+    assert len(lines) == 5
+    assert lines[1][COLUMNS.index("trading_name")] == "Puma Bayswater"
+
+
+def test_parquet_sink(tmp_path: Path, loaded_api: FuelWatch) -> None:
+    """Parquet output round-trips through pyarrow, one row group per batch."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "stations.parquet"
+    with ParquetSink(path, batch_size=2) as sink:
+        sink.write(loaded_api.stations)
+
+    table = pq.read_table(path)
+    assert table.column_names == list(COLUMNS)
+    assert table.to_pylist() == [
+        dict(zip(COLUMNS, r, strict=True)) for r in rows(loaded_api.stations)
+    ]
+    assert pq.ParquetFile(path).num_row_groups == 2
+
+
+def test_invalid_table_name_raises_error() -> None:
+    """Table names are validated before being interpolated into SQL."""
+    with pytest.raises(FuelWatchError, match="Invalid table name"):
+        SQLiteSink(":memory:", table="stations; DROP TABLE x")
@@ -0,0 +1,96 @@
+"""Tests for binary station snapshots."""
+
+import dataclasses
+import math
+from pathlib import Path
+
+import pytest
+
+from fuelwatcher.models import FuelStation, FuelWatchError
+from fuelwatcher.snapshot import Snapshot, write_products_snapshot, write_snapshot
+
+
+def test_snapshot_round_trip(tmp_path: Path, stations: list[FuelStation]) -> None:
+    """Stations read back from a snapshot equal the originals."""
+    path = tmp_path / "metro.fws"
+    assert write_snapshot(path, stations) == len(stations)
+
+    with Snapshot(path) as snap:
+        assert len(snap) == len(stations)
+        assert list(snap) == stations
+        assert snap[-1] == stations[-1]
+        assert snap[1:] == stations[1:]
+        assert snap[2].phone is None
+        assert snap.field(0, "trading_name") == "Puma Bayswater"
+
+
+def test_snapshot_numeric_columns(tmp_path: Path, stations: list[FuelStation]) -> None:
+    """Numeric columns hold parsed floats, NaN where missing."""
+    path = tmp_path / "metro.fws"
+    bad = dataclasses.replace(stations[0], price="")
+    write_snapshot(path, [*stations, bad])
+
+    with Snapshot(path) as snap:
+        assert list(snap.prices[:3]) == [171.9, 174.5, 179.9]
+        assert snap.latitudes[0] == pytest.approx(-31.919385)
+        assert math.isnan(snap.prices[3])
+
+
+def test_snapshot_tags_rows_with_products(
+    tmp_path: Path, stations: list[FuelStation]
+) -> None:
+    """Stations written by product keep their product per row."""
+    path = tmp_path / "state.fws"
+    diesel = [dataclasses.replace(s, price="189.9") for s in stations[:2]]
+    assert write_products_snapshot(path, {1: stations, 4: diesel}) == 5
+
+    with Snapshot(path) as snap:
+        assert list(snap.products) == [1, 1, 1, 4, 4]
+        assert [snap.product(i) for i in (2, 3)] == [1, 4]
+        assert snap[3] == diesel[0]
+    write_snapshot(path, stations, product=4)
+    with Snapshot(path) as snap:
+        assert snap.product(0) == 4
+    write_snapshot(path, stations)
+    with Snapshot(path) as snap:
+        assert snap.product(0) is None
+
+
+def test_snapshot_close_with_held_views(
+    tmp_path: Path, stations: list[FuelStation]
+) -> None:
+    """Closing while a column slice is held succeeds; the slice stays valid."""
+    path = tmp_path / "metro.fws"
+    write_snapshot(path, stations)
+    with Snapshot(path) as snap:
+        held = snap.prices[:2]
+    assert snap.closed
+    assert list(held) == [171.9, 174.5]
+    with pytest.raises(FuelWatchError, match="Snapshot is closed"):
+        snap[0]
+    with pytest.raises(FuelWatchError, match="Snapshot is closed"):
+        snap.prices
+    held.release()
+    snap.close()  # idempotent
+
+
+def test_snapshot_overwrite_is_atomic(
+    tmp_path: Path, stations: list[FuelStation]
+) -> None:
+    """Rewriting leaves no temporary files and open readers keep their data."""
+    path = tmp_path / "metro.fws"
+    write_snapshot(path, stations)
+    with Snapshot(path) as old:
+        write_snapshot(path, stations[:1])
+        assert len(old) == 3
+    with Snapshot(path) as new:
+        assert len(new) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["metro.fws"]
+
+
+def test_snapshot_rejects_invalid_files(tmp_path: Path) -> None:
+    """Files that are not snapshots raise FuelWatchError."""
+    path = tmp_path / "bogus.fws"
+    path.write_bytes(b"not a snapshot at all, just some bytes")
+    with pytest.raises(FuelWatchError, match="Not a FuelWatch snapshot"):
+        Snapshot(path)
@@ -0,0 +1,127 @@
+"""Tests for distributed sweeps."""
+
+import multiprocessing
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from fuelwatcher import FuelWatchError, Query
+from fuelwatcher.backfill import DirectoryStore
+from fuelwatcher.sweep import (
+    MemoryQueue,
+    SQLiteQueue,
+    WorkUnit,
+    plan,
+    sweep,
+    work,
+)
+from tests.conftest import FEED, CannedClient
+
+DAYS = [date(2024, 1, 8), date(2024, 1, 9)]
+
+
+def fail_product(product: int) -> CannedClient:
+    """Return a client factory whose queries for ``product`` time out."""
+
+    def respond(**kwargs: Any) -> bytes:
+        if kwargs.get("product") == product:
+            raise FuelWatchError("Request failed: timeout")
+        return FEED
+
+    return CannedClient(respond)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def queue(request: pytest.FixtureRequest, tmp_path: Path) -> Any:
+    """Each queue implementation, allowing two attempts per unit."""
+    if request.param == "memory":
+        return MemoryQueue(max_attempts=2)
+    return SQLiteQueue(tmp_path / "queue.db", max_attempts=2)
+
+
+def test_work_unit_round_trip() -> None:
+    """Units survive serialization and have stable ids."""
+    unit = WorkUnit(Query(product=1, region=25), DAYS[1])
+    assert WorkUnit.from_json(unit.to_json()) == unit
+    assert unit.id == "product-1_region-25/2024-01-09"
+
+
+def test_put_is_idempotent(queue: Any) -> None:
+    """Re-submitting units does not duplicate them."""
+    units = plan(Query.grid(products=[1, 4]), DAYS)
+    assert queue.put(units) == 4
+    assert queue.put(units) == 0
+    assert queue.remaining() == 4
+
+
+def test_lease_is_exclusive_until_expiry(queue: Any) -> None:
+    """A leased unit is not handed out again until its lease expires."""
+    queue.put(plan([Query(product=1)], DAYS[:1]))
+    unit = queue.lease("a", seconds=0.05)
+    assert unit is not None
+    assert queue.lease("b", seconds=60) is None
+    time.sleep(0.1)
+    assert queue.lease("b", seconds=60) == unit
+    # The second lease used the last attempt; expiring again fails the unit.
+    queue.fail(unit, "boom")
+    assert queue.remaining() == 0
+    assert queue.failures() == {unit.id: "boom"}
+
+
+def test_failed_attempts_are_retried(queue: Any) -> None:
+    """A failure returns the unit to the queue until attempts run out."""
+    queue.put(plan([Query(product=1)], DAYS[:1]))
+    unit = queue.lease("a", seconds=60)
+    queue.fail(unit, "timeout")
+    assert queue.lease("a", seconds=60) == unit
+    queue.complete(unit)
+    assert queue.remaining() == 0
+    assert queue.failures() == {}
+
+
+def test_work_threads_share_a_queue(queue: Any, tmp_path: Path) -> None:
+    """Several workers drain a queue and store every unit exactly once."""
+    client = fail_product(4)
+    store = DirectoryStore(tmp_path / "data")
+    units = plan(Query.grid(products=[1, 2, 4]), DAYS)
+    queue.put(units)
+    counts: list[int] = []
+    threads = [
+        threading.Thread(
+            target=lambda: counts.append(work(queue, store, client=client))
+        )
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(counts) == 4
+    assert set(queue.failures()) == {u.id for u in units if u.query.product == 4}
+    assert all(store.has(u.query, u.day) for u in units if u.query.product != 4)
+
+
+@pytest.mark.parametrize("method", ["fork", "forkserver"])
+def test_sweep_across_processes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, method: str
+) -> None:
+    """Worker processes complete a sweep, and re-running it is a no-op."""
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip(f"{method} start method not available")
+    context = multiprocessing.get_context(method)
+    monkeypatch.setattr(multiprocessing, "Process", context.Process)
+    store = DirectoryStore(tmp_path / "data")
+    units = plan(Query.grid(products=[1, 2], regions=[25, 26]), DAYS)
+    client = CannedClient()
+    report = sweep(units, store, tmp_path / "queue.db", processes=3, client=client)
+    assert report.units == 8
+    assert report.failed == {}
+    assert all(store.get(u.query, u.day) == FEED for u in units)
+
+    again = sweep(units, store, tmp_path / "queue.db", processes=2, client=client)
+    assert again.failed == {}
+    assert SQLiteQueue(tmp_path / "queue.db").remaining() == 0
@@ -0,0 +1,74 @@
+"""Tests for lazy station views."""
+
+import pytest
+
+from fuelwatcher import FuelStation, FuelWatch, FuelWatchError
+from fuelwatcher.views import _UNDECODED, StationView, parse_views
+from tests.conftest import FEED
+
+ODD_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Odd</title>
+<item>
+  <brand>Caltex</brand><title>185.0: Caltex &amp; Co</title>
+  <trading-name><![CDATA[Fish & Chips <Fuel>]]></trading-name>
+  <price>185.0</price><phone/><extra>ignored</extra>
+</item>
+<item><title>First</title><title>Second</title></item>
+</channel></rss>"""
+
+
+def stations_via(raw: bytes, lazy: bool) -> list[FuelStation]:
+    """Parse raw bytes eagerly or lazily into FuelStation instances."""
+    api = FuelWatch()
+    api.load(raw)
+    if lazy:
+        return [view.to_station() for view in api.station_views]
+    return api.stations
+
+
+@pytest.mark.parametrize("raw", [FEED, ODD_FEED], ids=["feed", "odd"])
+def test_views_match_eager_parse(raw: bytes) -> None:
+    """Lazy views decode to the same stations as the ElementTree parser."""
+    assert stations_via(raw, lazy=True) == stations_via(raw, lazy=False)
+
+
+def test_views_normalize_line_endings() -> None:
+    """CRLF and lone CR become LF as in XML parsers; &#13; is kept."""
+    raw = FEED.replace(b"<address>", b"<address>a\r\nb\rc&#13;", 1)
+    views = parse_views(raw)
+    assert views[0].address.startswith("a\nb\nc\r")
+    assert stations_via(raw, lazy=True) == stations_via(raw, lazy=False)
+
+
+def test_view_decodes_fields_on_access() -> None:
+    """Fields are decoded once, on first access, from the retained buffer."""
+    api = FuelWatch()
+    api.load(FEED)
+    view = api.station_views[0]
+
+    assert isinstance(view, StationView)
+    assert all(value is _UNDECODED for value in view._values)
+    assert view.price == "171.9"
+    assert view.price is view.price
+    assert view.trading_name == "Puma Bayswater"
+    assert view._buf.obj is api.raw
+
+
+def test_view_optional_fields_default_to_none() -> None:
+    """Missing phone and site-features are None; other fields are empty."""
+    view = parse_views(FEED)[2]
+    assert view.phone is None
+    assert view.site_features is None
+    assert parse_views(ODD_FEED)[1].address == ""
+
+
+def test_view_to_dict_uses_hyphenated_keys() -> None:
+    """to_dict() matches FuelStation.to_dict()."""
+    view = parse_views(FEED)[0]
+    assert view.to_dict() == view.to_station().to_dict()
+
+
+def test_station_views_before_query_raises_error() -> None:
+    """Accessing station_views before query() raises FuelWatchError."""
+    with pytest.raises(FuelWatchError, match="No data available"):
+        _ = FuelWatch().station_views
@@ -0,0 +1,128 @@
+"""Tests for the async change stream."""
+
+import asyncio
+import itertools
+import re
+from typing import Any
+
+import pytest
+
+from fuelwatcher import FuelWatchError, Query
+from fuelwatcher.watch import ADDED, REMOVED, REPRICED, Change, Watcher
+from tests.conftest import FEED, CannedClient
+
+REPRICED_FEED = FEED.replace(b"<price>174.5</price>", b"<price>169.9</price>")
+NEW_FEED = REPRICED_FEED.replace(b"877 Beaufort St", b"1 New Rd")
+SHRUNK_FEED = re.sub(
+    rb"<item>(?:(?!<item>).)*?Inglewood.*?</item>", b"", REPRICED_FEED, flags=re.DOTALL
+)
+
+
+def scripted(*responses: bytes) -> CannedClient:
+    """Return a client factory replaying ``responses``, then the last forever."""
+    replay = itertools.chain(responses, itertools.repeat(responses[-1]))
+    return CannedClient(lambda **kwargs: next(replay))
+
+
+async def collect(stream: Any, count: int) -> list[Change]:
+    """Take ``count`` changes from an async iterator, then close it."""
+    changes = []
+    async for change in stream:
+        changes.append(change)
+        if len(changes) == count:
+            break
+    await stream.aclose()
+    return changes
+
+
+def test_watch_yields_only_changes() -> None:
+    """Repriced, removed and added stations are reported; repeats are not."""
+    client = scripted(FEED, FEED, REPRICED_FEED, NEW_FEED)
+    watcher = Watcher(client, interval=0)
+    query = Query(product=1)
+
+    changes = asyncio.run(collect(watcher.subscribe([query]), 3))
+
+    assert [(c.kind, c.station.trading_name) for c in changes] == [
+        (REPRICED, "Vibe Morley"),
+        (ADDED, "BP Inglewood"),
+        (REMOVED, "BP Inglewood"),
+    ]
+    assert changes[0].previous is not None
+    assert (changes[0].previous.price, changes[0].station.price) == ("174.5", "169.9")
+    assert changes[1].station.address == "1 New Rd"
+    assert all(c.query == query for c in changes)
+
+
+def test_subscribers_share_one_poll() -> None:
+    """Many subscribers of a query are served by a single poll task."""
+    client = scripted(FEED, REPRICED_FEED)
+    watcher = Watcher(client, interval=0.01)
+    query = Query(product=1)
+
+    async def main() -> list[list[Change]]:
+        streams = [watcher.subscribe([query]) for _ in range(5)]
+        results = await asyncio.gather(*(collect(s, 1) for s in streams))
+        assert watcher._polls == {}  # last subscriber stopped the poll
+        return results
+
+    results = asyncio.run(main())
+    assert all(r[0].kind == REPRICED for r in results)
+    assert len(client.calls) < 10
+
+
+def test_watch_cancellation_stops_polling() -> None:
+    """Cancelling a consumer unsubscribes it and cancels the poll task."""
+    client = scripted(FEED)
+    watcher = Watcher(client, interval=0)
+
+    async def main() -> None:
+        async def consume() -> None:
+            async for _ in watcher.subscribe([Query(product=1)]):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        poll_task = watcher._polls[Query(product=1)].task
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert watcher._polls == {}
+        assert poll_task is not None and poll_task.cancelled()
+
+    asyncio.run(main())
+
+
+def test_fuelwatch_watch_uses_configured_clients() -> None:
+    """FuelWatch.watch() polls with clones of the client."""
+    api = scripted(FEED, SHRUNK_FEED)()
+
+    changes = asyncio.run(collect(api.watch([Query(product=1)], interval=0), 2))
+    assert {c.kind for c in changes} == {REPRICED, REMOVED}
+
+
+def test_malformed_response_is_skipped() -> None:
+    """An unparseable response is logged and the next good one still diffs."""
+    client = scripted(FEED, b"<html>", REPRICED_FEED)
+    watcher = Watcher(client, interval=0)
+
+    changes = asyncio.run(collect(watcher.subscribe([Query(product=1)]), 1))
+    assert [(c.kind, c.station.trading_name) for c in changes] == [
+        (REPRICED, "Vibe Morley")
+    ]
+
+
+def test_dead_poll_task_raises_in_subscribers() -> None:
+    """A poll task stopped by an unexpected error fails its subscribers."""
+
+    def boom(**kwargs: Any) -> bytes:
+        raise RuntimeError("boom")
+
+    watcher = Watcher(CannedClient(boom), interval=0)
+
+    async def main() -> None:
+        with pytest.raises(FuelWatchError, match="boom"):
+            await asyncio.wait_for(collect(watcher.subscribe([Query(product=1)]), 1), 5)
+        assert watcher._polls == {}
+
+    asyncio.run(main())